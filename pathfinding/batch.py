@@ -0,0 +1,119 @@
+"""
+Batch path finding: many (start, end) queries against one maze.
+
+The maze is converted to a Grid once and sent once to every worker process, and each worker keeps one
+Workspace for all of its queries, so a query only pays for its own search. The queries are sharded in
+chunks across a process pool and the results are streamed back as an iterator.
+
+Usage:
+    from batch import solve_batch
+
+    for i, (found, path, length, steps, visited) in solve_batch(maze, [((0, 0), (9, 9)), ((2, 3), (7, 1))], "astar-manhattan"):
+        print(i, length)
+"""
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from grid import Workspace, as_grid
+from path_finder import ALGORITHMS, solve
+
+# Maze and search buffers of a worker process, set once when the worker starts
+_worker_grid = None
+_worker_workspace = None
+
+
+def _init_worker(grid):
+    """Stores the maze and a fresh workspace in the worker process."""
+    global _worker_grid, _worker_workspace
+    _worker_grid = grid
+    _worker_workspace = Workspace(grid.size)
+
+
+def _solve_chunk(chunk, algorithm, keep_visited):
+    """
+    Runs a chunk of queries on the maze of the worker process.
+
+    Parameters:
+        chunk (list) - The queries, as (index, start, end).
+        algorithm (str) - The name of the algorithm, one of ALGORITHMS.
+        keep_visited (bool) - Return the visited positions of every query.
+
+    Returns:
+        list - (index, result) of every query of the chunk.
+    """
+    results = []
+    for index, start, end in chunk:
+        found, path, length, steps, visited = solve(_worker_grid, algorithm, start=start, end=end, workspace=_worker_workspace)
+        results.append((index, (found, path, length, steps, visited if keep_visited else [])))
+    return results
+
+
+def _chunks(grid, queries, chunksize):
+    """Validates the queries, and yields them in chunks of (index, start, end)."""
+    queries = enumerate(queries)
+    while True:
+        chunk = []
+        for index, (start, end) in islice(queries, chunksize):
+            for position in (start, end):
+                if grid.is_wall(*position):
+                    raise ValueError(f"Query {index}: {position} is a wall or outside the maze")
+            chunk.append((index, tuple(start), tuple(end)))
+        if not chunk:
+            return
+        yield chunk
+
+
+def solve_batch(maze, queries, algorithm="bfs", workers=None, chunksize=64, ordered=True, keep_visited=False):
+    """
+    Runs a path finding algorithm on many (start, end) queries against one maze, and streams the results.
+
+    At most two chunks per worker are in flight at a time, so the queries can be a lazy iterable of any length.
+
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        queries (iterable) - The queries, as ((start row, start col), (end row, end col)).
+        algorithm (str) - The name of the algorithm, one of ALGORITHMS. Default is "bfs".
+        workers (int, optional) - The number of worker processes, the number of CPUs by default. 0 runs the queries in this process.
+        chunksize (int) - The number of queries sent to a worker at a time. Default is 64.
+        ordered (bool) - Yield the results in the order of the queries, otherwise as soon as they finish. Default is True.
+        keep_visited (bool) - Return the visited positions of every query, which are usually much larger than the paths. Default is False.
+
+    Yields:
+        tuple - (index, (found, path, length, steps, visited)) of every query, index being its position in queries.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, valid algorithms are: {', '.join(ALGORITHMS)}")
+    grid = as_grid(maze)                # Convert the maze once, for all the queries
+    chunks = _chunks(grid, queries, chunksize)
+
+    if workers == 0:                    # In process, sharing one workspace
+        _init_worker(grid)
+        for chunk in chunks:
+            yield from _solve_chunk(chunk, algorithm, keep_visited)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(grid,)) as executor:
+        pending = deque()
+        for chunk in islice(chunks, 2 * workers):
+            pending.append(executor.submit(_solve_chunk, chunk, algorithm, keep_visited))
+
+        try:
+            while pending:
+                if ordered:                 # Wait for the oldest chunk
+                    done = [pending.popleft()]
+                else:                       # Take whichever chunks finished first
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+
+                for future in done:
+                    yield from future.result()
+                    chunk = next(chunks, None)
+                    if chunk is not None:   # Keep the workers busy
+                        pending.append(executor.submit(_solve_chunk, chunk, algorithm, keep_visited))
+        finally:                            # Drop the queued chunks if the caller stops early
+            for future in pending:
+                future.cancel()
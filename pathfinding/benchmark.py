@@ -0,0 +1,260 @@
+"""
+Benchmark suite for the 2D path finding algorithms.
+
+Runs every algorithm headless over seeded mazes of increasing size, and reports the wall time, expansions per
+second, peak memory, frontier high-water mark and path length as a text table and as JSON. A previous JSON
+report can be passed with --compare to flag regressions between two runs, e.g. two commits.
+
+Usage:
+    python pathfinding/benchmark.py --preset quick --json bench.json
+    python pathfinding/benchmark.py --preset full --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import generate
+from components import components
+from grid import as_grid
+from path_finder import ALGORITHMS, EIGHT_CONNECTED, maze_csv, perfect_maze, solve
+import hpa
+
+# Maze sizes (rows and columns) of each preset
+PRESETS = {
+    "quick": [10, 50, 100],
+    "standard": [10, 100, 500, 1000],
+    "full": [10, 100, 1000, 4000],
+}
+
+# Maze generators by name, called as generator(rows, cols, seed)
+MAZE_TYPES = {
+    "random_maze": lambda rows, cols, seed: generate.random_maze(rows, cols, seed=seed),
+    "random_grid_maze": lambda rows, cols, seed: generate.random_grid_maze(rows, cols, seed=seed),
+    "perfect_maze": lambda rows, cols, seed: perfect_maze(rows, cols, seed=seed),
+    "maze_csv": lambda rows, cols, seed: maze_csv(os.path.join(os.path.dirname(os.path.abspath(__file__)), "maze.csv")),
+}
+
+# Preprocessing of the algorithms that build data once per maze and reuse it for every query, called as prepare(grid).
+# It is timed on its own, and the timed runs reuse its data instead of building it again.
+PREPARE = {
+    "hpa": hpa.abstract_graph,
+}
+
+# Algorithms left out unless asked for: iddfs and idastar only remember the current path, so they are
+# exponential on open mazes, and the variants meant for 8-connected grids don't fit the 4-connected mazes of make_grid
+DEFAULT_ALGORITHMS = [name for name in ALGORITHMS
+                      if name not in ("iddfs", "idastar-manhattan") and name not in EIGHT_CONNECTED.values()]
+
+
+def make_grid(maze_type, size, seed):
+    """
+    Generates a seeded maze and converts it to a Grid.
+
+    Parameters:
+        maze_type (str) - The name of the generator, one of MAZE_TYPES.
+        size (int) - The number of rows and columns of the maze.
+        seed (int) - The seed of the random generator.
+
+    Returns:
+        Grid - The generated maze.
+    """
+    random.seed(seed)                               # For the generators of path_finder
+    return as_grid(MAZE_TYPES[maze_type](size, size, seed))
+
+
+def run_case(grid, algorithm, repeat=3, memory=True):
+    """
+    Benchmarks one algorithm on one maze.
+
+    Parameters:
+        grid (Grid) - The maze.
+        algorithm (str) - The name of the algorithm, one of ALGORITHMS.
+        repeat (int) - The number of timed runs, their median is reported. Default is 3.
+        memory (bool) - Measure the peak memory in an extra run with tracemalloc. Default is True.
+
+    Returns:
+        dict - The measurements of the algorithm, with the time of its preprocessing as build_time for those of PREPARE.
+    """
+    prepare = PREPARE.get(algorithm)
+    build_time = None
+    if prepare:                                     # Built once, the runs below are the queries
+        grid.changed()
+        components(grid)
+        t0 = time.perf_counter()
+        prepare(grid)
+        build_time = time.perf_counter() - t0
+
+    times = []
+    for _ in range(max(1, repeat)):
+        if not prepare:
+            grid.changed()                          # Cold runs, without the data cached by the previous runs
+            components(grid)                        # but with the components every solver needs, labelled once per maze
+        stats = {}
+        t0 = time.perf_counter()
+        found, path, path_length, steps, visited = solve(grid, algorithm, stats=stats)
+        times.append(time.perf_counter() - t0)
+    median = statistics.median(times)
+
+    peak_memory = None
+    if memory:                                      # tracemalloc slows the search down, so it gets its own run
+        if not prepare:
+            grid.changed()
+            components(grid)
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        solve(grid, algorithm)
+        peak_memory = tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+
+    return {
+        "found": found,
+        "path_length": path_length,
+        "expansions": steps,
+        "time": median,
+        "time_min": min(times),
+        "build_time": build_time,
+        "expansions_per_sec": steps / median if median > 0 else None,
+        "peak_memory": peak_memory,
+        "frontier_peak": stats.get("frontier_peak"),
+    }
+
+
+def run_benchmarks(maze_types, sizes, algorithms, seed=0, repeat=3, memory=True, log=None):
+    """
+    Benchmarks every algorithm on every maze type and size.
+
+    Parameters:
+        maze_types (list) - The names of the maze generators, from MAZE_TYPES.
+        sizes (list) - The numbers of rows and columns of the mazes.
+        algorithms (list) - The names of the algorithms, from ALGORITHMS.
+        seed (int) - The seed of the maze generators. Default is 0.
+        repeat (int) - The number of timed runs of each algorithm. Default is 3.
+        memory (bool) - Measure the peak memory of each algorithm. Default is True.
+        log (function, optional) - Called with a progress message before each case.
+
+    Returns:
+        list - One dict of measurements per maze and algorithm.
+    """
+    results = []
+    for maze_type in maze_types:
+        for size in sizes:
+            grid = make_grid(maze_type, size, seed)
+            for algorithm in algorithms:
+                if log:
+                    log(f"{maze_type} {grid.rows}x{grid.cols} {algorithm}")
+                result = {"maze": maze_type, "size": size, "rows": grid.rows, "cols": grid.cols, "algorithm": algorithm}
+                result.update(run_case(grid, algorithm, repeat, memory))
+                results.append(result)
+            if maze_type == "maze_csv":             # The csv maze has a fixed size
+                break
+    return results
+
+
+def git_commit():
+    """Returns the current git commit of the repository, or None outside of git."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_table(results):
+    """Formats the results as a text table."""
+    width = max([len("Algorithm")] + [len(r["algorithm"]) for r in results]) + 2
+    lines = [f"{'Maze':<18}{'Size':>11}  {'Algorithm':<{width}}{'Found':<7}{'Length':>8}{'Expansions':>12}{'Time (s)':>11}{'Exp/s':>12}{'Peak MiB':>10}{'Frontier':>10}{'Build (s)':>11}"]
+    for r in results:
+        exp_s = f"{r['expansions_per_sec']:.0f}" if r["expansions_per_sec"] else "-"
+        memory = f"{r['peak_memory'] / 2**20:.2f}" if r["peak_memory"] is not None else "-"
+        size = f"{r['rows']}x{r['cols']}"
+        build = f"{r['build_time']:.4f}" if r.get("build_time") is not None else "-"
+        lines.append(f"{r['maze']:<18}{size:>11}  {r['algorithm']:<{width}}{str(r['found']):<7}{r['path_length']:>8}{r['expansions']:>12}"
+                     f"{r['time']:>11.4f}{exp_s:>12}{memory:>10}{r['frontier_peak'] or '-':>10}{build:>11}")
+    return "\n".join(lines)
+
+
+def compare(results, baseline, threshold=0.2, min_delta=0.005):
+    """
+    Compares the results against a baseline report.
+
+    A case regresses when its median time is more than threshold slower than the baseline, and more than min_delta
+    seconds slower, so that the noise of runs of a fraction of a millisecond is not reported, or when its path length
+    or whether a path was found changed.
+
+    Parameters:
+        results (list) - The current results.
+        baseline (list) - The results of the baseline report.
+        threshold (float) - The allowed relative slow down. Default is 0.2.
+        min_delta (float) - The allowed absolute slow down in seconds. Default is 0.005.
+
+    Returns:
+        list - One message per regression.
+    """
+    key = lambda r: (r["maze"], r["size"], r["algorithm"])
+    previous = {key(r): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = previous.get(key(r))
+        if old is None:
+            continue
+        name = f"{r['maze']} {r['rows']}x{r['cols']} {r['algorithm']}"
+        if (r["found"], r["path_length"]) != (old["found"], old["path_length"]):
+            regressions.append(f"{name}: result changed from found={old['found']} length={old['path_length']} to found={r['found']} length={r['path_length']}")
+        if old["time"] > 0 and r["time"] > old["time"] * (1 + threshold) and r["time"] - old["time"] > min_delta:
+            regressions.append(f"{name}: {r['time']:.4f}s vs {old['time']:.4f}s ({r['time'] / old['time']:.2f}x slower)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maze Path Finder benchmarks")
+    parser.add_argument("--preset", choices=PRESETS, default="quick", help="Maze sizes to run, quick: 10-100, standard: 10-1000, full: 10-4000")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Maze sizes to run, overrides the preset")
+    parser.add_argument("--maze_types", nargs="+", choices=MAZE_TYPES, default=list(MAZE_TYPES), help="Maze generators to run")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, default=DEFAULT_ALGORITHMS, help="Algorithms to run, all but iddfs, idastar and the 8-connected variants by default")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the maze generators")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs of each algorithm, their median is reported")
+    parser.add_argument("--no_memory", action="store_true", help="Skip the peak memory measurement")
+    parser.add_argument("--json", help="Write the report as JSON to this file")
+    parser.add_argument("--compare", help="Compare against a previous JSON report, exit with status 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slow down when comparing")
+    parser.add_argument("--min_delta", type=float, default=0.005, help="Allowed absolute slow down in seconds when comparing, for the noise of very short runs")
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes or PRESETS[args.preset]
+    results = run_benchmarks(args.maze_types, sizes, args.algorithms, seed=args.seed, repeat=args.repeat,
+                             memory=not args.no_memory, log=lambda message: print(message, file=sys.stderr))
+    print(format_table(results))
+
+    if args.json:
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.threshold, args.min_delta)
+        print(f"\nCompared against {args.compare} (commit {baseline.get('commit')}): {len(regressions)} regression(s)")
+        for message in regressions:
+            print(f"  {message}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Cache of path finding results, for workloads that ask the same questions about the same mazes again and again.
+
+Results are keyed by the content hash of the maze, the start and end positions, the algorithm and its options,
+so two mazes with the same cells share their results, and a maze whose cells changed gets new ones. The hash is
+computed once per Grid and cached on it until its cells change. Results are stored pickled, which gives their size
+in bytes, in a least recently used order: the cache is bounded both by its number of entries and by its bytes, and
+evicts the least recently used results first. It can be saved to a file and loaded again by the next runs.
+
+Usage:
+    from cache import PathCache
+
+    cache = PathCache(max_entries=10000, max_bytes=256 * 2**20, path="paths.cache")
+    found, path, length, steps, visited = cache.solve(grid, "astar-manhattan", start=(0, 0), end=(9, 9))
+    cache.save()
+"""
+import os
+import pickle
+from collections import OrderedDict
+
+from grid import as_grid
+from path_finder import solve
+
+
+class PathCache:
+    """
+    Least recently used cache of path finding results, bounded by entries and by bytes.
+
+    Parameters:
+        max_entries (int) - The maximum number of results. Default is 1024.
+        max_bytes (int) - The maximum total size of the pickled results. Default is 64 MiB.
+        path (str, optional) - The file the cache is saved to by save(), loaded when the cache is created if it exists.
+        keep_visited (bool) - Keep the visited positions of the results, they are replaced by an empty list otherwise. Default is False.
+
+    Attributes:
+        hits (int) - The number of results found in the cache.
+        misses (int) - The number of results computed.
+        evictions (int) - The number of results evicted to stay within the bounds.
+        bytes (int) - The total size of the pickled results.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 2**20, path=None, keep_visited=False):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self.keep_visited = keep_visited
+        self.hits = self.misses = self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()               # Pickled result of every key, least recently used first
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @staticmethod
+    def key(maze, algorithm="bfs", start=None, end=None, **options):
+        """
+        Returns the cache key of a query.
+
+        Parameters:
+            maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+            algorithm (str) - The name of the algorithm, one of ALGORITHMS. Default is "bfs".
+            start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+            end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+            options - The options of the algorithm, such as heuristic_type. The workspace is not part of the key.
+
+        Returns:
+            tuple - (maze hash, start, end, algorithm, options).
+        """
+        grid = as_grid(maze)
+        if start is None and grid.start is not None:
+            start = grid.position(grid.start)
+        if end is None and grid.end is not None:
+            end = grid.position(grid.end)
+        options = tuple(sorted((name, value) for name, value in options.items() if name != "workspace"))
+        return (grid.content_hash(), tuple(start) if start else None, tuple(end) if end else None, algorithm, options)
+
+    def get(self, key):
+        """Returns the result of a key and marks it as the most recently used, or None if it is not cached."""
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return pickle.loads(data)
+
+    def put(self, key, result):
+        """Stores the result of a key, and evicts the least recently used results that no longer fit."""
+        data = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:              # Would evict everything else and still not fit
+            return
+        if key in self._entries:
+            self.bytes -= len(self._entries.pop(key))
+        self._entries[key] = data
+        self.bytes += len(data)
+        self._evict()
+
+    def _evict(self):
+        """Evicts the least recently used results until the cache is within its bounds."""
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+    def solve(self, maze, algorithm="bfs", observer=None, stats=None, **options):
+        """
+        Returns the cached result of a query, or solves it with path_finder.solve() and caches the result.
+        Pass the maze as a Grid to compute its hash only once.
+
+        Parameters:
+            maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+            algorithm (str) - The name of the algorithm, one of ALGORITHMS. Default is "bfs".
+            observer (function, optional) - Called for every search event on a miss, and only with "done" on a hit.
+            stats (dict, optional) - Filled with the search statistics on a miss, and with cache_hit.
+            options - start, end, and the options of the algorithm, passed on to it.
+
+        Returns:
+            tuple - (found, path, length, steps, visited) as returned by the algorithm, the visited positions are
+                empty unless keep_visited is set.
+        """
+        grid = as_grid(maze)
+        key = self.key(grid, algorithm, **options)
+        result = self.get(key)
+        if result is not None:
+            if observer:
+                observer("done", result[3], path=result[1])
+            if stats is not None:
+                stats.update(cache_hit=True)
+            return result
+
+        found, path, length, steps, visited = solve(grid, algorithm, observer, stats, **options)
+        result = (found, path, length, steps, visited if self.keep_visited else [])
+        self.put(key, result)
+        if stats is not None:
+            stats.update(cache_hit=False)
+        return result
+
+    def clear(self):
+        """Drops every result, the counters are kept."""
+        self._entries.clear()
+        self.bytes = 0
+
+    def save(self, path=None):
+        """Writes the results to a file, the cache's path by default, replacing it at once so it is never left half written."""
+        path = path or self.path
+        if not path:
+            raise ValueError("The cache has no path to save to")
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(list(self._entries.items()), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+    def load(self, path):
+        """Adds the results of a file saved by save(), as the most recently used ones."""
+        with open(path, "rb") as f:
+            entries = pickle.load(f)
+        for key, data in entries:
+            if key in self._entries:
+                self.bytes -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self.bytes += len(data)
+        self._evict()
+
+    def info(self):
+        """Returns the counters and the size of the cache, as a dict."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions, "entries": len(self._entries), "bytes": self.bytes}
@@ -0,0 +1,116 @@
+"""
+Connected components of the open cells of a maze, to reject unreachable queries without searching.
+
+The components are labelled with a union-find over the runs of open cells of every row: the runs of a row are
+found with bytes.find(), and joined with the runs they touch in the previous row, so the work is proportional to
+the number of runs rather than the number of cells. The labels are then written one run at a time.
+On 8-connected grids, runs also touch diagonally when diagonal moves may pass between two walls. Otherwise a
+diagonal move passes next to an open cell that joins its two ends anyway, and the components are the same.
+Components are cached on the Grid, and labelled again once the maze changes.
+
+Usage:
+    from components import components
+
+    labels = components(grid)
+    labels.connected(grid.start, grid.end)      # False if no search can find a path
+"""
+from array import array
+
+from grid import OPEN, WALL, as_grid
+
+_WALL_CELL = bytes([WALL])
+_OPEN_CELL = bytes([OPEN])
+
+
+class Components:
+    """
+    Connected component labels of the open cells of a grid.
+
+    Parameters:
+        grid (Grid) - The maze.
+
+    Attributes:
+        labels (array) - The component of every cell, from 1, and 0 for walls.
+        sizes (list) - The number of cells of every component, sizes[0] is unused.
+        count (int) - The number of components.
+    """
+
+    def __init__(self, grid):
+        cells = grid.cells
+        runs = []                                   # (start, stop) indices of every run of open cells
+        parent = []                                 # Union-find parent of every run
+
+        def find(run):
+            while parent[run] != run:
+                parent[run] = parent[parent[run]]   # Path halving
+                run = parent[run]
+            return run
+
+        reach = 1 if grid.connectivity == 8 and grid.corner_cutting == "always" else 0    # Columns runs reach diagonally
+        previous = []                               # Runs of the previous row, as (start, stop, run)
+        for row in range(grid.rows):
+            first = grid.index(row, 0)
+            line = bytes(cells[first - 1:first + grid.cols + 1])    # The row and its border walls
+            current = []
+            col = line.find(_OPEN_CELL)
+            while col != -1:
+                stop = line.find(_WALL_CELL, col)   # The border wall ends every run
+                run = len(runs)
+                runs.append((first - 1 + col, first - 1 + stop))
+                parent.append(run)
+                current.append((col, stop, run))
+                col = line.find(_OPEN_CELL, stop)
+
+            # Join the runs that overlap a run of the previous row, both lists are sorted by column
+            i, count = 0, len(previous)
+            for start, stop, run in current:
+                while i < count and previous[i][1] + reach <= start:
+                    i += 1
+                j = i
+                while j < count and previous[j][0] < stop + reach:
+                    a, b = find(run), find(previous[j][2])
+                    if a != b:
+                        parent[a] = b
+                    j += 1
+            previous = current
+
+        # Number the components from 1, and write the labels one run at a time
+        labels = array("i", [0]) * grid.size
+        sizes = [0]
+        numbers = {}
+        for run, (start, stop) in enumerate(runs):
+            root = find(run)
+            label = numbers.get(root)
+            if label is None:
+                label = numbers[root] = len(sizes)
+                sizes.append(0)
+            labels[start:stop] = array("i", [label]) * (stop - start)
+            sizes[label] += stop - start
+
+        self.labels = labels
+        self.sizes = sizes
+        self.count = len(sizes) - 1
+
+    def connected(self, a, b):
+        """Returns True if there is a path between the cells at indices a and b, False if either one is a wall or None."""
+        if a is None or b is None:
+            return False
+        label = self.labels[a]
+        return label != 0 and label == self.labels[b]
+
+    def size(self, index):
+        """Returns the number of cells of the component of the cell at an index, 0 for walls."""
+        return self.sizes[self.labels[index]] if self.labels[index] else 0
+
+
+def components(maze):
+    """
+    Returns the connected components of a maze, cached on the grid until its cells change.
+
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+
+    Returns:
+        Components - The component labels.
+    """
+    return as_grid(maze).derived(("components",), Components)
@@ -0,0 +1,112 @@
+"""
+Goal-centric flow fields, for many agents heading to the same exit.
+
+A flow field is computed once by a breadth-first search backwards from the goal over the whole grid, one
+wavefront at a time, and stores the distance to the goal and the direction of the next step of every cell.
+On 8-connected grids the distance is the number of moves, diagonal moves included.
+The path of any agent then takes one lookup per step, instead of a search per agent. Flow fields are cached
+on the Grid for every goal, and computed again once the maze changes.
+
+Usage:
+    from flow_field import flow_field
+
+    field = flow_field(grid)                    # Towards the maze's 'X'
+    path = field.path(3, 4)                     # From (3, 4) to the 'X'
+"""
+from array import array
+
+from grid import as_grid
+
+NONE = 255                                      # Direction of the goal, unreachable cells and walls
+
+
+class FlowField:
+    """
+    Distance to a goal and direction of the next step towards it, for every cell of a grid.
+
+    Parameters:
+        grid (Grid) - The maze.
+        goal (int) - The index of the goal cell.
+
+    Attributes:
+        grid (Grid) - The maze.
+        goal (int) - The index of the goal cell.
+        version (int) - The version of the grid the field was computed for.
+        distance (array) - The number of moves from every cell to the goal, -1 if the goal can't be reached.
+        direction (bytearray) - The next move of every cell towards the goal, as an index into grid.moves, NONE if there is none.
+        reached (int) - The number of cells that can reach the goal, the goal included.
+    """
+
+    def __init__(self, grid, goal):
+        if grid.cells[goal]:
+            raise ValueError(f"The goal {grid.position(goal)} is a wall")
+        self.grid = grid
+        self.goal = goal
+        self.version = grid.version
+
+        cells = grid.cells
+        distance = array("i", [-1]) * grid.size
+        direction = bytearray([NONE]) * grid.size
+        offsets = [move[0] for move in grid.moves]
+        # Moves away from the goal, with the index of the opposite move back towards it
+        steps = [(offset, side_a, side_b, offsets.index(-offset)) for offset, cost, side_a, side_b in grid.moves]
+
+        distance[goal] = 0
+        frontier = [goal]
+        depth = 0
+        reached = 1
+        while frontier:                         # Expand one wavefront at a time
+            depth += 1
+            wavefront = []
+            for cell in frontier:
+                for offset, side_a, side_b, opposite in steps:
+                    neighbor = cell + offset
+                    if distance[neighbor] < 0 and not cells[neighbor] and not (side_a and grid.corner_blocked(cell, side_a, side_b)):
+                        distance[neighbor] = depth
+                        direction[neighbor] = opposite
+                        wavefront.append(neighbor)
+            reached += len(wavefront)
+            frontier = wavefront
+
+        self.distance = distance
+        self.direction = direction
+        self.reached = reached
+
+    def distance_to_goal(self, row, col):
+        """Returns the number of steps from (row, col) to the goal, or None if the goal can't be reached."""
+        distance = self.distance[self.grid.index(row, col)]
+        return distance if distance >= 0 else None
+
+    def path(self, row, col):
+        """
+        Follows the field from (row, col) to the goal.
+
+        Returns:
+            list - The (row, col) positions of the path, from (row, col) to the goal, or an empty list if the goal can't be reached.
+        """
+        grid = self.grid
+        node = grid.index(row, col)
+        if self.distance[node] < 0:
+            return []
+        moves, direction = grid.moves, self.direction
+        path = [node]
+        while node != self.goal:
+            node += moves[direction[node]][0]
+            path.append(node)
+        return grid.positions(path)
+
+
+def flow_field(maze, goal=None):
+    """
+    Returns the flow field of a maze towards a goal, cached on the grid until its cells change.
+
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        goal (tuple, optional) - The (row, col) position of the goal, the maze's 'X' by default.
+
+    Returns:
+        FlowField - The flow field.
+    """
+    grid = as_grid(maze)
+    goal = grid.end if goal is None else grid.index(*goal)
+    return grid.derived(("flow_field", goal), lambda grid: FlowField(grid, goal))
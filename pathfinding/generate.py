@@ -0,0 +1,110 @@
+"""
+Fast, seeded random maze generators for very large grids.
+
+The generators of path_finder build a 2D list one cell at a time, which takes minutes for a 10k x 10k maze.
+These generate the same kinds of mazes straight into the cells of a Grid, a whole row per operation: the
+random cells of a row come from a single randbytes() call, turned into walls and open cells by bytes.translate().
+Given a seed the mazes are reproducible, and given a path they are written straight into a memory-mapped maze file.
+
+Usage:
+    from generate import random_maze
+
+    grid = random_maze(10000, 10000, seed=42)                           # In memory
+    grid = random_maze(10000, 10000, seed=42, path="random.maze")       # Mapped on a maze file, see maze_file.py
+"""
+import random
+
+from grid import Grid, OPEN, WALL
+from maze_file import create_maze
+
+
+def _random(seed):
+    """Returns the random generator of a seed, or the seed itself if it already is a generator."""
+    return seed if isinstance(seed, random.Random) else random.Random(seed)
+
+
+def _new_grid(rows, cols, start, end, path):
+    """Returns an empty grid with the start and end markers, mapped on a new maze file if a path is given."""
+    if start == end:                                    # The end marker overwrites the start marker
+        start = None
+    if path:
+        return create_maze(path, rows, cols, start, end)
+    grid = Grid(rows, cols)
+    grid.start = grid.index(*start) if start is not None else None
+    grid.end = grid.index(*end) if end is not None else None
+    return grid
+
+
+def random_maze(rows, cols, p=0.3, seed=None, path=None):
+    """
+    Generates a random maze, like path_finder.random_maze(), as a Grid.
+
+    Parameters:
+        rows (int) - The number of rows of random cells, the maze has a wall border around them.
+        cols (int) - The number of columns of random cells.
+        p (float) - The probability of a cell being a wall, rounded to a multiple of 1/256. Default is 0.3.
+        seed (int or Random, optional) - The seed of the random generator, or the generator itself. Not seeded by default.
+        path (str, optional) - Write the maze to a new maze file at this path, and return it mapped on the file.
+
+    Returns:
+        Grid - The maze of rows + 2 by cols + 2 cells, with the start 'O' in the top left corner and the end 'X' in the bottom right corner.
+    """
+    rng = _random(seed)
+    threshold = round(p * 256)
+    table = bytes(WALL if value < threshold else OPEN for value in range(256))     # Random byte to cell
+
+    grid = _new_grid(rows + 2, cols + 2, (1, 2), (rows, cols - 1), path)
+    cells = grid.cells
+    border = bytes([WALL])
+    for row in range(1, rows + 1):
+        index = grid.index(row, 0)
+        cells[index:index + cols + 2] = border + rng.randbytes(cols).translate(table) + border
+
+    wall_row = border * (cols + 2)                      # Top and bottom borders of the maze
+    for row in (0, rows + 1):
+        index = grid.index(row, 0)
+        cells[index:index + cols + 2] = wall_row
+
+    for marker in (grid.start, grid.end):
+        if marker is not None:
+            cells[marker] = OPEN
+    return grid
+
+
+def random_grid_maze(rows, cols, seed=None, path=None):
+    """
+    Generates a random grid maze, like path_finder.random_grid_maze(), as a Grid.
+    With the same seed, both generate the same maze.
+
+    Parameters:
+        rows (int) - The number of rows in the maze.
+        cols (int) - The number of columns in the maze.
+        seed (int or Random, optional) - The seed of the random generator, or the generator itself. Not seeded by default.
+        path (str, optional) - Write the maze to a new maze file at this path, and return it mapped on the file.
+
+    Returns:
+        Grid - The maze, with walls on its border and on every cell with an even row and column, and the start 'O'
+            and end 'X' at random positions.
+    """
+    rng = _random(seed)
+    start = (rng.randint(1, rows - 2), rng.randint(1, cols - 2))
+    end = (rng.randint(1, rows - 2), rng.randint(1, cols - 2))
+    grid = _new_grid(rows, cols, start, end, path)
+
+    # Every row is one of three patterns
+    wall_row = bytes([WALL]) * cols
+    even_row = bytes(WALL if col % 2 == 0 or col == cols - 1 else OPEN for col in range(cols))
+    odd_row = bytes(WALL if col in (0, cols - 1) else OPEN for col in range(cols))
+
+    cells = grid.cells
+    for row in range(rows):
+        index = grid.index(row, 0)
+        if row in (0, rows - 1):
+            cells[index:index + cols] = wall_row
+        else:
+            cells[index:index + cols] = even_row if row % 2 == 0 else odd_row
+
+    for marker in (grid.start, grid.end):
+        if marker is not None:
+            cells[marker] = OPEN
+    return grid
@@ -0,0 +1,300 @@
+"""
+Compact grid representation for the 2D path finding algorithms.
+
+The maze is stored as a flat, row-major bytearray with one byte per cell (0 open, 1 wall),
+surrounded by a border of walls. Cells are addressed by their flat index, and the four
+neighbors of a cell are found by adding the precomputed offsets, so the solvers never
+allocate tuples or check bounds while searching.
+"""
+import hashlib
+import math
+from array import array
+
+OPEN = 0
+WALL = 1
+
+# Translation table from maze characters to cell values, only '#' is a wall
+_CELL_TABLE = bytes(WALL if chr(i) == "#" else OPEN for i in range(256))
+
+# Buffers of a Workspace and their array type codes
+_BUFFERS = {"seen": "I", "closed": "I", "parent": "i", "g_score": "i",
+            "seen_back": "I", "closed_back": "I", "parent_back": "i", "g_score_back": "i",
+            "g_cost": "d", "g_cost_back": "d"}
+_STAMPS = [name for name, typecode in _BUFFERS.items() if typecode == "I"]     # Generation stamped buffers
+_MAX_GENERATION = 2**32 - 1
+
+CONNECTIVITY = (4, 8)
+# Diagonal moves between two walls: never allowed, allowed past one wall, or always allowed
+CORNER_CUTTING = ("never", "one", "always")
+
+
+class Grid:
+    """
+    A maze as a flat bytearray of cells with a wall border.
+
+    Attributes:
+        rows (int) - The number of rows in the maze, without the border.
+        cols (int) - The number of columns in the maze, without the border.
+        width (int) - The number of columns in the stored grid, including the border.
+        size (int) - The number of cells in the stored grid, including the border.
+        cells (bytearray) - The cells in row-major order, 0 for open cells and 1 for walls.
+        start (int) - The index of the start cell 'O', or None.
+        end (int) - The index of the end cell 'X', or None.
+        offsets (tuple) - The index offsets of the UP, DOWN, LEFT and RIGHT neighbors.
+        connectivity (int) - 4 for moves up, down, left and right, 8 for diagonal moves as well.
+        corner_cutting (str) - When diagonal moves may pass the corner of a wall, one of CORNER_CUTTING.
+        moves (tuple) - The (offset, cost, side_a, side_b) of every move, the sides being the offsets of the two cells
+            a diagonal move passes between, checked against the corner cutting rule, and 0 when there is nothing to check.
+        costs (bytearray) - The cost of a step onto every cell, from 1 to 255, or None if every step costs 1.
+        version (int) - Incremented by every change made with set_cell().
+    """
+
+    def __init__(self, rows, cols, cells=None, start=None, end=None, costs=None):
+        self.rows = rows
+        self.cols = cols
+        self.width = cols + 2
+        self.size = (rows + 2) * self.width
+
+        if cells is None:                                   # All open, inside a wall border
+            cells = bytearray([WALL]) * self.size
+            inner = bytes(cols)
+            for row in range(1, rows + 1):
+                cells[row * self.width + 1:row * self.width + 1 + cols] = inner
+        self.cells = cells
+
+        self.start = start
+        self.end = end
+        self.offsets = (-self.width, self.width, -1, 1)     # UP, DOWN, LEFT, RIGHT
+        self.costs = costs
+        self._set_moves(4, "never")
+        self.version = 0
+        self._derived = {}                                  # Data computed from the cells, dropped when they change
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_derived"] = {}                              # Cheaper to compute again than to send
+        return state
+
+    @classmethod
+    def from_maze(cls, maze, cost_table=None):
+        """
+        Converts a maze given as a 2D list of characters into a Grid.
+
+        Parameters:
+            maze (list) - A 2D list representing the maze, '#' for walls, 'O' for the start and 'X' for the end.
+            cost_table (dict, optional) - The cost of a step onto the cells of every character, such as {'~': 5}, the
+                other characters cost 1. Every step costs 1 by default.
+
+        Returns:
+            Grid - The converted maze.
+        """
+        rows, cols = len(maze), len(maze[0])
+        grid = cls(rows, cols)
+        if cost_table:
+            if not all(1 <= cost <= 255 for cost in cost_table.values()):
+                raise ValueError("Step costs range from 1 to 255")
+            table = bytes(cost_table.get(chr(i), 1) for i in range(256))   # Translation table from characters to costs
+            grid.costs = bytearray([1]) * grid.size
+        for row, values in enumerate(maze):
+            line = "".join(values)
+            if len(line) != cols:                           # Slice assignment would resize the cells instead
+                raise ValueError(f"Row {row} has {len(line)} columns, expected {cols}")
+            index = grid.index(row, 0)
+            grid.cells[index:index + cols] = encode_row(line)
+            if cost_table:
+                grid.costs[index:index + cols] = line.encode("latin-1", "replace").translate(table)
+
+            if grid.start is None and "O" in line:          # First start marker, row-major like find_val
+                grid.start = index + line.index("O")
+            if grid.end is None and "X" in line:            # First end marker
+                grid.end = index + line.index("X")
+        return grid
+
+    def to_maze(self):
+        """
+        Converts the grid back into a 2D list of characters.
+
+        Returns:
+            list - A 2D list representing the maze, '#' for walls, ' ' for paths, 'O' for the start and 'X' for the end.
+        """
+        maze = []
+        for row in range(self.rows):
+            index = self.index(row, 0)
+            maze.append(["#" if cell else " " for cell in self.cells[index:index + self.cols]])
+        if self.start is not None:
+            row, col = self.position(self.start)
+            maze[row][col] = "O"
+        if self.end is not None:
+            row, col = self.position(self.end)
+            maze[row][col] = "X"
+        return maze
+
+    def index(self, row, col):
+        """Returns the flat index of the cell at (row, col)."""
+        return (row + 1) * self.width + col + 1
+
+    def position(self, index):
+        """Returns the (row, col) position of the cell at a flat index."""
+        row, col = divmod(index, self.width)
+        return row - 1, col - 1
+
+    def positions(self, indices):
+        """Returns the (row, col) positions of a sequence of flat indices."""
+        width = self.width
+        return [(index // width - 1, index % width - 1) for index in indices]
+
+    def is_wall(self, row, col):
+        """Returns True if the cell at (row, col) is a wall, or outside the maze."""
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return True
+        return self.cells[self.index(row, col)] == WALL
+
+    def set_cell(self, row, col, value):
+        """
+        Changes the cell at (row, col) to OPEN or WALL, and drops the data computed from the cells.
+        Changes made to the cells directly are not tracked, they must be followed by a call to changed().
+        """
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(f"Cell {(row, col)} is outside the maze")
+        index = self.index(row, col)
+        if self.cells[index] != value:
+            self.cells[index] = value
+            self.changed()
+
+    def set_cost(self, row, col, cost):
+        """Changes the cost of a step onto the cell at (row, col), from 1 to 255, and drops the data computed from the cells."""
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise IndexError(f"Cell {(row, col)} is outside the maze")
+        if not 1 <= cost <= 255:
+            raise ValueError(f"Step costs range from 1 to 255, not {cost}")
+        if self.costs is None:
+            self.costs = bytearray([1]) * self.size
+        self.costs[self.index(row, col)] = cost
+        self.changed()
+
+    def set_connectivity(self, connectivity=4, corner_cutting="never"):
+        """
+        Changes the moves of the searches, and drops the data computed from the cells.
+
+        Parameters:
+            connectivity (int) - 4 for moves up, down, left and right, 8 for diagonal moves as well, that cost sqrt(2). Default is 4.
+            corner_cutting (str) - Diagonal moves between two open cells only with "never" (the default), past at most
+                one wall with "one", or even between two walls with "always".
+        """
+        if connectivity not in CONNECTIVITY:
+            raise ValueError(f"Connectivity is 4 or 8, not {connectivity}")
+        if corner_cutting not in CORNER_CUTTING:
+            raise ValueError(f"Corner cutting is one of {', '.join(CORNER_CUTTING)}, not {corner_cutting!r}")
+        self._set_moves(connectivity, corner_cutting)
+        self.changed()
+
+    def _set_moves(self, connectivity, corner_cutting):
+        """Builds the table of moves."""
+        up, down, left, right = self.offsets
+        moves = [(offset, 1, 0, 0) for offset in self.offsets]
+        if connectivity == 8:
+            for vertical in (up, down):
+                for horizontal in (left, right):
+                    sides = (0, 0) if corner_cutting == "always" else (vertical, horizontal)
+                    moves.append((vertical + horizontal, math.sqrt(2), *sides))
+        self.connectivity = connectivity
+        self.corner_cutting = corner_cutting
+        self.moves = tuple(moves)
+
+    def corner_blocked(self, index, side_a, side_b):
+        """Returns True if the corner cutting rule forbids the diagonal move from a cell between the cells at index + side_a and index + side_b."""
+        cells = self.cells
+        if self.corner_cutting == "never":
+            return bool(cells[index + side_a] or cells[index + side_b])
+        return bool(cells[index + side_a] and cells[index + side_b])
+
+    def changed(self):
+        """Records a change of the cells, drops the data computed from them."""
+        self.version += 1
+        self._derived.clear()
+
+    def has_derived(self, key):
+        """Returns True if the data named key is cached."""
+        return key in self._derived
+
+    def derived(self, key, build):
+        """
+        Returns data computed from the cells, cached until the cells change.
+
+        Parameters:
+            key (hashable) - The name of the data, and its parameters.
+            build (function) - Called as build(grid) to compute the data when it is not cached.
+        """
+        if key not in self._derived:
+            self._derived[key] = build(self)
+        return self._derived[key]
+
+    def content_hash(self):
+        """Returns a hex digest of the size, the moves, the cells and the costs of the maze, computed once and cached until the cells change."""
+        def build(grid):
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(f"{grid.rows}x{grid.cols}/{grid.connectivity}/{grid.corner_cutting}:".encode())
+            digest.update(grid.cells)
+            if grid.costs is not None:
+                digest.update(grid.costs)
+            return digest.hexdigest()
+        return self.derived(("content_hash",), build)
+
+    def neighbors(self, index):
+        """Returns the indices of the open neighbors of a cell, the diagonal ones included with 8-connectivity."""
+        cells = self.cells
+        return [index + offset for offset, cost, side_a, side_b in self.moves
+                if not cells[index + offset] and not (side_a and self.corner_blocked(index, side_a, side_b))]
+
+
+class Workspace:
+    """
+    Search buffers of a grid, reused across searches so that a search does not pay for allocating and clearing them.
+
+    The seen and closed buffers hold generation stamps: a cell is marked in the current search when its stamp
+    equals the current generation, so starting a new search only increments the generation. The parent and
+    g-score buffers are only read for marked cells, and are never cleared. Buffers are allocated on first use.
+
+    Attributes:
+        size (int) - The number of cells of the grid, including the border.
+        generation (int) - The generation of the current search.
+        seen (array) - The generation stamp of every reached cell.
+        closed (array) - The generation stamp of every expanded cell.
+        parent (array) - The parent index of every reached cell.
+        g_score (array) - The cost from the start to every reached cell.
+        seen_back, closed_back, parent_back, g_score_back (array) - The same buffers, for the backward half of bidirectional searches.
+        g_cost, g_cost_back (array) - Floating point g-scores, for the sqrt(2) diagonal moves of 8-connected grids.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.generation = 0
+
+    def __getattr__(self, name):                            # Only called for buffers that are not allocated yet
+        if name not in _BUFFERS:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        buffer = array(_BUFFERS[name], [0]) * self.size
+        setattr(self, name, buffer)
+        return buffer
+
+    def begin(self):
+        """Starts a new search, and returns its generation."""
+        self.generation += 1
+        if self.generation > _MAX_GENERATION:               # The stamps wrapped around, clear them
+            for name in _STAMPS:
+                if name in self.__dict__:
+                    setattr(self, name, array("I", [0]) * self.size)
+            self.generation = 1
+        return self.generation
+
+
+def encode_row(line):
+    """Returns the cell values of a maze row given as a string, as bytes."""
+    return line.encode("latin-1", "replace").translate(_CELL_TABLE)
+
+
+def as_grid(maze):
+    """Returns the maze as a Grid, converting it if it is a 2D list."""
+    if isinstance(maze, Grid):
+        return maze
+    return Grid.from_maze(maze)
@@ -0,0 +1,308 @@
+"""
+Hierarchical path finding (HPA*) for huge mazes.
+
+The grid is split into square clusters. Wherever two neighboring clusters share a run of open cells on their
+border, the run gets one entrance, or one at each end if it is long, and the cells on both sides of an entrance
+become nodes of an abstract graph, joined by an edge of cost 1. Within every cluster, the nodes are joined by
+edges weighted by their distance inside the cluster. A query links the start and the end to the nodes of their
+clusters, searches the small abstract graph with A*, and only searches the grid again inside the clusters the
+abstract path goes through, to turn it into cells. The paths are near-optimal, not always the shortest.
+
+The abstract graph is built once per maze and cluster size, cached on the Grid, and for mazes loaded from a
+maze file, saved next to it as "<maze file>.hpa" and loaded from there by the next runs.
+"""
+import os
+import struct
+import zlib
+from array import array
+from collections import deque
+
+from grid import as_grid
+from open_set import OpenSet
+
+MAGIC = b"HPA*"
+VERSION = 1
+LONG_ENTRANCE = 6                                   # Runs of open cells this long get an entrance at each end
+
+_HEADER = struct.Struct("<4sBBHIIIII")              # Magic, version, unused, cluster size, rows, cols, cells checksum, nodes, edges
+
+
+class AbstractGraph:
+    """
+    Abstract graph of the entrances between the clusters of a grid, stored as adjacency arrays.
+
+    Parameters:
+        grid (Grid) - The maze.
+        cluster_size (int) - The number of rows and columns of the clusters.
+        nodes (array, optional) - The cell index of every node, sorted. Built from the grid when not given.
+        offsets (array, optional) - The first edge of every node in targets and costs, and the number of edges at the end.
+        targets (array, optional) - The cell index at the other end of every edge.
+        costs (array, optional) - The cost of every edge.
+        checksum (int, optional) - The CRC-32 of the cells, already computed when the graph is loaded. Computed when not given.
+
+    Attributes:
+        grid (Grid) - The maze.
+        cluster_size (int) - The number of rows and columns of the clusters.
+        checksum (int) - The CRC-32 of the cells the graph was built for.
+        nodes, offsets, targets, costs (array) - The graph, as above.
+    """
+
+    def __init__(self, grid, cluster_size, nodes=None, offsets=None, targets=None, costs=None, checksum=None):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.checksum = checksum if checksum is not None else zlib.crc32(grid.cells)
+        if nodes is None:
+            nodes, offsets, targets, costs = self._build()
+        self.nodes, self.offsets, self.targets, self.costs = nodes, offsets, targets, costs
+        self._node_ids = {node: i for i, node in enumerate(nodes)}
+
+    def cluster_bounds(self, index):
+        """Returns the (first row, first col, last row + 1, last col + 1) of the cluster of the cell at an index."""
+        grid, size = self.grid, self.cluster_size
+        row, col = grid.position(index)
+        row, col = row - row % size, col - col % size
+        return row, col, min(row + size, grid.rows), min(col + size, grid.cols)
+
+    def edges(self, node):
+        """Returns the (target, cost) edges of a node, none if the cell is not a node."""
+        i = self._node_ids.get(node)
+        if i is None:
+            return []
+        first, last = self.offsets[i], self.offsets[i + 1]
+        return zip(self.targets[first:last], self.costs[first:last])
+
+    def _build(self):
+        """Finds the entrances and the distances between them inside every cluster, returns the adjacency arrays."""
+        grid, size = self.grid, self.cluster_size
+        cells = grid.cells
+        adjacency = {}                              # Cost of the edges of every node, as {node: {target: cost}}
+
+        def link(a, b, cost):
+            for u, v in ((a, b), (b, a)):
+                edges = adjacency.setdefault(u, {})
+                if cost < edges.get(v, cost + 1):
+                    edges[v] = cost
+
+        def add_entrances(pairs):
+            """Adds the entrances of a border, given as the (inside, outside) cell pairs along it."""
+            run = []
+            for a, b in pairs + [(None, None)]:
+                if a is not None and not cells[a] and not cells[b]:
+                    run.append((a, b))
+                    continue
+                if run:                             # End of a run of open pairs
+                    for a_, b_ in ([run[0], run[-1]] if len(run) >= LONG_ENTRANCE else [run[len(run) // 2]]):
+                        link(a_, b_, 1)
+                    run = []
+
+        # Entrances on the right and bottom border of every cluster
+        for row in range(0, grid.rows, size):
+            for col in range(0, grid.cols, size):
+                last_row, last_col = min(row + size, grid.rows), min(col + size, grid.cols)
+                if last_col < grid.cols:
+                    add_entrances([(grid.index(r, last_col - 1), grid.index(r, last_col)) for r in range(row, last_row)])
+                if last_row < grid.rows:
+                    add_entrances([(grid.index(last_row - 1, c), grid.index(last_row, c)) for c in range(col, last_col)])
+
+        # Distances between the nodes of every cluster
+        clusters = {}
+        for node in adjacency:
+            clusters.setdefault(self.cluster_bounds(node), []).append(node)
+        for bounds, members in clusters.items():
+            for i, node in enumerate(members[:-1]):
+                distance = cluster_distances(grid, node, bounds)
+                for other in members[i + 1:]:
+                    if other in distance:
+                        link(node, other, distance[other])
+
+        # Adjacency arrays, sorted by node
+        nodes, offsets, targets, costs = array("i"), array("i", [0]), array("i"), array("i")
+        for node in sorted(adjacency):
+            nodes.append(node)
+            for target, cost in sorted(adjacency[node].items()):
+                targets.append(target)
+                costs.append(cost)
+            offsets.append(len(targets))
+        return nodes, offsets, targets, costs
+
+    def save(self, path):
+        """Writes the graph to a file."""
+        grid = self.grid
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, 0, self.cluster_size, grid.rows, grid.cols, self.checksum,
+                                 len(self.nodes), len(self.targets)))
+            for values in (self.nodes, self.offsets, self.targets, self.costs):
+                values.tofile(f)
+
+    @classmethod
+    def load(cls, path, grid, cluster_size):
+        """
+        Reads a graph from a file.
+
+        Returns:
+            AbstractGraph - The graph, or None if the file is missing, invalid, or was built for other cells or another cluster size.
+        """
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return None
+                magic, version, _, size, rows, cols, checksum, node_count, edge_count = _HEADER.unpack(header)
+                if (magic, version, size, rows, cols) != (MAGIC, VERSION, cluster_size, grid.rows, grid.cols):
+                    return None
+                if checksum != zlib.crc32(grid.cells):
+                    return None
+                arrays = []
+                for count in (node_count, node_count + 1, edge_count, edge_count):
+                    values = array("i")
+                    values.fromfile(f, count)
+                    arrays.append(values)
+        except (OSError, EOFError):
+            return None
+        return cls(grid, cluster_size, *arrays, checksum=checksum)     # Checked above, not hashed again
+
+
+def cluster_distances(grid, source, bounds, target=None):
+    """
+    Breadth-first search from a cell, without leaving its cluster.
+
+    Parameters:
+        grid (Grid) - The maze.
+        source (int) - The index of the first cell.
+        bounds (tuple) - The (first row, first col, last row + 1, last col + 1) of the cluster.
+        target (int, optional) - Stop once this cell is reached.
+
+    Returns:
+        dict - The parent of every reached cell, the distance of every reached cell if there is no target.
+    """
+    cells, offsets, width = grid.cells, grid.offsets, grid.width
+    first_row, first_col, last_row, last_col = bounds
+    low, high = grid.index(first_row, 0), grid.index(last_row, 0)      # Index range of the rows of the cluster
+    first_col, last_col = first_col + 1, last_col + 1                  # Columns of the padded grid
+
+    reached = {source: 0 if target is None else None}
+    q = deque([source])
+    while q:
+        current = q.popleft()
+        if current == target:
+            break
+        for offset in offsets:
+            neighbor = current + offset
+            if neighbor in reached or cells[neighbor] or not low <= neighbor < high or not first_col <= neighbor % width < last_col:
+                continue
+            reached[neighbor] = reached[current] + 1 if target is None else current
+            q.append(neighbor)
+    return reached
+
+
+def abstract_graph(maze, cluster_size=16, path=None):
+    """
+    Returns the abstract graph of a maze, cached on the grid until its cells change.
+
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        cluster_size (int) - The number of rows and columns of the clusters. Default is 16.
+        path (str, optional) - The file the graph is loaded from, or saved to once built.
+            Defaults to "<maze file>.hpa" for mazes loaded from a maze file, no file otherwise.
+
+    Returns:
+        AbstractGraph - The graph.
+    """
+    grid = as_grid(maze)
+    if grid.connectivity != 4:
+        raise ValueError("HPA* builds its clusters for moves in the four directions, it needs a 4-connected grid")
+    if grid.costs is not None:
+        raise ValueError("HPA* counts every step as 1, it needs a grid without step costs")
+    if path is None and getattr(grid, "path", None):
+        path = grid.path + ".hpa"
+
+    def build(grid):
+        graph = AbstractGraph.load(path, grid, cluster_size) if path and os.path.exists(path) else None
+        if graph is None:
+            graph = AbstractGraph(grid, cluster_size)
+            if path:
+                try:
+                    graph.save(path)
+                except OSError:                     # Read-only directory, the graph is only cached in memory
+                    pass
+        return graph
+    return grid.derived(("hpa", cluster_size), build)
+
+
+def find_path(graph, start, end):
+    """
+    Finds a path between two cells with the abstract graph.
+
+    Parameters:
+        graph (AbstractGraph) - The abstract graph of the maze.
+        start (int) - The start index.
+        end (int) - The end index.
+
+    Returns:
+        list - The indices of the cells of the path, or None if there is no path.
+        list - The indices of the abstract nodes expanded by the search.
+    """
+    grid = graph.grid
+    start_bounds, end_bounds = graph.cluster_bounds(start), graph.cluster_bounds(end)
+
+    # Link the start and the end to the nodes of their clusters
+    nodes = graph._node_ids                         # Membership of the abstract nodes, without copying them
+    start_distance = cluster_distances(grid, start, start_bounds)
+    start_links = {node: cost for node, cost in start_distance.items() if node in nodes or node == end}
+    end_distance = cluster_distances(grid, end, end_bounds)
+    end_links = {node: cost for node, cost in end_distance.items() if node in nodes}
+
+    # A* over the abstract graph
+    end_row, end_col = grid.position(end)
+    def h(node):
+        row, col = grid.position(node)
+        return abs(row - end_row) + abs(col - end_col)
+
+    open_set = OpenSet()
+    open_set.push(start, h(start))
+    g_score, parent = {start: 0}, {}
+    closed = set()
+    expanded = []
+    found = False
+    while open_set:
+        current = open_set.pop()[0]
+        if current == end:
+            found = True
+            break
+        closed.add(current)
+        expanded.append(current)
+
+        edges = list(graph.edges(current))
+        if current == start:
+            edges += start_links.items()
+        if current in end_links:
+            edges.append((end, end_links[current]))
+        for neighbor, cost in edges:
+            if neighbor in closed or neighbor == current:
+                continue
+            tentative_g_score = g_score[current] + cost
+            if tentative_g_score < g_score.get(neighbor, tentative_g_score + 1):
+                g_score[neighbor] = tentative_g_score
+                parent[neighbor] = current
+                open_set.push(neighbor, tentative_g_score + h(neighbor), h(neighbor))
+    if not found:
+        return None, expanded
+
+    abstract_path = [end]
+    while abstract_path[-1] != start:
+        abstract_path.append(parent[abstract_path[-1]])
+    abstract_path.reverse()
+
+    # Refine every abstract edge into cells, searching only the cluster it crosses
+    path = [start]
+    for a, b in zip(abstract_path, abstract_path[1:]):
+        if b - a in grid.offsets:                   # Neighbors, between two clusters or inside one
+            path.append(b)
+            continue
+        bounds = start_bounds if a == start else end_bounds if b == end else graph.cluster_bounds(a)
+        came_from = cluster_distances(grid, a, bounds, target=b)
+        segment = [b]
+        while segment[-1] != a:
+            segment.append(came_from[segment[-1]])
+        path.extend(reversed(segment[:-1]))
+    return path, expanded
@@ -0,0 +1,219 @@
+"""
+Incremental replanning with D* Lite, for mazes whose cells toggle between open and wall while agents move.
+
+D* Lite searches backwards from the end, and keeps for every cell it touched the distance to the end (g) and a
+one-step lookahead of it (rhs). After a batch of cell changes, only the cells whose distance may have changed are
+made inconsistent and queued again, so repairing the path touches the region around the changes instead of
+searching the whole maze again. It follows the moves of the grid, diagonal moves cost sqrt(2) on 8-connected grids,
+and on weighted grids every move costs the cost of the cell it enters. The agent can also move along the path: the
+priorities of the queued cells are kept valid by adding the distance moved to an offset (km) instead of rebuilding
+the queue.
+
+Usage:
+    from incremental import IncrementalPlanner
+
+    planner = IncrementalPlanner(grid)
+    path = planner.path()
+    path, expansions = planner.update([(4, 7, WALL), (5, 2, OPEN)])
+    path, expansions = planner.move(path[1])
+"""
+import math
+
+from grid import OPEN, WALL, as_grid
+from open_set import OpenSet
+from path_finder import heuristic, search_endpoints
+
+INF = math.inf
+EPS = 1e-9                                          # Tolerance of the comparisons of distances, sums of sqrt(2) moves are rounded
+
+
+def _less(a, b):
+    """Returns True if the key a is lower than the key b, by more than the rounding of their distances."""
+    if a[0] < b[0] - EPS:
+        return True
+    return a[0] <= b[0] + EPS and a[1] < b[1] - EPS
+
+
+def _consistent(g, rhs):
+    """Returns True if a distance and its lookahead are equal, up to their rounding."""
+    return g == rhs or abs(g - rhs) <= EPS
+
+
+class IncrementalPlanner:
+    """
+    D* Lite planner that repairs its path after changes to the maze.
+
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid. A list is converted once,
+            and the planner changes the cells of the Grid.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        heuristic_type (str, optional) - The heuristic between cells, one of those of path_finder.heuristic().
+            Default is "manhattan" on 4-connected grids, and "octile" on 8-connected ones, where manhattan overestimates.
+
+    Attributes:
+        grid (Grid) - The maze.
+        start (int) - The index of the start cell, where the agent is.
+        end (int) - The index of the end cell.
+        expansions (int) - The total number of cells expanded since the planner was created.
+    """
+
+    def __init__(self, maze, start=None, end=None, heuristic_type=None):
+        self.grid = as_grid(maze)
+        self.start, self.end = search_endpoints(self.grid, start, end)
+        if self.start is None or self.end is None:
+            raise ValueError("The maze has no start or no end")
+        self.heuristic_type = heuristic_type or ("manhattan" if self.grid.connectivity == 4 else "octile")
+        self.expansions = 0
+
+        self._g = {}                                # Distance to the end of every cell, INF when missing
+        self._rhs = {self.end: 0}                   # One-step lookahead of g, INF when missing
+        self._km = 0                                # Sum of the heuristic distances the start moved
+        self._open = OpenSet()                      # Inconsistent cells, by their (key, tie-break key)
+        self._open.push(self.end, self._key(self.end))
+        self._planned = False
+
+    def _h(self, node):
+        """Returns the heuristic distance between the start and a cell."""
+        return heuristic(self.grid.position(self.start), self.grid.position(node), self.heuristic_type)
+
+    def _key(self, node):
+        """Returns the priority of a cell, as (min(g, rhs) + h + km, min(g, rhs))."""
+        distance = min(self._g.get(node, INF), self._rhs.get(node, INF))
+        return (distance + self._h(node) + self._km, distance)
+
+    def _moves(self, node):
+        """
+        Yields the (neighbor, cost) of the moves from a cell to its open neighbors. On weighted grids, a move costs
+        the cost of the cell it enters, as in path_finder.a_star().
+        """
+        grid = self.grid
+        cells, costs = grid.cells, grid.costs
+        for offset, cost, side_a, side_b in grid.moves:
+            neighbor = node + offset
+            if not cells[neighbor] and not (side_a and grid.corner_blocked(node, side_a, side_b)):
+                yield neighbor, costs[neighbor] * cost if costs is not None else cost
+
+    def _update_cell(self, node):
+        """Computes the lookahead of a cell from its neighbors, and queues it if it is inconsistent."""
+        g = self._g
+        if node != self.end:
+            rhs = INF
+            if not self.grid.cells[node]:           # Walls have no edges
+                for neighbor, cost in self._moves(node):
+                    if g.get(neighbor, INF) + cost < rhs:
+                        rhs = g.get(neighbor, INF) + cost
+            self._rhs[node] = rhs
+        self._open.discard(node)
+        if not _consistent(g.get(node, INF), self._rhs.get(node, INF)):
+            self._open.push(node, self._key(node))
+
+    def _compute(self):
+        """Expands the inconsistent cells until the distance of the start is known, returns the number of expansions."""
+        g, rhs, open_set = self._g, self._rhs, self._open
+        start = self.start
+        expansions = 0
+        while open_set:
+            node, key = open_set.peek()
+            if not _less(key, self._key(start)) and _consistent(rhs.get(start, INF), g.get(start, INF)):
+                break
+            open_set.pop()
+            expansions += 1
+
+            new_key = self._key(node)
+            if _less(key, new_key):                 # The start moved since the cell was queued
+                open_set.push(node, new_key)
+            elif g.get(node, INF) > rhs.get(node, INF) + EPS:   # Overconsistent, the distance went down
+                g[node] = rhs[node]
+                for neighbor, cost in self._moves(node):
+                    self._update_cell(neighbor)
+            else:                                   # Underconsistent, the distance went up
+                g[node] = INF
+                self._update_cell(node)
+                for neighbor, cost in self._moves(node):
+                    self._update_cell(neighbor)
+        self.expansions += expansions
+        self._planned = True
+        return expansions
+
+    def path(self):
+        """
+        Returns the shortest path from the start to the end, planning it first if needed.
+
+        Returns:
+            list - The (row, col) positions of the path, or an empty list if there is no path.
+        """
+        if not self._planned:
+            self._compute()
+        grid, g = self.grid, self._g
+        if g.get(self.start, INF) == INF:
+            return []
+
+        node = self.start
+        path = [node]
+        on_path = {node}
+        while node != self.end:                     # Follow the steepest descent of the distances
+            node = min(self._moves(node), key=lambda move: g.get(move[0], INF) + move[1])[0]
+            if node in on_path:                     # Only possible if the distances are not consistent
+                raise RuntimeError(f"The planner's distances loop at {grid.position(node)}, its state is inconsistent")
+            on_path.add(node)
+            path.append(node)
+        return grid.positions(path)
+
+    def update(self, changes):
+        """
+        Changes cells of the maze, and repairs the path.
+
+        Parameters:
+            changes (iterable) - The changes, as (row, col, value) with value OPEN or WALL. The whole batch is
+                checked first, and if any change is invalid, the error is raised before any cell is changed.
+
+        Returns:
+            list - The (row, col) positions of the new path, or an empty list if there is no path.
+            int - The number of cells expanded to repair the path.
+        """
+        grid = self.grid
+        changes = list(changes)
+        for row, col, value in changes:             # Check the whole batch before changing any cell
+            if not (0 <= row < grid.rows and 0 <= col < grid.cols):
+                raise IndexError(f"Cell {(row, col)} is outside the maze")
+            if value not in (OPEN, WALL):
+                raise ValueError(f"Invalid value {value!r} for the cell {(row, col)}, expected OPEN or WALL")
+            index = grid.index(row, col)
+            if value == WALL and index in (self.start, self.end):
+                raise ValueError(f"Can't put a wall on the {'start' if index == self.start else 'end'} {(row, col)}")
+
+        changed = []
+        for row, col, value in changes:
+            index = grid.index(row, col)
+            if grid.cells[index] != value:
+                grid.set_cell(row, col, value)
+                changed.append(index)
+
+        for index in changed:                       # The changed cells and their neighbors may have new lookaheads
+            self._update_cell(index)
+            for offset, cost, side_a, side_b in grid.moves:
+                if not grid.cells[index + offset]:
+                    self._update_cell(index + offset)
+        expansions = self._compute()
+        return self.path(), expansions
+
+    def move(self, position):
+        """
+        Moves the start, usually one step along the path as the agent advances, and repairs the path.
+
+        Parameters:
+            position (tuple) - The (row, col) position of the new start.
+
+        Returns:
+            list - The (row, col) positions of the new path, or an empty list if there is no path.
+            int - The number of cells expanded to repair the path.
+        """
+        grid = self.grid
+        if grid.is_wall(*position):
+            raise ValueError(f"The start {position} is a wall or outside the maze")
+        start = grid.index(*position)
+        self._km += self._h(start)                  # Heuristic distance from the old start to the new one
+        self.start = start
+        expansions = self._compute()
+        return self.path(), expansions
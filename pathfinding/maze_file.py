@@ -0,0 +1,244 @@
+"""
+Packed binary maze files, loaded through mmap.
+
+A maze file is a 32 byte header followed by the cells:
+
+    magic     4s    b"MAZE"
+    version   B     1
+    encoding  B     0 for one byte per cell, 1 for one bit per cell
+    reserved  H
+    rows      I     Number of rows, without the border
+    cols      I     Number of columns, without the border
+    start     2i    (row, col) of the start 'O', (-1, -1) if there is none
+    end       2i    (row, col) of the end 'X', (-1, -1) if there is none
+
+With the byte encoding the body is exactly the cells of a Grid, wall border included, so loading maps the
+file and hands a memoryview of it to the Grid: no copy is made, loading takes constant time, and the pages
+are only read from disk when the search touches them. The bit encoding is 8 times smaller on disk, one
+row at a time, each row padded to whole bytes, and is unpacked into memory when loaded.
+
+Usage:
+    python pathfinding/maze_file.py pathfinding/maze.csv maze.bin
+    python pathfinding/path_finder.py --headless --maze_file maze.bin
+"""
+import argparse
+import csv
+import mmap
+import os
+import struct
+
+from grid import Grid, WALL, as_grid, encode_row
+
+MAGIC = b"MAZE"
+VERSION = 1
+BYTE, BIT = 0, 1                                    # Encodings of the cells
+
+_HEADER = struct.Struct("<4sBBHIIiiii")
+
+# Unpacked cells of every byte of the bit encoding, most significant bit first
+_UNPACK = [bytes((value >> shift) & 1 for shift in range(7, -1, -1)) for value in range(256)]
+
+
+class MappedGrid(Grid):
+    """
+    A Grid whose cells are a memoryview of a memory-mapped maze file.
+
+    Pickling a MappedGrid only pickles its path, the file is mapped again when it is unpickled, so worker
+    processes share the pages of the file instead of receiving a copy of the maze.
+
+    Attributes:
+        path (str) - The path of the maze file.
+        writable (bool) - True if the cells can be changed.
+    """
+
+    def __init__(self, rows, cols, cells, start, end, path, writable):
+        super().__init__(rows, cols, cells, start, end)
+        self.path = path
+        self.writable = writable
+
+    def __reduce__(self):
+        settings = {"costs": self.costs, "connectivity": self.connectivity, "corner_cutting": self.corner_cutting,
+                    "moves": self.moves}        # Not stored in the file
+        if self.writable:                           # The cells may have changed, send a copy
+            return Grid, (self.rows, self.cols, bytearray(self.cells), self.start, self.end), settings
+        return load_maze, (self.path,), settings
+
+
+def _pack_header(encoding, rows, cols, start, end):
+    """Returns the header of a maze file, start and end being (row, col) positions or None."""
+    start = start if start is not None else (-1, -1)
+    end = end if end is not None else (-1, -1)
+    return _HEADER.pack(MAGIC, VERSION, encoding, 0, rows, cols, *start, *end)
+
+
+def _unpack_header(data):
+    """Returns the encoding, rows, cols, start and end of a maze file header, raises ValueError if it is invalid."""
+    if len(data) < _HEADER.size:
+        raise ValueError("Not a maze file: the file is too short")
+    magic, version, encoding, _, rows, cols, start_row, start_col, end_row, end_col = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a maze file: bad magic number")
+    if version != VERSION:
+        raise ValueError(f"Unsupported maze file version {version}")
+    if encoding not in (BYTE, BIT):
+        raise ValueError(f"Unsupported maze file encoding {encoding}")
+    start = (start_row, start_col) if start_row >= 0 else None
+    end = (end_row, end_col) if end_row >= 0 else None
+    return encoding, rows, cols, start, end
+
+
+def _pack_row(row):
+    """Packs the cell values of a row into bits, most significant bit first."""
+    padding = -len(row) % 8
+    bits = row.translate(b"01" + bytes(254)) + b"0" * padding
+    return int(bits, 2).to_bytes(len(bits) // 8, "big") if bits else b""
+
+
+def save_maze(path, maze, encoding=BYTE):
+    """
+    Writes a maze to a binary maze file.
+
+    Parameters:
+        path (str) - The path of the file to write.
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        encoding (int) - BYTE for one byte per cell, BIT for one bit per cell. Default is BYTE.
+    """
+    grid = as_grid(maze)
+    start = grid.position(grid.start) if grid.start is not None else None
+    end = grid.position(grid.end) if grid.end is not None else None
+    with open(path, "wb") as f:
+        f.write(_pack_header(encoding, grid.rows, grid.cols, start, end))
+        if encoding == BYTE:
+            f.write(grid.cells)
+        else:
+            for row in range(grid.rows):
+                index = grid.index(row, 0)
+                f.write(_pack_row(bytes(grid.cells[index:index + grid.cols])))
+
+
+def load_maze(path, writable=False):
+    """
+    Opens a binary maze file as a Grid.
+
+    Byte encoded files are memory-mapped and the Grid runs directly on the mapped buffer. Bit encoded files
+    are unpacked into a new Grid.
+
+    Parameters:
+        path (str) - The path of the maze file.
+        writable (bool) - Map the file copy-on-write so that the cells can be changed, the file itself is never changed. Default is False.
+
+    Returns:
+        Grid - The maze, a MappedGrid for byte encoded files.
+    """
+    with open(path, "rb") as f:
+        encoding, rows, cols, start, end = _unpack_header(f.read(_HEADER.size))
+        width = cols + 2
+
+        if encoding == BYTE:
+            size = (rows + 2) * width
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY if writable else mmap.ACCESS_READ)
+            if len(data) < _HEADER.size + size:
+                raise ValueError(f"Truncated maze file: {len(data) - _HEADER.size} of {size} cells")
+            cells = memoryview(data)[_HEADER.size:_HEADER.size + size]     # The mapping stays open as long as the view
+            grid = MappedGrid(rows, cols, cells, None, None, os.path.abspath(path), writable)
+        else:
+            grid = Grid(rows, cols)
+            row_bytes = -(-cols // 8)
+            for row in range(rows):
+                data = f.read(row_bytes)
+                if len(data) < row_bytes:
+                    raise ValueError(f"Truncated maze file: {row} of {rows} rows")
+                index = grid.index(row, 0)
+                grid.cells[index:index + cols] = b"".join([_UNPACK[value] for value in data])[:cols]
+
+    grid.start = grid.index(*start) if start is not None else None
+    grid.end = grid.index(*end) if end is not None else None
+    return grid
+
+
+def create_maze(path, rows, cols, start=None, end=None):
+    """
+    Creates a byte encoded maze file, and maps it as a writable Grid of open cells inside a wall border.
+    Unlike load_maze(path, writable=True), changes to the cells are written to the file.
+
+    Parameters:
+        path (str) - The path of the file to create.
+        rows (int) - The number of rows in the maze.
+        cols (int) - The number of columns in the maze.
+        start (tuple, optional) - The (row, col) position of the start 'O'.
+        end (tuple, optional) - The (row, col) position of the end 'X'.
+
+    Returns:
+        MappedGrid - The maze, mapped on the new file.
+    """
+    width = cols + 2
+    size = (rows + 2) * width
+    with open(path, "w+b") as f:
+        f.write(_pack_header(BYTE, rows, cols, start, end))
+        f.truncate(_HEADER.size + size)                 # Zero filled, all open
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE)
+
+    cells = memoryview(data)[_HEADER.size:]
+    cells[:width] = bytes([WALL]) * width               # Top and bottom borders
+    cells[size - width:] = bytes([WALL]) * width
+    for index in range(width, size, width):             # Left and right borders
+        cells[index - 1:index + 1] = bytes([WALL, WALL])
+
+    grid = MappedGrid(rows, cols, cells, None, None, os.path.abspath(path), True)
+    grid.start = grid.index(*start) if start is not None else None
+    grid.end = grid.index(*end) if end is not None else None
+    return grid
+
+
+def convert_csv(csv_path, path, encoding=BYTE):
+    """
+    Converts a maze from the CSV layout read by maze_csv() to a binary maze file, skipping blank lines.
+    The CSV is read one row at a time, so the maze never has to fit in memory.
+
+    Parameters:
+        csv_path (str) - The path of the CSV file.
+        path (str) - The path of the maze file to write.
+        encoding (int) - BYTE for one byte per cell, BIT for one bit per cell. Default is BYTE.
+    """
+    with open(csv_path, newline="") as src, open(path, "wb") as f:
+        f.write(bytes(_HEADER.size))                # Written last, once the size and the markers are known
+        rows = cols = 0
+        start = end = None
+        for values in csv.reader(src):
+            if not values:                          # Blank lines, such as a trailing one, are skipped like maze_csv() does
+                continue
+            line = "".join(values)
+            if rows == 0:
+                cols = len(values)
+                if encoding == BYTE:                # Top border
+                    f.write(bytes([WALL]) * (cols + 2))
+            elif len(values) != cols:
+                raise ValueError(f"Row {rows} has {len(values)} columns, expected {cols}")
+
+            if start is None and "O" in line:       # First start marker, row-major like find_val
+                start = (rows, line.index("O"))
+            if end is None and "X" in line:         # First end marker
+                end = (rows, line.index("X"))
+
+            row = encode_row(line)
+            if encoding == BYTE:
+                f.write(bytes([WALL]) + row + bytes([WALL]))
+            else:
+                f.write(_pack_row(row))
+            rows += 1
+
+        if rows == 0:
+            raise ValueError(f"{csv_path} has no rows")
+        if encoding == BYTE:                        # Bottom border
+            f.write(bytes([WALL]) * (cols + 2))
+        f.seek(0)
+        f.write(_pack_header(encoding, rows, cols, start, end))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a CSV maze to a binary maze file")
+    parser.add_argument("csv_path", help="CSV maze to convert")
+    parser.add_argument("path", help="Binary maze file to write")
+    parser.add_argument("--bits", action="store_true", help="Store one bit per cell instead of one byte, the file is unpacked when loaded")
+    args = parser.parse_args()
+    convert_csv(args.csv_path, args.path, BIT if args.bits else BYTE)
@@ -0,0 +1,181 @@
+"""
+Priority queues used as the open set of the informed searches (A*, Greedy Best-First Search, Dijkstra and D* Lite).
+
+OpenSet is a binary heap for any priorities. BucketQueue keeps one bucket per priority for the small integer
+priorities of Dijkstra and A* on grids with integer step costs, where pushing and popping take constant time.
+"""
+import heapq
+
+
+class OpenSet:
+    """
+    Single-threaded, heapq based priority queue with lazy deletion.
+
+    Pushing a node that is already queued replaces its entry: the old entry stays in the heap,
+    but it is recognized as stale and skipped when it reaches the top. Entries are ordered by
+    (priority, tie, node), so equal priorities are broken by the tie value and then by the node,
+    and the pop order is deterministic.
+
+    Attributes:
+        pushes (int) - The number of entries pushed.
+        stale_pops (int) - The number of stale entries skipped while popping.
+    """
+
+    def __init__(self):
+        self._heap = []         # Heap of (priority, tie, node) entries
+        self._entries = {}      # Current entry of every queued node
+        self.pushes = 0
+        self.stale_pops = 0
+
+    def push(self, node, priority, tie=0):
+        """
+        Queues a node, or updates its priority if it is already queued.
+
+        Parameters:
+            node (int) - The node to queue.
+            priority (float) - The priority of the node, lower is popped first.
+            tie (float) - Breaks ties between equal priorities, lower is popped first. Default is 0.
+        """
+        entry = (priority, tie, node)
+        self._entries[node] = entry
+        heapq.heappush(self._heap, entry)
+        self.pushes += 1
+
+    def pop(self):
+        """
+        Removes and returns the node with the lowest priority, skipping stale entries.
+
+        Returns:
+            tuple - (node, priority) of the popped node.
+        """
+        heap, entries = self._heap, self._entries
+        while heap:
+            entry = heapq.heappop(heap)
+            node = entry[2]
+            if entries.get(node) is entry:      # Current entry of the node
+                del entries[node]
+                return node, entry[0]
+            self.stale_pops += 1                # Replaced by a later push, skip
+        raise IndexError("pop from an empty open set")
+
+    def peek(self):
+        """
+        Returns the node with the lowest priority without removing it, dropping the stale entries above it.
+
+        Returns:
+            tuple - (node, priority) of the node.
+        """
+        heap, entries = self._heap, self._entries
+        while heap:
+            entry = heap[0]
+            node = entry[2]
+            if entries.get(node) is entry:
+                return node, entry[0]
+            heapq.heappop(heap)
+            self.stale_pops += 1
+        raise IndexError("peek at an empty open set")
+
+    def discard(self, node):
+        """Removes a node if it is queued, its entry is left in the heap as a stale entry."""
+        self._entries.pop(node, None)
+
+    def __contains__(self, node):
+        return node in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class BucketQueue:
+    """
+    Bucket priority queue (Dial's algorithm) for non-negative integer priorities, with lazy deletion.
+
+    Every priority has a bucket of nodes, and popping scans the buckets upwards from the lowest priority popped so
+    far. Searches pop non-decreasing priorities and push priorities at most the largest step cost above them, so
+    the scan only skips a few empty buckets and every operation takes constant time. Nodes of equal priority are
+    popped last in first out, and the tie value is ignored. Same interface as OpenSet.
+
+    Attributes:
+        pushes (int) - The number of entries pushed.
+        stale_pops (int) - The number of stale entries skipped while popping.
+    """
+
+    def __init__(self):
+        self._buckets = {}      # Nodes pushed with every priority
+        self._entries = {}      # Current priority of every queued node
+        self._lowest = 0        # No queued node has a lower priority
+        self.pushes = 0
+        self.stale_pops = 0
+
+    def push(self, node, priority, tie=0):
+        """
+        Queues a node, or updates its priority if it is already queued.
+
+        Parameters:
+            node (int) - The node to queue.
+            priority (int) - The priority of the node, lower is popped first.
+            tie (float) - Ignored, for compatibility with OpenSet.
+        """
+        self._entries[node] = priority
+        bucket = self._buckets.get(priority)
+        if bucket is None:
+            bucket = self._buckets[priority] = []
+        bucket.append(node)
+        if priority < self._lowest:
+            self._lowest = priority
+        self.pushes += 1
+
+    def _top(self):
+        """Returns the bucket of the lowest priority with a queued node, dropping the stale entries above it."""
+        buckets, entries = self._buckets, self._entries
+        while entries:
+            bucket = buckets.get(self._lowest)
+            while bucket:
+                if entries.get(bucket[-1]) == self._lowest:     # Current entry of the node
+                    return bucket
+                bucket.pop()
+                self.stale_pops += 1
+            if bucket is not None:
+                del buckets[self._lowest]
+            self._lowest += 1
+        return None
+
+    def pop(self):
+        """
+        Removes and returns a node with the lowest priority, skipping stale entries.
+
+        Returns:
+            tuple - (node, priority) of the popped node.
+        """
+        lowest, entries = self._lowest, self._entries
+        bucket = self._buckets.get(lowest)
+        if not bucket or entries.get(bucket[-1]) != lowest:     # Not the current entry of a node at the lowest priority
+            bucket = self._top()
+            if bucket is None:
+                raise IndexError("pop from an empty open set")
+            lowest = self._lowest
+        node = bucket.pop()
+        del entries[node]
+        return node, lowest
+
+    def peek(self):
+        """
+        Returns a node with the lowest priority without removing it, dropping the stale entries above it.
+
+        Returns:
+            tuple - (node, priority) of the node.
+        """
+        bucket = self._top()
+        if bucket is None:
+            raise IndexError("peek at an empty open set")
+        return bucket[-1], self._lowest
+
+    def discard(self, node):
+        """Removes a node if it is queued, its entry is left in its bucket as a stale entry."""
+        self._entries.pop(node, None)
+
+    def __contains__(self, node):
+        return node in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -12,14 +12,30 @@ import csv
 import argparse
 
 # For the queue and priority queue
-import queue
-import heapq
+from collections import deque
+
+from functools import partial, wraps
+import inspect
+
+# For the parallel comparison
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+
+# Compact grid representation and open set used by the solvers
+from grid import CONNECTIVITY, CORNER_CUTTING, OPEN, WALL, Grid, Workspace, as_grid
+from open_set import BucketQueue, OpenSet
+from maze_file import load_maze
+import generate
+from flow_field import flow_field
+from components import components
+import hpa
 
 def maze_csv(path='pathfinding/maze.csv'): 
-    """Reads a maze from a CSV file."""
+    """Reads a maze from a CSV file, skipping blank lines."""
     with open(path, newline='') as f:
         reader = csv.reader(f)
-        maze = list(reader)
+        maze = [row for row in reader if row]
     return maze
 
 def maze_small():
@@ -119,21 +135,69 @@ def random_maze(rows, cols, p=0.3):
     
     return maze
 
+def perfect_maze(rows, cols, seed=None):
+    """
+    Generates a perfect maze, with exactly one path between any two cells, using a randomized depth-first search.
+    
+    Parameters:
+        - rows (int) - The number of rows in the maze, rounded down to an odd number, at least 3.
+        - cols (int) - The number of columns in the maze, rounded down to an odd number, at least 3.
+        - seed (int or Random, optional) - The seed of the random generator, or the generator itself. The random module by default.
+    
+    Returns:
+        - maze (list) - A 2D list representing the maze, where '#' represents walls and ' ' represents paths.
+        The maze also contains a start point 'O' in the top left corner and an end point 'X' in the bottom right corner.
+    """
+    if rows < 3 or cols < 3:
+        raise ValueError(f"A perfect maze needs at least 3 rows and 3 columns, not {rows}x{cols}")
+    rng = random if seed is None else seed if isinstance(seed, random.Random) else random.Random(seed)
+    rows -= 1 - rows % 2                                # Passages are on odd rows and columns, inside the border
+    cols -= 1 - cols % 2
+    maze = [["#"] * cols for _ in range(rows)]
+    
+    maze[1][1] = " "
+    stack = [(1, 1)]                                    # Stack of the passages being carved
+    while stack:
+        row, col = stack[-1]
+        
+        # Find the unvisited cells two steps away
+        options = [(dr, dc) for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+                   if 0 < row + dr < rows - 1 and 0 < col + dc < cols - 1 and maze[row + dr][col + dc] == "#"]
+        if not options:                                 # Dead end, backtrack
+            stack.pop()
+            continue
+        
+        # Carve a passage to a random unvisited cell
+        dr, dc = rng.choice(options)
+        maze[row + dr // 2][col + dc // 2] = " "
+        maze[row + dr][col + dc] = " "
+        stack.append((row + dr, col + dc))
+    
+    maze[1][1] = "O"
+    maze[rows - 2][cols - 2] = "X"
+    return maze
+
 def print_maze(maze, stdscr, path=[], start=None, end=None, steps=0, offset=(0, 0), visited=None, path_len=None):
     """
     Prints the maze on the screen using curses library.
     
     Args:
-        maze (list) -  The maze represented as a 2D list.
+        maze (list or Grid) -  The maze represented as a 2D list, or as a Grid.
         stdscr: The curses window object.
         path (list, optional) -  The list of positions in the path. Defaults to an empty list.
         start (tuple, optional) -  The start position. Defaults to None.
         end (tuple, optional) -  The end position. Defaults to None.
         steps (int, optional) -  The number of steps taken. Defaults to 0.
         offset (tuple, optional) -  The offset for printing the maze. Defaults to (0, 0).
-        visited (set, optional) -  The set of visited positions. Defaults to None.
+        visited (set or list, optional) -  The visited positions. Defaults to None.
         path_len (int, optional) -  The length of the path. Defaults to None.
     """
+    if isinstance(maze, Grid):                          # Print grids as their 2D list
+        maze = maze.to_maze()
+    if visited and not isinstance(visited, (set, frozenset)):
+        visited = set(visited)                          # Constant time membership checks
+    path_cells = set(path)                              # Constant time membership checks
+
     # Define colors
     BLUE = curses.color_pair(1)
     RED = curses.color_pair(2)
@@ -146,7 +210,7 @@ def print_maze(maze, stdscr, path=[], start=None, end=None, steps=0, offset=(0,
                 stdscr.addstr(i+offset[0], j*2+offset[1], value, YELLOW)
             elif (i, j) == end:                                         # If the current position is the end
                 stdscr.addstr(i+offset[0], j*2+offset[1], value, YELLOW)
-            elif (i, j) in path:                                        # If the current position is in the path
+            elif (i, j) in path_cells:                                  # If the current position is in the path
                 stdscr.addstr(i+offset[0], j*2+offset[1], "X", RED)
             elif visited and (i, j) in visited:                         # If the current position has been visited
                 stdscr.addstr(i+offset[0], j*2+offset[1], "X", GREEN) 
@@ -181,13 +245,248 @@ def find_val(maze, val):
                 return i, j                 # Return the position
     return None
 
-def bfs(maze, stdscr):
+class CursesRenderer:
     """
-    Breadth-First Search algorithm to find the shortest path in a maze.
+    Incremental curses renderer, animates a search when it is passed as the solver's observer.
+    
+    The renderer keeps the state it last drew for every cell, and each frame only redraws the cells whose 
+    state changed since the previous frame: newly visited cells, and cells added to or removed from the path.
+    The screen is only cleared and fully drawn once, at the start of every search.
     
     Parameters:
-        maze (list) - A 2D list representing the maze.
         stdscr - The curses window object.
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        fps (float, optional) - The maximum number of frames drawn per second. Defaults to None, no limit.
+        every (int, optional) - Draw a frame every N expansions. Defaults to 1.
+        offset (tuple, optional) - The offset for printing the maze. Defaults to (0, 0).
+    """
+    BASE, VISITED, PATH = 0, 1, 2       # Cell states
+
+    def __init__(self, stdscr, maze, fps=None, every=1, offset=(0, 0)):
+        if isinstance(maze, Grid):      # Print grids as their 2D list
+            maze = maze.to_maze()
+        self.stdscr = stdscr
+        self.maze = maze
+        self.offset = offset
+        self.start = find_val(maze, "O")
+        self.end = find_val(maze, "X")
+        self.min_interval = 1 / fps if fps else 0
+        self.every = max(1, every)
+        self.reset()
+
+    def reset(self):
+        """Forgets the current search, the next frame clears the screen and draws the whole maze."""
+        self.drawn = {}             # State last drawn for every cell that is not BASE
+        self.visited = set()        # Cells expanded by the search
+        self.path = set()           # Cells on the current path
+        self.dirty = set()          # Cells that may have changed since the last frame
+        self.expansions = 0
+        self.last_frame = 0.0
+        self.fresh = True
+
+    def __call__(self, event, steps, node=None, path=None):
+        """Observer hook, called as observer(event, steps, node, path) by the solvers."""
+        if event == "expand":
+            self.visited.add(node)
+            self.dirty.add(node)
+            self.expansions += 1
+        if path is not None:
+            self.set_path(path)
+
+        # The search has finished, draw the outcome and get ready for the next search
+        if event == "done":
+            self.draw(steps)
+            maze = self.maze
+            if path:
+                self.stdscr.addstr(len(maze)+self.offset[0], len(maze[0])//2+self.offset[1], "Path found!")
+                self.stdscr.addstr(len(maze)+1+self.offset[0], len(maze[0])//2+self.offset[1], f"Path length: {len(path)-1}")
+            else:
+                self.stdscr.addstr(len(maze)+self.offset[0], len(maze[0])//2+self.offset[1], "No path found!")
+            self.stdscr.refresh()
+            self.reset()
+        
+        # Draw a frame every N expansions, at most fps frames per second
+        elif self.expansions % self.every == 0 and time.perf_counter() - self.last_frame >= self.min_interval:
+            self.draw(steps)
+
+    def set_path(self, path):
+        """Replaces the current path, marking only the cells that joined or left it as changed."""
+        path = set(path)
+        self.dirty |= path ^ self.path
+        self.path = path
+
+    def draw(self, steps):
+        """Draws a frame, only redrawing the cells whose state changed."""
+        stdscr, maze, offset = self.stdscr, self.maze, self.offset
+        BLUE = curses.color_pair(1)
+        RED = curses.color_pair(2)
+        GREEN = curses.color_pair(3)
+        YELLOW = curses.color_pair(4)
+
+        if self.fresh:                                                      # Draw the whole maze once
+            stdscr.clear()
+            print_maze(maze, stdscr, [], self.start, self.end, steps, offset=offset)
+            self.fresh = False
+
+        for cell in self.dirty:                                             # For each cell that may have changed
+            state = self.PATH if cell in self.path else self.VISITED if cell in self.visited else self.BASE
+            if self.drawn.get(cell, self.BASE) == state:                    # Already drawn in this state
+                continue
+            self.drawn[cell] = state
+            
+            i, j = cell
+            if cell == self.start or cell == self.end:                      # Start and end keep their marker
+                stdscr.addstr(i+offset[0], j*2+offset[1], maze[i][j], YELLOW)
+            elif state == self.PATH:                                        # If the cell is in the path
+                stdscr.addstr(i+offset[0], j*2+offset[1], "X", RED)
+            elif state == self.VISITED:                                     # If the cell has been visited
+                stdscr.addstr(i+offset[0], j*2+offset[1], "X", GREEN)
+            else:                                                           # Otherwise, back to the maze value
+                stdscr.addstr(i+offset[0], j*2+offset[1], maze[i][j], BLUE)
+        self.dirty.clear()
+
+        # Update the step and visited counts
+        stdscr.addstr(len(maze)//2 +2+offset[0], len(maze[0])*2+offset[1]+1, f"Step count: {steps}", RED)
+        stdscr.clrtoeol()
+        if self.visited:
+            stdscr.addstr(len(maze)//2 +3+offset[0], len(maze[0])*2+offset[1]+1, f"Visited count: {len(self.visited)}", GREEN)
+            stdscr.clrtoeol()
+        stdscr.refresh()
+        self.last_frame = time.perf_counter()
+
+def search_endpoints(grid, start=None, end=None):
+    """
+    Returns the start and end indices of a search, the maze's 'O' and 'X' unless other positions are given.
+    
+    Parameters:
+        grid (Grid) - The maze.
+        start (tuple, optional) - The (row, col) start position.
+        end (tuple, optional) - The (row, col) end position.
+    
+    Returns:
+        tuple - (start, end) as flat indices of the grid.
+    """
+    start = grid.start if start is None else grid.index(*start)
+    end = grid.end if end is None else grid.index(*end)
+    return start, end
+
+def no_path(grid, start, end, observer=None, stats=None):
+    """
+    Returns the result of a search between two cells in different components, without searching.
+    
+    Parameters:
+        grid (Grid) - The maze.
+        start (int) - The start index, or None.
+        end (int) - The end index, or None.
+        observer (function, optional) - Called as observer("done", 0, path=[]).
+        stats (dict, optional) - Filled with the sizes of the components of the start and the end.
+    
+    Returns:
+        tuple - (found, path, length, steps, visited) of a search that found no path.
+    """
+    if observer:
+        observer("done", 0, path=[])
+    if stats is not None:
+        labels = components(grid)
+        stats.update(unreachable=True,
+                     start_component_size=labels.size(start) if start is not None else 0,
+                     end_component_size=labels.size(end) if end is not None else 0)
+    return False, [], 0, 0, []
+
+def uniform_four_connected(name):
+    """
+    Returns the grid check of the solvers that only take steps of cost 1 in the four directions, for connected_endpoints().
+    
+    Parameters:
+        name (str) - The name of the algorithm, for the error messages.
+    
+    Returns:
+        function - Called as check(grid), raises ValueError if the grid is 8-connected or has step costs.
+    """
+    def check(grid):
+        if grid.connectivity != 4:
+            raise ValueError(f"{name} only moves in the four directions, it needs a 4-connected grid")
+        uniform_steps(name)(grid)
+    return check
+
+def uniform_steps(name):
+    """
+    Returns the grid check of the solvers that count every step as 1, for connected_endpoints().
+    
+    Parameters:
+        name (str) - The name of the algorithm, for the error messages.
+    
+    Returns:
+        function - Called as check(grid), raises ValueError if the grid has step costs.
+    """
+    def check(grid):
+        if grid.costs is not None:
+            raise ValueError(f"{name} counts every step as 1, it needs a grid without step costs")
+    return check
+
+def connected_endpoints(solver=None, grid_check=None):
+    """
+    Decorator of the solvers: before searching, checks that the start and the end are in the same connected component,
+    and returns the result of no_path() at once when they are not. The solver gets the maze as a Grid.
+    Used as @connected_endpoints, or as @connected_endpoints(grid_check=check) by the solvers that can't run on every grid.
+    
+    Parameters:
+        solver (function) - Called as solver(maze, observer=None, ..., stats=None, start=None, end=None, ...).
+        grid_check (function, optional) - Called as grid_check(grid) first, raises ValueError if the solver can't run on the grid.
+    
+    Returns:
+        function - The solver, with the same parameters.
+    """
+    if solver is None:
+        return partial(connected_endpoints, grid_check=grid_check)
+    signature = inspect.signature(solver)
+
+    @wraps(solver)
+    def checked(*args, **kwargs):
+        arguments = signature.bind(*args, **kwargs)
+        arguments.apply_defaults()
+        options = arguments.arguments
+        grid = options["maze"] = as_grid(options["maze"])
+        if grid_check:
+            grid_check(grid)
+        start, end = search_endpoints(grid, options["start"], options["end"])
+        if not components(grid).connected(start, end):     # No path between different components, don't search
+            return no_path(grid, start, end, options["observer"], options["stats"])
+        return solver(*arguments.args, **arguments.kwargs)
+    return checked
+
+def trace_path(parent, start, node):
+    """
+    Reconstructs a path by following parent pointers back to the start.
+    
+    Parameters:
+        parent (array) - The parent index of every reached cell.
+        start (int) - The index of the start cell.
+        node (int) - The index of the last cell of the path.
+    
+    Returns:
+        list - The indices of the cells from the start to the node.
+    """
+    path = [node]
+    while node != start:        # Follow the parents back to the start
+        node = parent[node]
+        path.append(node)
+    path.reverse()
+    return path
+
+@connected_endpoints
+def bfs(maze, observer=None, stats=None, start=None, end=None, workspace=None):
+    """
+    Breadth-First Search algorithm to find the shortest path in a maze.
+    The queue holds cell indices, and every reached cell stores its parent, so the path is only built once at the end.
+    
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
+        stats (dict, optional) - Filled with search statistics, the frontier high-water mark.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Search buffers of the grid to reuse, allocated for this search by default.
     
     Returns:
         bool - True if the path is found, False otherwise.
@@ -196,56 +495,68 @@ def bfs(maze, stdscr):
         int - The number of steps taken.
         list - The list of visited positions.
     """
-    start = "O"                         # Start position
-    end = "X"                           # End position
-    start_pos = find_val(maze, start)   # Find the start position
-    end_pos = find_val(maze, end)       # Find the end position
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    cells, moves = grid.cells, grid.moves           # Cells and moves to the neighbors
+    start, end = search_endpoints(grid, start, end) # Start and end indices
+
+    workspace = workspace or Workspace(grid.size)   # Reused search buffers
+    generation = workspace.begin()                  # Stamp of the cells visited by this search
 
-    q = queue.Queue()   # Create a queue
-    q.put([start_pos])  # Put the start position in the queue
-    visited = set()     # Create a set to store visited positions
+    q = deque([start])                              # Create a queue of cell indices
+    visited = workspace.seen                        # Generation stamps of the visited positions
+    visited[start] = generation
+    parent = workspace.parent                       # Parent index of every visited position
+    marked = [start]                                # Visited positions, in the order they were visited
 
     steps = 0
-    while not q.empty():            # While the queue is not empty
-        path = q.get()              # Get the path from the queue
-        row, col = path[-1]         # Get the current position
+    frontier_peak = 1
+    found = False
+    while q:                        # While the queue is not empty
+        current = q.popleft()       # Get the current position from the queue
 
-        stdscr.clear()              # Clear the screen
         steps += 1
-        print_maze(maze, stdscr, path, start_pos, end_pos, steps, visited=list(visited))  # Print the maze
-        # time.sleep(0.1)             # Sleep 
-        stdscr.refresh()            # Refresh the screen
+        if observer:
+            observer("expand", steps, grid.position(current), grid.positions(trace_path(parent, start, current)))
 
         # If the current position is the end position
-        if maze[row][col] == end:   
-            stdscr.addstr(len(maze), len(maze[0])//2, "Path found!")
-            stdscr.addstr(len(maze)+1, len(maze[0])//2, f"Path length: {len(path)-1}")
-            return True, path, len(path)-1, steps, list(visited)
+        if current == end:   
+            found = True
+            break
         
-        # Else, find the neighbors of the current position
-        neighbors = find_neighbors(maze, row, col)
-        for neighbor in neighbors:      # For each neighbor
-            if neighbor in visited:     # If the neighbor has been visited
-                continue                # Skip
-
-            r, c = neighbor
-            if maze[r][c] == "#":       # If the neighbor is a wall
-                continue                # Skip
+        # Else, check the neighbors of the current position
+        for offset, cost, side_a, side_b in moves:
+            neighbor = current + offset
+            if visited[neighbor] == generation or cells[neighbor]:  # If the neighbor has been visited or is a wall
+                continue                                            # Skip
+            if side_a and grid.corner_blocked(current, side_a, side_b):  # Or a diagonal move past the corner of a wall
+                continue
 
-            new_path = path + [neighbor]    # Add the neighbor to the path
-            q.put(new_path)                 # Put the new path in the queue
-            visited.add(neighbor)           # Add the neighbor to the visited set
+            visited[neighbor] = generation  # Add the neighbor to the visited set
+            parent[neighbor] = current      # Remember how the neighbor was reached
+            q.append(neighbor)              # Put the neighbor in the queue
+            marked.append(neighbor)
+        if len(q) > frontier_peak:
+            frontier_peak = len(q)
     
-    stdscr.addstr(len(maze), len(maze[0])//2, "No path found!")
-    return True, path, len(path)-1, steps, list(visited)
-
-def dfs(maze, stdscr):
+    path = grid.positions(trace_path(parent, start, end)) if found else []
+    if observer:
+        observer("done", steps, path=path)
+    if stats is not None:
+        stats.update(frontier_peak=frontier_peak)
+    return found, path, max(len(path)-1, 0), steps, grid.positions(marked)
+
+@connected_endpoints
+def dfs(maze, observer=None, stats=None, start=None, end=None, workspace=None):
     """
-    Breadth-First Search algorithm to find the shortest path in a maze.
+    Depth-First Search algorithm to find a path in a maze.
     
     Parameters:
-        maze (list) - A 2D list representing the maze.
-        stdscr - The curses window object.
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
+        stats (dict, optional) - Filled with search statistics, the frontier high-water mark.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Search buffers of the grid to reuse, allocated for this search by default.
     
     Returns:
         bool - True if the path is found, False otherwise.
@@ -254,53 +565,66 @@ def dfs(maze, stdscr):
         int - The number of steps taken.
         list - The list of visited positions.
     """
-    start = "O"                         # Start position
-    end = "X"                           # End position
-    start_pos = find_val(maze, start)   # Find the start position
-    end_pos = find_val(maze, end)       # Find the end position
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    cells, moves = grid.cells, grid.moves           # Cells and moves to the neighbors
+    start, end = search_endpoints(grid, start, end) # Start and end indices
 
-    # Stack, visited set, and path list
-    stack = [start_pos]
-    visited = set()
+    workspace = workspace or Workspace(grid.size)   # Reused search buffers
+    generation = workspace.begin()                  # Stamp of the cells visited by this search
+
+    # Stack, visited stamps, and path list
+    stack = [start]
+    visited = workspace.seen
+    visited[start] = generation
     path = []
 
+    frontier_peak = 1
+    found = False
     while stack:                        # While the stack is not empty
-        current_pos = stack.pop()       # Pop the top position from the stack
-        path.append(current_pos)        # Add the position to the path
-        row, col = current_pos          # Get the row and column of the position
+        current = stack.pop()           # Pop the top position from the stack
+        path.append(current)            # Add the position to the path
 
-        # Clear the screen and print the maze
-        stdscr.clear()
-        print_maze(maze, stdscr, path, start_pos, end_pos, len(path))
-        stdscr.refresh()
+        if observer:
+            observer("expand", len(path), grid.position(current), grid.positions(path))
         
         # If the current position is the end, return the path
-        if maze[row][col] == end:
-            stdscr.addstr(len(maze), len(maze[0])//2, "Path found!")
-            stdscr.addstr(len(maze)+1, len(maze[0])//2, f"Path length: {len(path)-1}")
-            return True, path, len(path)-1, len(path), path
+        if current == end:
+            found = True
+            break
 
-        # Else, find the neighbors of the current position
-        neighbors = find_neighbors(maze, row, col)
-        
         # For each neighbor, if it has not been visited and is not a wall, add it to the stack
-        for neighbor in neighbors:
-            if neighbor not in visited and maze[neighbor[0]][neighbor[1]] != "#":
+        for offset, cost, side_a, side_b in moves:
+            neighbor = current + offset
+            if visited[neighbor] != generation and not cells[neighbor] and not (side_a and grid.corner_blocked(current, side_a, side_b)):
                 stack.append(neighbor)
-                visited.add(neighbor)
-
-    # If no path is found, return False
-    stdscr.addstr(len(maze), len(maze[0])//2, "No path found!")
-    return False, path, len(path)-1, len(path), path
-
-def a_star(maze, stdscr, heuristic_type="manhattan"):
+                visited[neighbor] = generation
+        if len(stack) > frontier_peak:
+            frontier_peak = len(stack)
+
+    path = grid.positions(path)
+    if observer:
+        observer("done", len(path), path=path if found else [])
+    if stats is not None:
+        stats.update(frontier_peak=frontier_peak)
+    return found, path, len(path)-1, len(path), path
+
+@connected_endpoints
+def a_star(maze, observer=None, heuristic_type="manhattan", stats=None, start=None, end=None, workspace=None):
     """
     A* Search algorithm to find the shortest path in a maze.
+    Ties between equal f-scores are broken in favor of the lower heuristic, the position closest to the end.
+    On weighted grids every step costs the cost of the cell it enters, times sqrt(2) for diagonal moves. On weighted
+    4-connected grids with the integer heuristics (manhattan and chebyshev) the open set is a bucket queue. On
+    8-connected grids, the octile heuristic is the exact distance without walls.
     
     Parameters:
-        maze (list) - A 2D list representing the maze.
-        stdscr - The curses window object.
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
         heuristic_type (str) - The heuristic function to use. Default is "manhattan".
+        stats (dict, optional) - Filled with search statistics, the frontier high-water mark, the open set counters and the cost of the path.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Search buffers of the grid to reuse, allocated for this search by default.
     
     Returns:
         bool - True if the path is found, False otherwise.
@@ -309,66 +633,74 @@ def a_star(maze, stdscr, heuristic_type="manhattan"):
         int - The number of steps taken.
         list - The list of visited positions.
     """
-    start = "O"                         # Start position
-    end = "X"                           # End position
-    start_pos = find_val(maze, start)   # Find the start position
-    end_pos = find_val(maze, end)       # Find the end position
-
-    open_set = queue.PriorityQueue()    # Priority queue
-    open_set.put((0, start_pos))        # Put the start position in the queue
-    came_from = {}                      # Dictionary to store the path
-    g_score = {start_pos: 0}                                # Dictionary to store the g-score, the cost from the start to the current position
-    f_score = {start_pos: heuristic(start_pos, end_pos, heuristic_type)}    # Dictionary to store the f-score, the sum of the g-score and the heuristic
-    visited = set()                     # Set to store visited positions
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    cells, moves = grid.cells, grid.moves           # Cells and moves to the neighbors
+    costs = grid.costs                              # Step costs, None if every step costs 1
+    start, end = search_endpoints(grid, start, end) # Start and end indices
+    end_pos = grid.position(end)
+
+    workspace = workspace or Workspace(grid.size)   # Reused search buffers
+    generation = workspace.begin()                  # Stamp of the cells reached by this search
+
+    # Priority queue, buckets of integer f-scores on weighted grids
+    integer_costs = costs is not None and grid.connectivity == 4 and heuristic_type in INTEGER_HEURISTICS
+    open_set = BucketQueue() if integer_costs else OpenSet()
+    open_set.push(start, heuristic(grid.position(start), end_pos, heuristic_type))
+    # The g-score, the cost from the start to every reached position, with fractions on 8-connected grids
+    g_score = workspace.g_score if grid.connectivity == 4 else workspace.g_cost
+    g_score[start] = 0
+    parent = workspace.parent                       # Parent index of every reached position
+    reached = workspace.seen                        # Generation stamps of the positions with a g-score
+    reached[start] = generation
+    visited = workspace.closed                      # Generation stamps of the visited positions
+    expanded = []                                   # Visited positions, in the order they were visited
     
+    frontier_peak = 1
+    found = False
     # While the open set is not empty
-    while not open_set.empty():
-        current = open_set.get()[1]     # Get the current position
+    while open_set:
+        current = open_set.pop()[0]     # Get the current position
 
         # If the current position is the end position
-        if current == end_pos:
-            path = []
-            while current in came_from:         # While the current position is in the path
-                path.append(current)            # Add the current position to the path
-                current = came_from[current]    # Move to the next position
-            path.append(start_pos)              # Add the start position to the path
-            path.reverse()                      # Reverse the path
-            
-            # Print the maze with the path
-            stdscr.clear()
-            print_maze(maze, stdscr, path=path, start=start_pos, end=end_pos, steps=len(visited),visited=visited)
-            stdscr.refresh()
-
-            # Return the path
-            return True, path, len(path)-1, len(visited), visited
+        if current == end:
+            found = True
+            break
 
-        visited.add(current)    # Add the current position to the visited set
-        row, col = current      # Get the row and column of the current position
-
-        # Clear the screen and print the maze
-        stdscr.clear()
-        print_maze(maze, stdscr, path=[], start=start_pos, end=end_pos, steps=len(visited),visited=visited)
-        stdscr.refresh()
+        visited[current] = generation   # Add the current position to the visited set
+        expanded.append(current)
 
-        # Else, find the neighbors of the current position
-        neighbors = find_neighbors(maze, row, col)
+        if observer:
+            observer("expand", len(expanded), grid.position(current), [])
         
         # For each neighbor, if it has not been visited and is not a wall, calculate the g-score and f-score
-        for neighbor in neighbors:
-            if neighbor in visited or maze[neighbor[0]][neighbor[1]] == "#":
+        for offset, cost, side_a, side_b in moves:
+            neighbor = current + offset
+            if visited[neighbor] == generation or cells[neighbor]:
                 continue
-            tentative_g_score = g_score[current] + 1
+            if side_a and grid.corner_blocked(current, side_a, side_b):
+                continue
+            tentative_g_score = g_score[current] + (costs[neighbor] * cost if costs is not None else cost)
 
-            # If the neighbor is not in the g-score dictionary or the tentative g-score is less than the current g-score
-            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
+            # If the neighbor has no g-score yet or the tentative g-score is less than the current g-score
+            if reached[neighbor] != generation or tentative_g_score < g_score[neighbor]:
+                reached[neighbor] = generation
+                parent[neighbor] = current
                 g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = tentative_g_score + heuristic(neighbor, end_pos, heuristic_type)
-                open_set.put((f_score[neighbor], neighbor))
-
-    # If no path is found, return False
-    stdscr.addstr(len(maze), len(maze[0])//2, "No path found!")
-    return False, [], 0, len(visited), visited
+                h = heuristic(grid.position(neighbor), end_pos, heuristic_type)
+                open_set.push(neighbor, tentative_g_score + h, h)
+        if len(open_set) > frontier_peak:
+            frontier_peak = len(open_set)
+
+    path = grid.positions(trace_path(parent, start, end)) if found else []
+    if observer:
+        observer("done", len(expanded), path=path)
+    if stats is not None:
+        stats.update(frontier_peak=frontier_peak, pushes=open_set.pushes, stale_pops=open_set.stale_pops,
+                     cost=g_score[end] if found else None)
+    return found, path, max(len(path)-1, 0), len(expanded), grid.positions(expanded)
+
+# Heuristics with integer values, whose f-scores fit in the buckets of a BucketQueue
+INTEGER_HEURISTICS = ("manhattan", "chebyshev")
 
 def heuristic(pos1, pos2, type="manhattan"):
     """Calculate the Manhattan distance between two positions."""
@@ -383,13 +715,180 @@ def heuristic(pos1, pos2, type="manhattan"):
         dy = abs(pos1[1] - pos2[1])
         return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
 
-def gbfs(maze, stdscr):
+# Cell patterns searched by jps() along a row
+WALL_CELL = bytes([WALL])
+FORCED_RIGHT = bytes([WALL, OPEN])
+FORCED_LEFT = bytes([OPEN, WALL])
+
+@connected_endpoints(grid_check=uniform_four_connected("Jump Point Search"))
+def jps(maze, observer=None, heuristic_type="manhattan", stats=None, start=None, end=None, workspace=None):
+    """
+    Jump Point Search algorithm to find the shortest path in a maze, with moves in the four directions.
+    Instead of adding every neighbor to the open set, the search jumps in a straight line until it reaches a jump point:
+    the end, or a cell with a forced neighbor, that only a path through this cell reaches optimally. The symmetric paths 
+    in between are pruned, so open areas are crossed with a handful of expansions. Moving vertically, every cell with a
+    jump point to its left or right is a jump point as well, so that the search can turn.
+    
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
+        heuristic_type (str) - The heuristic function to use. Default is "manhattan".
+        stats (dict, optional) - Filled with search statistics, the frontier high-water mark and the open set counters.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Search buffers of the grid to reuse, allocated for this search by default.
+    
+    Returns:
+        bool - True if the path is found, False otherwise.
+        list - The path from the start to the end position, every cell included.
+        int - The length of the path.
+        int - The number of steps taken, the number of jump points expanded.
+        list - The list of visited positions, the jump points.
+    """
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    cells, offsets = grid.cells, grid.offsets       # Cells and neighbor offsets
+    start, end = search_endpoints(grid, start, end) # Start and end indices
+    width = grid.width
+    end_pos = grid.position(end)
+
+    def jump_horizontal(node, direction):
+        """Returns the first jump point from node, moving left or right, or None if there is a wall first."""
+        if not hasattr(cells, "find"):                  # Mapped grids have no find(), scan cell by cell
+            while not cells[node]:
+                # The end, or a cell above or below that is open while the cell behind it is a wall, a forced neighbor
+                if (node == end or (not cells[node + width] and cells[node - direction + width]) or
+                        (not cells[node - width] and cells[node - direction - width])):
+                    return node
+                node += direction
+            return None
+
+        # Search the row and the rows above and below at C speed, narrowing the run down to its first jump point
+        jump_point = None
+        if direction == 1:
+            limit = cells.find(WALL_CELL, node)         # The run ends before the next wall
+            if node <= end < limit:
+                jump_point, limit = end, end + 1
+            for side in (-width, width):                # Wall followed by an open cell, beside the run
+                found = cells.find(FORCED_RIGHT, node - 1 + side, limit + side)
+                if found != -1:
+                    jump_point = limit = found + 1 - side
+        else:
+            limit = cells.rfind(WALL_CELL, 0, node + 1) # The run ends after the previous wall
+            if limit < end <= node:
+                jump_point, limit = end, end - 1
+            for side in (-width, width):                # Open cell followed by a wall, beside the run
+                found = cells.rfind(FORCED_LEFT, limit + 1 + side, node + 2 + side)
+                if found != -1:
+                    jump_point = limit = found - side
+        return jump_point
+
+    def jump(node, direction):
+        """Returns the first jump point from node, moving in direction, or None if there is a wall first."""
+        if direction in (1, -1):
+            return jump_horizontal(node, direction)
+        while not cells[node]:
+            # The end, or a cell to the left or right that is open while the cell behind it is a wall, a forced neighbor
+            if (node == end or (not cells[node + 1] and cells[node - direction + 1]) or
+                    (not cells[node - 1] and cells[node - direction - 1])):
+                return node
+            
+            # Moving vertically, stop where a horizontal jump finds a jump point
+            if ((not cells[node + 1] and jump_horizontal(node + 1, 1) is not None) or
+                    (not cells[node - 1] and jump_horizontal(node - 1, -1) is not None)):
+                return node
+            node += direction
+        return None
+
+    workspace = workspace or Workspace(grid.size)   # Reused search buffers
+    generation = workspace.begin()                  # Stamp of the cells reached by this search
+
+    open_set = OpenSet()                            # Priority queue of jump points
+    open_set.push(start, heuristic(grid.position(start), end_pos, heuristic_type))
+    g_score = workspace.g_score                     # The g-score, the cost from the start to every reached jump point
+    g_score[start] = 0
+    parent = workspace.parent                       # Parent jump point of every reached jump point
+    reached = workspace.seen                        # Generation stamps of the jump points with a g-score
+    reached[start] = generation
+    visited = workspace.closed                      # Generation stamps of the visited jump points
+    expanded = []                                   # Visited jump points, in the order they were visited
+    
+    frontier_peak = 1
+    found = False
+    # While the open set is not empty
+    while open_set:
+        current = open_set.pop()[0]     # Get the current jump point
+
+        # If the current jump point is the end position
+        if current == end:
+            found = True
+            break
+
+        visited[current] = generation   # Add the current jump point to the visited set
+        expanded.append(current)
+
+        if observer:
+            observer("expand", len(expanded), grid.position(current), [])
+        
+        # Prune the directions: keep going straight, or turn to the sides, never go back to the parent
+        if current == start:
+            directions = offsets
+        else:
+            diff = current - parent[current]
+            if -width < diff < width:                   # Moving horizontally
+                direction = 1 if diff > 0 else -1
+                directions = (direction, width, -width)
+            else:                                       # Moving vertically
+                direction = width if diff > 0 else -width
+                directions = (direction, 1, -1)
+        
+        current_pos = grid.position(current)
+        for direction in directions:
+            if cells[current + direction]:
+                continue
+            neighbor = jump(current + direction, direction)
+            if neighbor is None or visited[neighbor] == generation:
+                continue
+
+            # The jump is a straight line, its cost is the distance between the jump points
+            neighbor_pos = grid.position(neighbor)
+            tentative_g_score = g_score[current] + abs(neighbor_pos[0] - current_pos[0]) + abs(neighbor_pos[1] - current_pos[1])
+            if reached[neighbor] != generation or tentative_g_score < g_score[neighbor]:
+                reached[neighbor] = generation
+                parent[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                h = heuristic(neighbor_pos, end_pos, heuristic_type)
+                open_set.push(neighbor, tentative_g_score + h, h)
+        if len(open_set) > frontier_peak:
+            frontier_peak = len(open_set)
+
+    # Fill in the cells between the jump points
+    path = []
+    if found:
+        jump_points = trace_path(parent, start, end)
+        path = [start]
+        for node in jump_points[1:]:
+            previous = path[-1]
+            step = (1 if node > previous else -1) if abs(node - previous) < width else (width if node > previous else -width)
+            path.extend(range(previous + step, node + step, step))
+        path = grid.positions(path)
+    if observer:
+        observer("done", len(expanded), path=path)
+    if stats is not None:
+        stats.update(frontier_peak=frontier_peak, pushes=open_set.pushes, stale_pops=open_set.stale_pops)
+    return found, path, max(len(path)-1, 0), len(expanded), grid.positions(expanded)
+
+@connected_endpoints
+def gbfs(maze, observer=None, stats=None, start=None, end=None, workspace=None):
     """
     Greedy Best-First Search algorithm to find the shortest path in a maze.
     
     Parameters:
-        maze (list) - A 2D list representing the maze.
-        stdscr - The curses window object.
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
+        stats (dict, optional) - Filled with search statistics, the frontier high-water mark and the open set counters.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Search buffers of the grid to reuse, allocated for this search by default.
     
     Returns:
         bool - True if the path is found, False otherwise.
@@ -398,70 +897,75 @@ def gbfs(maze, stdscr):
         int - The number of steps taken.
         list - The list of visited positions.
     """
-    start = "O"                         # Start position
-    end = "X"                           # End position
-    start_pos = find_val(maze, start)   # Find the start position
-    end_pos = find_val(maze, end)       # Find the end position
-
-    open_set = queue.PriorityQueue()    # Priority queue
-    open_set.put((0, start_pos))        # Put the start position in the queue
-    came_from = {}                      # Dictionary to store the path
-    visited = set()                     # Set to store visited positions
-
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    cells, moves = grid.cells, grid.moves           # Cells and moves to the neighbors
+    start, end = search_endpoints(grid, start, end) # Start and end indices
+    end_pos = grid.position(end)
+
+    workspace = workspace or Workspace(grid.size)   # Reused search buffers
+    generation = workspace.begin()                  # Stamp of the cells reached by this search
+
+    open_set = OpenSet()                            # Priority queue
+    open_set.push(start, 0)                         # Put the start position in the queue
+    parent = workspace.parent                       # Parent index of every reached position
+    reached = workspace.seen                        # Generation stamps of the positions already put in the queue
+    reached[start] = generation
+    expanded = []                                   # Visited positions, in the order they were visited
+
+    frontier_peak = 1
+    found = False
     # While the open set is not empty
-    while not open_set.empty():
-        current = open_set.get()[1]     # Get the current position
+    while open_set:
+        current = open_set.pop()[0]     # Get the current position
 
         # If the current position is the end position
-        if current == end_pos:
-            path = []                   
-            while current in came_from:         # While the current position is in the path
-                path.append(current)            # Add the current position to the path
-                current = came_from[current]    # Move to the next position
-            path.append(start_pos)              # Add the start position to the path
-            path.reverse()                      # Reverse the path
-            
-            # Print the maze with the path
-            stdscr.clear()
-            print_maze(maze, stdscr, path=path, start=start_pos, end=end_pos, steps=len(visited), visited=visited)
-            stdscr.refresh()
+        if current == end:
+            found = True
+            break
 
-            # Return the path
-            return True, path, len(path)-1, len(visited), visited
+        # Else, add the current position to the visited positions
+        expanded.append(current)
 
-        # Else, add the current position to the visited set
-        visited.add(current)
-        row, col = current
-
-        # Clear the screen and print the maze
-        stdscr.clear()
-        print_maze(maze, stdscr, path=[], start=start_pos, end=end_pos, steps=len(visited), visited=visited)
-        stdscr.refresh()
-
-        # Else, find the neighbors of the current position
-        neighbors = find_neighbors(maze, row, col)
+        if observer:
+            observer("expand", len(expanded), grid.position(current), [])
         
-        # For each neighbor, if it has not been visited and is not a wall, calculate the heuristic
-        for neighbor in neighbors:
-            if neighbor in visited or maze[neighbor[0]][neighbor[1]] == "#":
+        # For each neighbor, if it has not been reached and is not a wall, calculate the heuristic
+        for offset, cost, side_a, side_b in moves:
+            neighbor = current + offset
+            if reached[neighbor] == generation or cells[neighbor]:
+                continue
+            if side_a and grid.corner_blocked(current, side_a, side_b):
                 continue
 
-            if neighbor not in visited:
-                came_from[neighbor] = current               # Add the current position to the path
-                priority = heuristic(neighbor, end_pos)     # Calculate the heuristic
-                open_set.put((priority, neighbor))          # Put the neighbor in the queue
-
-    # If no path is found, return False
-    stdscr.addstr(len(maze), len(maze[0])//2, "No path found!")
-    return False, [], 0, len(visited), visited    
-
-def dijkstra(maze, stdscr):
+            reached[neighbor] = generation
+            parent[neighbor] = current                                      # Remember how the neighbor was reached
+            priority = heuristic(grid.position(neighbor), end_pos)          # Calculate the heuristic
+            open_set.push(neighbor, priority)                               # Put the neighbor in the queue
+        if len(open_set) > frontier_peak:
+            frontier_peak = len(open_set)
+
+    path = grid.positions(trace_path(parent, start, end)) if found else []
+    if observer:
+        observer("done", len(expanded), path=path)
+    if stats is not None:
+        stats.update(frontier_peak=frontier_peak, pushes=open_set.pushes, stale_pops=open_set.stale_pops)
+    return found, path, max(len(path)-1, 0), len(expanded), grid.positions(expanded)
+
+@connected_endpoints
+def dijkstra(maze, observer=None, stats=None, start=None, end=None, workspace=None):
     """
     Dijkstra's algorithm to find the shortest path in a maze.
+    On weighted grids every step costs the cost of the cell it enters, times sqrt(2) for diagonal moves. On 4-connected
+    grids the costs are small integers, so the open set is a bucket queue (Dial's algorithm), where pushing and popping
+    take constant time.
     
     Parameters:
-        maze (list) - A 2D list representing the maze.
-        stdscr - The curses window object.
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
+        stats (dict, optional) - Filled with search statistics, the frontier high-water mark, the open set counters and the cost of the path.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Search buffers of the grid to reuse, allocated for this search by default.
     
     Returns:
         bool - True if the path is found, False otherwise.
@@ -470,74 +974,160 @@ def dijkstra(maze, stdscr):
         int - The number of steps taken.
         list - The list of visited positions.
     """
-    start = "O"                         # Start position
-    end = "X"                           # End position
-    start_pos = find_val(maze, start)   # Find the start position
-    end_pos = find_val(maze, end)       # Find the end position
-
-    open_set = []                               # Priority queue
-    heapq.heappush(open_set, (0, start_pos))    # Put the start position in the queue
-    came_from = {}                              # Dictionary to store the path
-    g_score = {start_pos: 0}                    # Dictionary to store the g-score, the cost from the start to the current position
-    visited = set()                             # Set to store visited positions
-
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    cells, moves = grid.cells, grid.moves           # Cells and moves to the neighbors
+    costs = grid.costs                              # Step costs, None if every step costs 1
+    start, end = search_endpoints(grid, start, end) # Start and end indices
+
+    workspace = workspace or Workspace(grid.size)   # Reused search buffers
+    generation = workspace.begin()                  # Stamp of the cells reached by this search
+
+    open_set = BucketQueue() if grid.connectivity == 4 else OpenSet()   # Priority queue, buckets of integer costs
+    open_set.push(start, 0)                         # Put the start position in the queue
+    # The g-score, the cost from the start to every reached position, with fractions on 8-connected grids
+    g_score = workspace.g_score if grid.connectivity == 4 else workspace.g_cost
+    g_score[start] = 0
+    parent = workspace.parent                       # Parent index of every reached position
+    reached = workspace.seen                        # Generation stamps of the positions with a g-score
+    reached[start] = generation
+    visited = workspace.closed                      # Generation stamps of the visited positions
+    expanded = []                                   # Visited positions, in the order they were visited
+
+    frontier_peak = 1
+    found = False
     # While the open set is not empty
     while open_set:
-        current_cost, current = heapq.heappop(open_set)     # Get the current position
+        current, current_cost = open_set.pop()      # Get the current position
 
         # If the current position is the end position
-        if current == end_pos:
-            path = []
-            while current in came_from:         # While the current position is in the path
-                path.append(current)            # Add the current position to the path
-                current = came_from[current]    # Move to the next position
-            path.append(start_pos)              # Add the start position to the path
-            path.reverse()                      # Reverse the path
-            
-            # Print the maze with the path
-            stdscr.clear()
-            print_maze(maze, stdscr, path=path, start=start_pos, end=end_pos, steps=len(visited), visited=visited)
-            stdscr.refresh()
-
-            # Return the path
-            return True, path, len(path)-1, len(visited), visited
+        if current == end:
+            found = True
+            break
 
         # Else, add the current position to the visited set
-        visited.add(current)
-        row, col = current
-
-        # Print the maze
-        stdscr.clear()
-        print_maze(maze, stdscr, path=[], start=start_pos, end=end_pos, steps=len(visited), visited=visited)
-        stdscr.refresh()
+        visited[current] = generation
+        expanded.append(current)
 
-        # Else, find the neighbors of the current position
-        neighbors = find_neighbors(maze, row, col)
+        if observer:
+            observer("expand", len(expanded), grid.position(current), [])
         
         # For each neighbor, if it has not been visited and is not a wall, calculate the g-score
-        for neighbor in neighbors:
-            if neighbor in visited or maze[neighbor[0]][neighbor[1]] == "#":
+        for offset, cost, side_a, side_b in moves:
+            neighbor = current + offset
+            if visited[neighbor] == generation or cells[neighbor]:
                 continue
-
-            tentative_g_score = g_score[current] + 1    # Calculate the g-score
-
-            # If the neighbor is not in the g-score dictionary or the tentative g-score is less than the current g-score
-            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                came_from[neighbor] = current                               # Add the current position to the path
-                g_score[neighbor] = tentative_g_score                       # Update the g-score
-                heapq.heappush(open_set, (tentative_g_score, neighbor))     # Put the neighbor in the queue
+            if side_a and grid.corner_blocked(current, side_a, side_b):
+                continue
+            tentative_g_score = current_cost + (costs[neighbor] * cost if costs is not None else cost)  # Calculate the g-score
+
+            # If the neighbor has no g-score yet or the tentative g-score is less than the current g-score
+            if reached[neighbor] != generation or tentative_g_score < g_score[neighbor]:
+                reached[neighbor] = generation
+                parent[neighbor] = current                      # Remember how the neighbor was reached
+                g_score[neighbor] = tentative_g_score           # Update the g-score
+                open_set.push(neighbor, tentative_g_score)      # Put the neighbor in the queue
+        if len(open_set) > frontier_peak:
+            frontier_peak = len(open_set)
     
-    # If no path is found, return False
-    stdscr.addstr(len(maze), len(maze[0])//2, "No path found!")
-    return False, [], 0, len(visited), visited
-
-def bidirectional(maze, stdscr):
+    path = grid.positions(trace_path(parent, start, end)) if found else []
+    if observer:
+        observer("done", len(expanded), path=path)
+    if stats is not None:
+        stats.update(frontier_peak=frontier_peak, pushes=open_set.pushes, stale_pops=open_set.stale_pops,
+                     cost=g_score[end] if found else None)
+    return found, path, max(len(path)-1, 0), len(expanded), grid.positions(expanded)
+
+@connected_endpoints(grid_check=uniform_steps("The flow field"))
+def flow(maze, observer=None, stats=None, start=None, end=None, workspace=None):
     """
-    Bidirectional Search algorithm to find the shortest path in a maze.
+    Follows the flow field of the end position to find the path with the fewest moves in a maze.
+    The field is computed once for every end position, by a search backwards from the end over the whole maze, 
+    and cached on the grid until the maze changes, so the following searches to the same end only follow the field.
+    Diagonal moves of 8-connected grids count as one move, and grids with step costs raise a ValueError.
     
     Parameters:
-        maze (list) - A 2D list representing the maze.
-        stdscr - The curses window object.
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) once when done.
+        stats (dict, optional) - Filled with search statistics, whether the field was cached and how many cells reach the end.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Not used, the field has its own buffers.
+    
+    Returns:
+        bool - True if the path is found, False otherwise.
+        list - The path from the start to the end position.
+        int - The length of the path.
+        int - The number of steps taken, the number of cells of the field if it was computed, 0 if it was cached.
+        list - The list of visited positions, the path.
+    """
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    start, end = search_endpoints(grid, start, end) # Start and end indices
+
+    cached = grid.has_derived(("flow_field", end))
+    field = flow_field(grid, grid.position(end))
+    path = field.path(*grid.position(start))
+    found = bool(path)
+    steps = 0 if cached else field.reached
+
+    if observer:
+        observer("done", steps, path=path)
+    if stats is not None:
+        stats.update(cached=cached, reached=field.reached)
+    return found, path, max(len(path)-1, 0), steps, path
+
+@connected_endpoints(grid_check=uniform_four_connected("HPA*"))
+def hpa_star(maze, observer=None, stats=None, start=None, end=None, workspace=None, cluster_size=16):
+    """
+    Hierarchical Path-Finding A* (HPA*) to find a near-optimal path in a huge maze.
+    The maze is split into clusters, and an abstract graph of the entrances between clusters is built once and cached
+    on the grid, or next to the maze file. A* searches the abstract graph, and the grid is only searched again inside 
+    the clusters of the abstract path. The path is within a few percent of the shortest one, not always the shortest.
+    
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) once when done.
+        stats (dict, optional) - Filled with search statistics, whether the abstract graph was cached and its number of nodes.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Not used, the searches are bounded by the clusters.
+        cluster_size (int) - The number of rows and columns of the clusters. Default is 16.
+    
+    Returns:
+        bool - True if the path is found, False otherwise.
+        list - The path from the start to the end position.
+        int - The length of the path.
+        int - The number of steps taken, the number of abstract nodes expanded.
+        list - The list of visited positions, the expanded abstract nodes.
+    """
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    start, end = search_endpoints(grid, start, end) # Start and end indices
+
+    cached = grid.has_derived(("hpa", cluster_size))
+    graph = hpa.abstract_graph(grid, cluster_size)
+    path, expanded = hpa.find_path(graph, start, end)
+    path = grid.positions(path) if path else []
+
+    if observer:
+        observer("done", len(expanded), path=path)
+    if stats is not None:
+        stats.update(cached=cached, abstract_nodes=len(graph.nodes))
+    return bool(path), path, max(len(path)-1, 0), len(expanded), grid.positions(expanded)
+
+@connected_endpoints
+def bidirectional(maze, observer=None, stats=None, start=None, end=None, workspace=None):
+    """
+    Bidirectional Breadth-First Search algorithm to find the shortest path in a maze.
+    Two level-synchronous searches run from the start and from the end, always expanding a whole level of the smaller 
+    frontier. Once a level reaches cells already reached by the other search, the level is finished and the shortest
+    path goes through the meeting cell with the lowest sum of distances from both ends.
+    
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
+        stats (dict, optional) - Filled with search statistics, the frontier high-water mark, and the number of positions expanded by each search.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Search buffers of the grid to reuse, allocated for this search by default.
     
     Returns:
         bool - True if the path is found, False otherwise.
@@ -546,112 +1136,88 @@ def bidirectional(maze, stdscr):
         int - The number of steps taken.
         list - The list of visited positions.
     """
-    start = "O"                         # Start position
-    end = "X"                           # End position
-    start_pos = find_val(maze, start)   # Find the start position
-    end_pos = find_val(maze, end)       # Find the end position
-
-    def reconstruct_path(came_from_start, came_from_end, meeting_point):
-        """Function to reconstruct the path from the start to the end position."""
-        path = []
-        
-        # Find the path from the start to the meeting point
-        current = meeting_point
-        while current in came_from_start:
-            path.append(current)
-            current = came_from_start[current]
-        path.reverse()
-        
-        # Find the path from the meeting point to the end
-        current = meeting_point
-        while current in came_from_end:
-            current = came_from_end[current]
-            path.append(current)
-            
-        return path
-
-    # Queues, dictionaries, and sets, to store the positions, paths, and visited positions
-    open_set_start = queue.Queue()  
-    open_set_end = queue.Queue()    
-    open_set_start.put(start_pos)    
-    open_set_end.put(end_pos)            
-    came_from_start = {}              
-    came_from_end = {}                
-    visited_start = set()             
-    visited_end = set()               
-
-    # While the queues are not empty
-    while not open_set_start.empty() and not open_set_end.empty():
-        # Get the current positions, start/end
-        current_start = open_set_start.get()
-        current_end = open_set_end.get()
-
-        # If start meets end, reconstruct the path
-        if current_start in visited_end:
-            path = reconstruct_path(came_from_start, came_from_end, current_start)
-            
-            # Print the maze with the path
-            stdscr.clear()
-            print_maze(maze, stdscr, path=path, start=start_pos, end=end_pos, steps=len(visited_start) + len(visited_end), visited=visited_start.union(visited_end))
-            stdscr.refresh()
-            
-            # Add the end position to the path, return the path
-            path += [current_end]
-            return True, path, len(path)-1, len(visited_start) + len(visited_end), visited_start.union(visited_end)
-        
-        # If end meets start, reconstruct the path
-        if current_end in visited_start:
-            path = reconstruct_path(came_from_start, came_from_end, current_end)
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    cells, moves = grid.cells, grid.moves           # Cells and moves to the neighbors
+    start, end = search_endpoints(grid, start, end) # Start and end indices
+
+    workspace = workspace or Workspace(grid.size)   # Reused search buffers
+    generation = workspace.begin()                  # Stamp of the cells reached by this search
+
+    # Reached stamps, parents, and distances from each end, the forward search from the start and the backward search from the end
+    forward = [workspace.seen, workspace.parent, workspace.g_score, [start]]
+    backward = [workspace.seen_back, workspace.parent_back, workspace.g_score_back, [end]]
+    for (reached, parent, distance, frontier), node in ((forward, start), (backward, end)):
+        reached[node] = generation
+        distance[node] = 0
+    expanded = []                                   # Visited positions of both searches, in the order they were visited
+    expanded_start = expanded_end = 0
+
+    frontier_peak = 2
+    meeting_point = start if start == end else None
+    while meeting_point is None and forward[3] and backward[3]:
+        # Expand a whole level of the smaller frontier
+        side, other = (forward, backward) if len(forward[3]) <= len(backward[3]) else (backward, forward)
+        reached, parent, distance, frontier = side
+        other_reached, other_distance = other[0], other[2]
+
+        best = math.inf                             # Shortest path through the cells where the searches met
+        level = []
+        for current in frontier:
+            expanded.append(current)
+            if observer:
+                observer("expand", len(expanded), grid.position(current), [])
             
-            # Print the maze with the path
-            stdscr.clear()
-            print_maze(maze, stdscr, path=path, start=start_pos, end=end_pos, steps=len(visited_start) + len(visited_end), visited=visited_start.union(visited_end))
-            stdscr.refresh()
-            
-            # Add the end position to the path, return the path
-            path += [current_end]
-            return True, path, len(path)-1, len(visited_start) + len(visited_end), visited_start.union(visited_end)
-
-        # Else, add the current positions to the visited sets
-        visited_start.add(current_start)
-        visited_end.add(current_end)
-        row_start, col_start = current_start
-        row_end, col_end = current_end
-
-        # Print the maze
-        stdscr.clear()
-        print_maze(maze, stdscr, path=[], start=start_pos, end=end_pos, steps=len(visited_start) + len(visited_end), visited=visited_start.union(visited_end))
-        stdscr.refresh()
+            for offset, cost, side_a, side_b in moves:
+                neighbor = current + offset
+                if reached[neighbor] == generation or cells[neighbor]:
+                    continue
+                if side_a and grid.corner_blocked(current, side_a, side_b):
+                    continue
+                reached[neighbor] = generation
+                parent[neighbor] = current
+                distance[neighbor] = distance[current] + 1
+                level.append(neighbor)
+                
+                # The searches met, finish the level and keep the best meeting point
+                if other_reached[neighbor] == generation and distance[neighbor] + other_distance[neighbor] < best:
+                    best = distance[neighbor] + other_distance[neighbor]
+                    meeting_point = neighbor
+
+        if side is forward:
+            expanded_start += len(frontier)
+        else:
+            expanded_end += len(frontier)
+        side[3] = level
+        if len(forward[3]) + len(backward[3]) > frontier_peak:
+            frontier_peak = len(forward[3]) + len(backward[3])
 
-        # Find the neighbors of the current positions from the start
-        neighbors_start = find_neighbors(maze, row_start, col_start)
-        
-        # For each neighbor in the start set, if it has not been visited and is not a wall, add it to the queue
-        for neighbor in neighbors_start:
-            if neighbor not in visited_start and maze[neighbor[0]][neighbor[1]] != "#":
-                open_set_start.put(neighbor)
-                came_from_start[neighbor] = current_start
-
-        # Find the neighbors of the current positions from the end
-        neighbors_end = find_neighbors(maze, row_end, col_end)
-        
-        # For each neighbor in the end set, if it has not been visited and is not a wall, add it to the queue
-        for neighbor in neighbors_end:
-            if neighbor not in visited_end and maze[neighbor[0]][neighbor[1]] != "#":
-                open_set_end.put(neighbor)
-                came_from_end[neighbor] = current_end
-
-    # If no path is found, return False
-    stdscr.addstr(len(maze), len(maze[0])//2, "No path found!")
-    return False, [], 0, len(visited_start) + len(visited_end), visited_start.union(visited_end)    
-
-def iddfs(maze, stdscr):
+    path = []
+    if meeting_point is not None:           # From the start to the meeting point, then on to the end
+        path = trace_path(forward[1], start, meeting_point) + trace_path(backward[1], end, meeting_point)[-2::-1]
+        path = grid.positions(path)
+    if observer:
+        observer("done", len(expanded), path=path)
+    if stats is not None:
+        stats.update(frontier_peak=frontier_peak, expanded_start=expanded_start, expanded_end=expanded_end)
+    return bool(path), path, max(len(path)-1, 0), len(expanded), grid.positions(expanded)
+
+@connected_endpoints
+def bidirectional_a_star(maze, observer=None, heuristic_type="manhattan", stats=None, start=None, end=None, workspace=None):
     """
-    Iterative Deepening Depth-First Search algorithm to find the shortest path in a maze.
+    Bidirectional A* Search algorithm to find the shortest path in a maze.
+    Two A* searches run from the start towards the end, and from the end towards the start, each step expanding the 
+    side with the smaller open set. On weighted grids, a step costs the cost of the cell it enters going towards the end. Every time a search reaches a cell reached by the other one, the path through it 
+    is a candidate. The shortest candidate is optimal once the lowest f-score of either open set is at least its length,
+    as every path still to be found goes through both open sets.
     
     Parameters:
-        maze (list) - A 2D list representing the maze.
-        stdscr - The curses window object.
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
+        heuristic_type (str) - The heuristic function to use. Default is "manhattan".
+        stats (dict, optional) - Filled with search statistics, the frontier high-water mark, the open set counters, the number of positions expanded by each search, and the cost of the path.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Search buffers of the grid to reuse, allocated for this search by default.
     
     Returns:
         bool - True if the path is found, False otherwise.
@@ -660,94 +1226,225 @@ def iddfs(maze, stdscr):
         int - The number of steps taken.
         list - The list of visited positions.
     """
-    start = "O"                         # Start position
-    end = "X"                           # End position
-    start_pos = find_val(maze, start)   # Find the start position
-    end_pos = find_val(maze, end)       # Find the end position
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    cells, moves = grid.cells, grid.moves           # Cells and moves to the neighbors
+    costs = grid.costs                              # Step costs, None if every step costs 1
+    start, end = search_endpoints(grid, start, end) # Start and end indices
+
+    workspace = workspace or Workspace(grid.size)   # Reused search buffers
+    generation = workspace.begin()                  # Stamp of the cells reached by this search
+
+    # Open set, reached and visited stamps, parents, g-scores and target of the forward and backward searches
+    integer = grid.connectivity == 4                # g-scores with fractions on 8-connected grids
+    forward = (OpenSet(), workspace.seen, workspace.closed, workspace.parent, workspace.g_score if integer else workspace.g_cost, grid.position(end))
+    backward = (OpenSet(), workspace.seen_back, workspace.closed_back, workspace.parent_back, workspace.g_score_back if integer else workspace.g_cost_back, grid.position(start))
+    for (open_set, reached, visited, parent, g_score, target), node in ((forward, start), (backward, end)):
+        h = heuristic(grid.position(node), target, heuristic_type)
+        open_set.push(node, h, h)
+        reached[node] = generation
+        g_score[node] = 0
+    expanded = []                                   # Visited positions of both searches, in the order they were visited
+    expanded_start = expanded_end = 0
+
+    best = 0 if start == end else math.inf          # Length of the shortest path found so far
+    meeting_point = start if start == end else None
+    frontier_peak = 2
+    while forward[0] and backward[0]:
+        # Stop once no path through either open set can be shorter than the best path found
+        if forward[0].peek()[1] >= best or backward[0].peek()[1] >= best:
+            break
+
+        # Expand the side with the smaller open set
+        side, other = (forward, backward) if len(forward[0]) <= len(backward[0]) else (backward, forward)
+        open_set, reached, visited, parent, g_score, target = side
+        other_reached, other_g_score = other[1], other[4]
+
+        current = open_set.pop()[0]
+        visited[current] = generation
+        expanded.append(current)
+        if side is forward:
+            expanded_start += 1
+        else:
+            expanded_end += 1
+        if observer:
+            observer("expand", len(expanded), grid.position(current), [])
+
+        for offset, cost, side_a, side_b in moves:
+            neighbor = current + offset
+            if visited[neighbor] == generation or cells[neighbor]:
+                continue
+            if side_a and grid.corner_blocked(current, side_a, side_b):
+                continue
+            if costs is not None:                   # The cost of stepping onto the cell closer to the end
+                cost *= costs[current if side is backward else neighbor]
+            tentative_g_score = g_score[current] + cost
+            if reached[neighbor] != generation or tentative_g_score < g_score[neighbor]:
+                reached[neighbor] = generation
+                parent[neighbor] = current
+                g_score[neighbor] = tentative_g_score
+                h = heuristic(grid.position(neighbor), target, heuristic_type)
+                open_set.push(neighbor, tentative_g_score + h, h)
+                
+                # The searches met, keep the shortest path through the meeting cells
+                if other_reached[neighbor] == generation and tentative_g_score + other_g_score[neighbor] < best:
+                    best = tentative_g_score + other_g_score[neighbor]
+                    meeting_point = neighbor
+        if len(forward[0]) + len(backward[0]) > frontier_peak:
+            frontier_peak = len(forward[0]) + len(backward[0])
 
-    def DLS(current_pos, depth, path, visited):
-        """Function to perform Depth-Limited Search."""
-        nonlocal steps
-        
-        # If the depth is 0 and the current position is the end position, return True
-        if depth == 0 and current_pos == end_pos:
-            return True
-        # Else, if the depth is greater than 0
-        if depth > 0:
-            row, col = current_pos                      # Get the row and column of the current position
-            neighbors = find_neighbors(maze, row, col)  # Find the neighbors of the current position
+    path = []
+    if meeting_point is not None:           # From the start to the meeting point, then on to the end
+        path = trace_path(forward[3], start, meeting_point) + trace_path(backward[3], end, meeting_point)[-2::-1]
+        path = grid.positions(path)
+    if observer:
+        observer("done", len(expanded), path=path)
+    if stats is not None:
+        stats.update(frontier_peak=frontier_peak, expanded_start=expanded_start, expanded_end=expanded_end,
+                     pushes=forward[0].pushes + backward[0].pushes, stale_pops=forward[0].stale_pops + backward[0].stale_pops,
+                     cost=best if path else None)
+    return bool(path), path, max(len(path)-1, 0), len(expanded), grid.positions(expanded)
+
+def iterative_deepening(grid, start, end, h=None, observer=None, stats=None):
+    """
+    Iterative deepening engine of IDDFS and IDA*, a depth-first search repeated with a growing bound on f = g + h.
+    The search is iterative, with an explicit stack of the current path and of the next neighbor to try at every 
+    depth, and only the cells on the current path are remembered, so the memory grows with the depth of the search
+    rather than with the size of the maze. Each iteration raises the bound to the smallest f that exceeded it.
+    
+    Parameters:
+        grid (Grid) - The maze.
+        start (int) - The start index.
+        end (int) - The end index.
+        h (function, optional) - The heuristic, called as h(index), 0 everywhere by default, which makes the search an IDDFS
+            where every move counts 1. Otherwise g is the cost of the moves, sqrt(2) for diagonal moves, times the cost
+            of the cell entered on weighted grids.
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
+        stats (dict, optional) - Filled with search statistics, the deepest path explored, the number of iterations and the last bound.
+    
+    Returns:
+        tuple - (found, path, length, steps, visited), visited being the path as no other cell is remembered.
+    """
+    cells, moves = grid.cells, grid.moves           # Cells and moves to the neighbors
+    costs = grid.costs                              # Step costs, None if every step costs 1
+    directions = len(moves)
+
+    bound = h(start) if h else 0                    # Bound on f of the current iteration
+    steps = 0
+    iterations = 0
+    frontier_peak = 1
+    found = False
+    while True:
+        iterations += 1
+        next_bound = math.inf                       # Smallest f above the bound
+        path = [start]                              # Stack of the cells on the current path
+        g = [0]                                     # Cost of the path to every cell on the path
+        tried = [0]                                 # Number of neighbors tried, for every cell on the path
+        on_path = {start}
+        while path:
+            current = path[-1]
+            if current == end:
+                found = True
+                break
             
-            # For each neighbor, if it has not been visited and is not a wall, add it to the path
-            for neighbor in neighbors:
-                if neighbor not in visited and maze[neighbor[0]][neighbor[1]] != "#":
-                    visited.add(neighbor)   # Add the neighbor to the visited set
-                    path.append(neighbor)   # Add the neighbor to the path
-                    steps+=1
-
-                    # If the neighbor is the end position, return True
-                    if DLS(neighbor, depth - 1, path, visited):
-                        return True
-                    # Else, remove the neighbor from the path
-                    path.pop()  
+            # All the neighbors were tried, backtrack
+            i = tried[-1]
+            if i == directions:
+                on_path.discard(path.pop())
+                g.pop()
+                tried.pop()
+                continue
+            tried[-1] = i + 1
             
-            # Print the maze
-            stdscr.clear()
-            print_maze(maze, stdscr, path=path, start=start_pos, end=end_pos, steps=steps, visited=visited)
-            stdscr.refresh()
-        # If the depth is 0, return False    
-        return False
-
-    depth = 0               # Initial depth
-    visited = set()         # Set to store visited positions
-    path = [start_pos]      # List to store the path
-    visited.add(start_pos)  # Add the start position to the visited set
-
-    steps=0
-    while True: 
-        # If the Depth-Limited Search returns True, return the path
-        if DLS(start_pos, depth, path, visited):
-            return True, path, len(path)-1, steps, visited
-        steps += 1
-        
-        # Else, if the depth is greater than the number of cells in the maze, return False
-        if depth > len(maze[1])*len(maze[0]): 
-            return False, [], 0, steps, visited
-        
-        # Increment the depth, clear the visited set, and add the start position to the visited set
-        depth +=1
-        visited.clear() 
-        path = [start_pos]
-        visited.add(start_pos)
+            # Try the next neighbor, if it is open, not on the path, and within the bound
+            offset, cost, side_a, side_b = moves[i]
+            neighbor = current + offset
+            if cells[neighbor] or neighbor in on_path:
+                continue
+            if side_a and grid.corner_blocked(current, side_a, side_b):
+                continue
+            if not h:
+                g_neighbor = g[-1] + 1              # IDDFS limits the depth, every move counts 1
+            else:
+                g_neighbor = g[-1] + (costs[neighbor] * cost if costs is not None else cost)
+            f = g_neighbor + h(neighbor) if h else g_neighbor
+            if f > bound:
+                if f < next_bound:
+                    next_bound = f
+                continue
+            
+            path.append(neighbor)
+            g.append(g_neighbor)
+            tried.append(0)
+            on_path.add(neighbor)
+            steps += 1
+            if len(path) > frontier_peak:
+                frontier_peak = len(path)
+            if observer:
+                observer("expand", steps, grid.position(neighbor), grid.positions(path))
         
-        # Print the maze
-        stdscr.clear()
-        print_maze(maze, stdscr, path=path, start=start_pos, end=end_pos, steps=steps, visited=visited)
-        stdscr.refresh()
-               
-def find_neighbors(maze, row, col):
+        # Stop once the path is found, or when no cell was cut off by the bound
+        if found or next_bound == math.inf:
+            break
+        bound = next_bound
+
+    path = grid.positions(path) if found else []
+    if observer:
+        observer("done", steps, path=path)
+    if stats is not None:
+        stats.update(frontier_peak=frontier_peak, iterations=iterations, bound=bound)
+    return found, path, max(len(path)-1, 0), steps, path
+
+@connected_endpoints
+def iddfs(maze, observer=None, stats=None, start=None, end=None, workspace=None):
     """
-    Finds the neighbors of a given position in a maze.
+    Iterative Deepening Depth-First Search algorithm to find the shortest path in a maze.
+    Depth-limited searches are repeated with a depth limit growing by one, see iterative_deepening().
     
     Parameters:
-        maze (list) - A 2D list representing the maze.
-        row (int) - The row of the position.
-        col (int) - The column of the position.
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
+        stats (dict, optional) - Filled with search statistics, the deepest path explored, the number of iterations and the last depth limit.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Not used, the search only remembers the current path.
     
     Returns:
-        list - A list of neighboring positions.
+        bool - True if the path is found, False otherwise.
+        list - The path from the start to the end position.
+        int - The length of the path.
+        int - The number of steps taken.
+        list - The path, the only positions remembered.
     """
-    neighbors = []  # List to store neighbors
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    start, end = search_endpoints(grid, start, end) # Start and end indices
+    return iterative_deepening(grid, start, end, observer=observer, stats=stats)
 
-    if row > 0:                             # UP
-        neighbors.append((row - 1, col))
-    if row + 1 < len(maze):                 # DOWN
-        neighbors.append((row + 1, col))
-    if col > 0:                             # LEFT
-        neighbors.append((row, col - 1))
-    if col + 1 < len(maze[0]):              # RIGHT
-        neighbors.append((row, col + 1))
-
-    return neighbors
+@connected_endpoints
+def ida_star(maze, observer=None, heuristic_type="manhattan", stats=None, start=None, end=None, workspace=None):
+    """
+    Iterative Deepening A* algorithm to find the shortest path in a maze.
+    Depth-first searches are repeated with a growing bound on the f-score, see iterative_deepening().
+    
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
+        heuristic_type (str) - The heuristic function to use. Default is "manhattan".
+        stats (dict, optional) - Filled with search statistics, the deepest path explored, the number of iterations and the last bound.
+        start (tuple, optional) - The (row, col) start position, the maze's 'O' by default.
+        end (tuple, optional) - The (row, col) end position, the maze's 'X' by default.
+        workspace (Workspace, optional) - Not used, the search only remembers the current path.
+    
+    Returns:
+        bool - True if the path is found, False otherwise.
+        list - The path from the start to the end position.
+        int - The length of the path.
+        int - The number of steps taken.
+        list - The path, the only positions remembered.
+    """
+    grid = as_grid(maze)                            # Convert the maze to a grid
+    start, end = search_endpoints(grid, start, end) # Start and end indices
+    end_pos = grid.position(end)
+    return iterative_deepening(grid, start, end, lambda node: heuristic(grid.position(node), end_pos, heuristic_type), observer, stats)
 
 def print_results(stdscr, methods, maze, cols=3):
     """
@@ -756,9 +1453,12 @@ def print_results(stdscr, methods, maze, cols=3):
     Parameters:
         stdscr - The curses window object.
         methods (list) - A list of tuples containing the name of the algorithm and the results.
-        maze (list) - A 2D list representing the maze
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid
         cols (int) - Number of columns to print the results in
     """
+    if isinstance(maze, Grid):          # Print grids as their 2D list
+        maze = maze.to_maze()
+    
     # Find the start and end positions
     start = find_val(maze, "O")
     end = find_val(maze, "X")
@@ -795,14 +1495,232 @@ def print_results(stdscr, methods, maze, cols=3):
     stdscr.refresh()
     stdscr.getch()
         
-def main(stdscr):
-    # Define the arguments, and parse them
+# Solvers by name, every entry is called as solver(maze, observer=None, stats=None, start=None, end=None, workspace=None)
+ALGORITHMS = {
+    "bfs": bfs,
+    "gbfs": gbfs,
+    "dfs": dfs,
+    "astar-manhattan": partial(a_star, heuristic_type="manhattan"),
+    "astar-euclidean": partial(a_star, heuristic_type="euclidean"),
+    "astar-chebyshev": partial(a_star, heuristic_type="chebyshev"),
+    "astar-octile": partial(a_star, heuristic_type="octile"),
+    "jps": jps,
+    "dijkstra": dijkstra,
+    "flow": flow,
+    "hpa": hpa_star,
+    "bidirectional": bidirectional,
+    "bidirectional-astar": partial(bidirectional_a_star, heuristic_type="manhattan"),
+    "bidirectional-astar-octile": partial(bidirectional_a_star, heuristic_type="octile"),
+    "iddfs": iddfs,
+    "idastar-manhattan": partial(ida_star, heuristic_type="manhattan"),
+}
+
+# The algorithms compared by main(), as (display name, algorithm name)
+COMPARISON = [
+    ("bfs", "bfs"),
+    ("Greedy bfs", "gbfs"),
+    ("dfs", "dfs"),
+    ("dijkstra", "dijkstra"),
+    ("bidirectional", "bidirectional"),
+    ("bidirectional A*", "bidirectional-astar"),
+    ("astar-manhattan", "astar-manhattan"),
+    ("astar-euclidean", "astar-euclidean"),
+    ("astar-chebyshev", "astar-chebyshev"),
+    ("astar-octile", "astar-octile"),
+    ("jps", "jps"),
+]
+
+# The algorithms that only move in the four directions
+FOUR_CONNECTED = ("jps", "hpa")
+
+# The algorithms of a comparison replaced on 8-connected grids, where the manhattan heuristic overestimates
+EIGHT_CONNECTED = {"bidirectional-astar": "bidirectional-astar-octile"}
+
+def comparison_for(grid, comparison=COMPARISON):
+    """
+    Returns the algorithms of a comparison that can run on a grid. On 8-connected grids, the 4-connected ones are
+    left out, and the shortest path searches that use the manhattan heuristic by default use the octile one.
+    """
+    if grid.connectivity == 4:
+        return comparison
+    return [(name, EIGHT_CONNECTED.get(algorithm, algorithm)) for name, algorithm in comparison if algorithm not in FOUR_CONNECTED]
+
+def solve(maze, algorithm="bfs", observer=None, stats=None, **options):
+    """
+    Runs a path finding algorithm on a maze, headless unless an observer is given.
+    
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        algorithm (str) - The name of the algorithm, one of ALGORITHMS. Default is "bfs".
+        observer (function, optional) - Called as observer(event, steps, node, path) on every expansion and once when done.
+        stats (dict, optional) - Filled with search statistics, see the algorithms.
+        **options - Passed on to the algorithm: start and end (row, col) positions, and a reusable workspace.
+    
+    Returns:
+        tuple - (found, path, length, steps, visited), as returned by the algorithm.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, valid algorithms are: {', '.join(ALGORITHMS)}")
+    return ALGORITHMS[algorithm](maze, observer=observer, stats=stats, **options)
+
+# Maze shared by the tasks of a worker process, sent once when the worker starts
+_worker_grid = None
+
+def _init_worker(grid):
+    """Stores the maze in the worker process."""
+    global _worker_grid
+    _worker_grid = grid
+
+def _on_timeout(signum, frame):
+    raise TimeoutError
+
+def _solve_task(algorithm, timeout=None):
+    """
+    Runs an algorithm headless on the maze of the worker process, for the parallel comparison.
+    Where the platform supports interval timers, the search is interrupted once it runs for longer than timeout seconds.
+    
+    Returns:
+        tuple - (found, path, length, steps, visited, elapsed), or None if the search timed out.
+    """
+    timer = timeout is not None and hasattr(signal, "setitimer")
+    if timer:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        t0 = time.perf_counter()
+        result = solve(_worker_grid, algorithm)
+        return result + (time.perf_counter() - t0,)
+    except TimeoutError:
+        return None
+    finally:
+        if timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+def compare_parallel(maze, comparison=COMPARISON, workers=None, timeout=None, on_result=None):
+    """
+    Runs the algorithm comparison headless, with every algorithm in its own task of a process pool.
+    Results are collected as they finish, so the comparison takes about as long as the slowest algorithm.
+
+    Parameters:
+        maze (list or Grid) - A 2D list representing the maze, or the maze as a Grid.
+        comparison (list) - The algorithms to run, as (display name, algorithm name). Default is COMPARISON.
+        workers (int, optional) - The number of worker processes, one per algorithm up to the number of CPUs by default.
+        timeout (float, optional) - The time limit of each algorithm in seconds, no limit by default.
+        on_result (function, optional) - Called as on_result(name, result, elapsed) as every algorithm finishes,
+            result is None if the algorithm timed out.
+
+    Returns:
+        list - [name, found, path, length, steps, visited] of every algorithm in the comparison order, as taken
+            by print_results. Algorithms that timed out are named "<name> (timeout)" and have no path.
+    """
+    grid = as_grid(maze)
+    workers = workers or min(len(comparison), os.cpu_count() or 1)
+    results = {}
+
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(grid,))
+    try:
+        futures = {executor.submit(_solve_task, algorithm, timeout): name for name, algorithm in comparison}
+
+        # Without interval timers a running search can't be interrupted, so the whole comparison gets a deadline instead
+        deadline = None
+        if timeout is not None and not hasattr(signal, "setitimer"):
+            deadline = timeout * -(-len(comparison) // workers)
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                name = futures[future]
+                outcome = future.result()
+                results[name] = outcome
+                if on_result:
+                    on_result(name, outcome and outcome[:5], outcome[5] if outcome else timeout)
+        except FutureTimeoutError:
+            # The searches still running can't be cancelled, and the pool would join them at exit, so stop their workers
+            for process in list(executor._processes.values()):
+                process.terminate()
+            for future, name in futures.items():
+                if name not in results:
+                    results[name] = None
+                    if on_result:
+                        on_result(name, None, timeout)
+    finally:
+        executor.shutdown(wait=deadline is None, cancel_futures=True)
+
+    methods = []
+    for name, _ in comparison:
+        outcome = results.get(name)
+        if outcome is None:
+            methods.append([f"{name} (timeout)", False, [], 0, 0, []])
+        else:
+            methods.append([name] + list(outcome[:5]))
+    return methods
+
+def parse_args(argv=None):
+    """Defines the command line arguments, and parses them."""
     parser = argparse.ArgumentParser(description="Maze Path Finder")
     parser.add_argument("--rows", type=int, default=10, help="Number of rows in the maze")
     parser.add_argument("--cols", type=int, default=10, help="Number of columns in the maze")
-    parser.add_argument("--maze_type", type=int, default=0, help="Type of maze to generate: Maze type small: 0, Maze type large: 1, Maze type csv: 2, Random grid maze: 3, Random maze: 4")
-    args = parser.parse_args()
+    parser.add_argument("--maze_type", type=int, default=0, help="Type of maze to generate: Maze type small: 0, Maze type large: 1, Maze type csv: 2, Random grid maze: 3, Random maze: 4, Perfect maze: 5")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the random maze generators, for reproducible mazes")
+    parser.add_argument("--maze_file", default=None, help="Load the maze from a CSV or binary maze file instead of generating one")
+    parser.add_argument("--headless", action="store_true", help="Run the algorithms without the curses visualization and print a summary")
+    parser.add_argument("--fps", type=float, default=None, help="Maximum frames per second of the visualization, no limit by default")
+    parser.add_argument("--render_every", type=int, default=1, help="Draw a frame of the visualization every N expansions")
+    parser.add_argument("--parallel", action="store_true", help="Run the algorithms at the same time in a process pool, without the animation")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes of --parallel, one per algorithm up to the number of CPUs by default")
+    parser.add_argument("--timeout", type=float, default=None, help="Time limit of each algorithm with --parallel in seconds, no limit by default")
+    parser.add_argument("--connectivity", type=int, choices=CONNECTIVITY, default=4, help="Move in 4 directions, or in 8 with the diagonals")
+    parser.add_argument("--corner_cutting", choices=CORNER_CUTTING, default="never", help="Diagonal moves past the corner of a wall: never, past one wall, or always")
+    args = parser.parse_args(argv)
+    if args.maze_type == 5 and not args.maze_file and (args.rows < 3 or args.cols < 3):
+        parser.error(f"a perfect maze (--maze_type 5) needs at least 3 rows and 3 columns, not {args.rows}x{args.cols}")
+    return args
+
+def make_maze(args):
+    """Generates the maze selected by the command line arguments, returns None for an invalid maze type."""
+    if args.maze_file:              # Binary maze files are mapped as a Grid
+        return maze_csv(args.maze_file) if args.maze_file.endswith(".csv") else load_maze(args.maze_file)
+    maze_generators = {
+        0: maze_small,
+        1: maze_large,
+        2: maze_csv,
+        3: lambda: generate.random_grid_maze(args.rows, args.cols, seed=args.seed),
+        4: lambda: generate.random_maze(args.rows, args.cols, seed=args.seed),
+        5: lambda: perfect_maze(args.rows, args.cols, seed=args.seed)
+    }
+    return maze_generators.get(args.maze_type, lambda: None)()
+
+def run_headless(args):
+    """Runs the algorithm comparison without a terminal, and prints the results as text."""
+    maze = make_maze(args)
+    if maze is None:
+        print(f"Invalid maze type {args.maze_type}, please choose a valid maze type.\nValid maze types are: small:0, large:1, csv:2, random grid maze:3, random maze:4, perfect maze:5")
+        return
+    grid = as_grid(maze)            # Convert the maze once, for all the algorithms
+    grid.set_connectivity(args.connectivity, args.corner_cutting)
+    comparison = comparison_for(grid)
     
+    labels = components(grid)
+    print(f"{labels.count} connected components")
+    if not labels.connected(grid.start, grid.end):
+        start_size = labels.size(grid.start) if grid.start is not None else 0
+        end_size = labels.size(grid.end) if grid.end is not None else 0
+        print(f"No path: the start and the end are in different components, of {start_size} and {end_size} cells")
+    print(f"{'Algorithm':<18}{'Found':<7}{'Length':>8}{'Steps':>10}{'Time (s)':>12}")
+    if args.parallel:               # Print the results in the order the algorithms finish
+        def on_result(name, result, elapsed):
+            if result is None:
+                print(f"{name:<18}{'timed out after':>25}{elapsed:>12.4f}")
+            else:
+                found, path, path_length, steps, visited = result
+                print(f"{name:<18}{str(found):<7}{path_length:>8}{steps:>10}{elapsed:>12.4f}")
+        compare_parallel(grid, comparison, workers=args.workers, timeout=args.timeout, on_result=on_result)
+        return
+    for name, algorithm in comparison:
+        t0 = time.perf_counter()
+        found, path, path_length, steps, visited = solve(grid, algorithm)
+        elapsed = time.perf_counter() - t0
+        print(f"{name:<18}{str(found):<7}{path_length:>8}{steps:>10}{elapsed:>12.4f}")
+
+def main(stdscr, args):
     # Initialize the curses window, set the colors
     curses.init_pair(1, curses.COLOR_BLUE, curses.COLOR_BLACK)
     curses.init_pair(2, curses.COLOR_RED, curses.COLOR_BLACK)
@@ -812,54 +1730,36 @@ def main(stdscr):
 
     # Maze generation
     # -------------------------------------------
-    maze_generators = {
-        0: maze_small,
-        1: maze_large,
-        2: maze_csv,
-        3: lambda: random_grid_maze(args.rows, args.cols),
-        4: lambda: random_maze(args.rows, args.cols)
-    }
-
-    maze = maze_generators.get(args.maze_type, lambda: None)()
+    maze = make_maze(args)
     if maze is None:
-        print(f"Invalid maze type {args.maze_type}, please choose a valid maze type.\nValid maze types are: small:0, large:1, csv:2, random grid maze:3, random maze:4")
+        print(f"Invalid maze type {args.maze_type}, please choose a valid maze type.\nValid maze types are: small:0, large:1, csv:2, random grid maze:3, random maze:4, perfect maze:5")
         return
     
-    # Run the path finding algorithms
+    # Run the path finding algorithms, animated by the curses renderer
     # -------------------------------------------
-    bfss = bfs(maze, stdscr)
-    bfss = ["bfs"] + list(bfss)
-    
-    gbfss = gbfs(maze, stdscr)
-    gbfss = ["Greedy bfs"] + list(gbfss)
-    
-    dfss = dfs(maze, stdscr)
-    dfss = ["dfs"] + list(dfss)
-    
-    astar_m = a_star(maze, stdscr, "manhattan")
-    astar_m = ["astar-manhattan"] + list(astar_m)
-    
-    astar_e = a_star(maze, stdscr, "euclidean")
-    astar_e = ["astar-euclidean"] + list(astar_e)
-    
-    astar_c = a_star(maze, stdscr, "chebyshev")
-    astar_c = ["astar-chebyshev"] + list(astar_c)
-    
-    astar_o = a_star(maze, stdscr, "octile")
-    astar_o = ["astar-octile"] + list(astar_o)
-    
-    dijk = dijkstra(maze, stdscr)
-    dijk = ["dijkstra"] + list(dijk)
-    
-    bi = bidirectional(maze, stdscr)
-    bi = ["bidirectional"] + list(bi)
+    grid = as_grid(maze)            # Convert the maze once, for all the algorithms
+    grid.set_connectivity(args.connectivity, args.corner_cutting)
+    comparison = comparison_for(grid)
+    if args.parallel:               # Run the algorithms in a process pool, and only show the results
+        stdscr.addstr(0, 0, "Running the algorithms in parallel...")
+        stdscr.refresh()
+        print_results(stdscr, compare_parallel(grid, comparison, workers=args.workers, timeout=args.timeout), maze)
+        return
+    observer = CursesRenderer(stdscr, maze, fps=args.fps, every=args.render_every)
+    results = []
+    for name, algorithm in comparison:
+        results.append([name] + list(solve(grid, algorithm, observer)))
     
-    # iddfss = iddfs(maze, stdscr)
+    # iddfss = solve(grid, "iddfs", observer)
     # iddfss = ["iddfs"] + list(iddfss)
     # stdscr.getch()
     
     # Print the results, and wait for a key press        
-    print_results(stdscr, [bfss,gbfss, dfss, dijk, bi, astar_m, astar_e, astar_c, astar_o] ,maze)
+    print_results(stdscr, results, maze)
     
 if __name__ == "__main__":
-    wrapper(main)
\ No newline at end of file
+    args = parse_args()
+    if args.headless:
+        run_headless(args)
+    else:
+        wrapper(main, args)
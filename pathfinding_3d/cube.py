@@ -0,0 +1,171 @@
+"""
+Cube mazes without a window: generation, start and end placement, and solving, for scripts and benchmarks.
+
+main.py draws these mazes with Ursina; this module only needs pathfinding.py, so it runs on machines without
+a display. Run as a script, it generates seeded cube mazes, solves them and prints the timings and path stats.
+
+Usage:
+    python pathfinding_3d/cube.py --maze-size 200 --wall-prob 0.3 --seed 1 --repeat 5
+"""
+import argparse
+import random
+import sys
+import time
+
+from pathfinding import FACES, PathFinder, adjacency, path_finder_bfs
+
+
+def gen_grid_maze(size, wall_probability=0.3, rng=random):
+    """
+    Generates a 2D grid maze with walls placed randomly based on a given probability.
+
+    Args:
+        size (int): The size of the maze (size x size).
+        wall_probability (float, optional): The probability of placing a wall at any given cell. Defaults to 0.3.
+        rng (random.Random, optional): The random generator, the random module by default.
+
+    Returns:
+        list[list[int]]: A 2D list representing the maze, where 0 indicates an open cell and 1 indicates a wall.
+    """
+    return [[1 if rng.random() < wall_probability else 0 for _ in range(size)] for _ in range(size)]
+
+
+def generate_mazes(maze_size, wall_probability=0.3, rng=random):
+    """
+    Generates a maze for every face of the cube.
+
+    Args:
+        maze_size (int): An integer representing the length of a cubical maze.
+        wall_probability (float, optional): The probability of placing a wall at any given cell. Defaults to 0.3.
+        rng (random.Random, optional): The random generator, the random module by default.
+
+    Returns:
+        dict: A dictionary where keys are the faces and values are 2D lists representing the maze grid on each face.
+    """
+    return {face: gen_grid_maze(maze_size, wall_probability, rng) for face in FACES}
+
+
+def place_start_end(mazes, maze_size, rng=random):
+    """
+    Places the start ('S') and end ('E') positions randomly on open cells of the cube, the end not on the start.
+
+    Args:
+        mazes (dict): A dictionary where keys are face identifiers and values are 2D lists representing the maze grid on each face.
+        maze_size (int): An integer representing the length of a cubical maze.
+        rng (random.Random, optional): The random generator, the random module by default.
+
+    Returns:
+        tuple: A tuple containing:
+            - start_face (str): The face identifier where the start position is placed.
+            - start_pos (tuple): The (row, column) position of the start within the start_face.
+            - end_face (str): The face identifier where the end position is placed.
+            - end_pos (tuple): The (row, column) position of the end within the end_face.
+    """
+    if sum(row.count(0) for maze in mazes.values() for row in maze) < 2:
+        raise ValueError("The cube needs at least two open cells for the start and the end")
+
+    start_face = rng.choice(list(mazes.keys()))                                     # Choose random face for start
+    start_pos = (rng.randint(0, maze_size - 1), rng.randint(0, maze_size - 1))
+    while mazes[start_face][start_pos[0]][start_pos[1]] == 1:                       # Choose non-wall position for start
+        start_face = rng.choice(list(mazes.keys()))
+        start_pos = (rng.randint(0, maze_size - 1), rng.randint(0, maze_size - 1))
+    mazes[start_face][start_pos[0]][start_pos[1]] = 'S'                             # Add start to maze as 'S'
+
+    end_face = rng.choice(list(mazes.keys()))                                       # Choose random face for end
+    end_pos = (rng.randint(0, maze_size - 1), rng.randint(0, maze_size - 1))
+    while mazes[end_face][end_pos[0]][end_pos[1]] != 0:                             # Choose non-wall position for end, not the start
+        end_face = rng.choice(list(mazes.keys()))
+        end_pos = (rng.randint(0, maze_size - 1), rng.randint(0, maze_size - 1))
+    mazes[end_face][end_pos[0]][end_pos[1]] = 'E'                                   # Add end to maze as 'E'
+
+    return start_face, start_pos, end_face, end_pos
+
+
+def step_by_step(mazes, start_face, start_pos, end_face, end_pos, maze_size, batch=4096):
+    """
+    Solves a cube maze with PathFinder, advancing batch cells at a time like the visualization does.
+
+    Args and returns are the same as path_finder_bfs(), with:
+        batch (int, optional): The number of cells expanded by every call to PathFinder.advance(). Defaults to 4096.
+    """
+    path_finder = PathFinder(mazes, start_face, start_pos, end_face, end_pos, maze_size)
+    while not path_finder.finished:
+        path_finder.advance(batch)
+    return path_finder.get_path(), path_finder.get_visited()
+
+
+# Solvers by name, called as solver(mazes, start_face, start_pos, end_face, end_pos, maze_size)
+ALGORITHMS = {
+    'bfs': path_finder_bfs,
+    'stepper': step_by_step,
+}
+
+
+def solve(mazes, start_face, start_pos, end_face, end_pos, maze_size, algorithm='bfs'):
+    """
+    Finds the shortest path between two cells of a cube maze.
+
+    Args:
+        mazes (dict): A dictionary where keys are face identifiers and values are 2D lists representing the maze grid.
+        start_face (str): The face of the start position.
+        start_pos (tuple): A tuple (x, y) representing the starting position on the start_face.
+        end_face (str): The face of the end position.
+        end_pos (tuple): A tuple (x, y) representing the ending position on the end_face.
+        maze_size (int): An integer representing the length of a cubical maze.
+        algorithm (str, optional): The name of the solver, one of ALGORITHMS. Defaults to 'bfs'.
+
+    Returns:
+        list: The path from the start to the end as tuples of the form (face, (x, y)), empty if there is no path.
+        list: All visited positions, as tuples of the form (face, (x, y)).
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}, valid algorithms are: {', '.join(ALGORITHMS)}")
+    return ALGORITHMS[algorithm](mazes, start_face, start_pos, end_face, end_pos, maze_size)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="3D cube maze solver, without the visualization")
+    parser.add_argument("--maze-size", type=int, default=25, help="Number of rows and columns of the maze on every face")
+    parser.add_argument("--wall-prob", type=float, default=0.3, help="Probability of a cell being a wall")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the first maze, the next runs use the following seeds")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="bfs", help="Solver to run")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of mazes to generate and solve")
+    args = parser.parse_args(argv)
+    if args.maze_size < 1 or args.repeat < 1:
+        parser.error("--maze-size and --repeat must be at least 1")
+
+    t0 = time.perf_counter()
+    adjacency(args.maze_size)                       # Built once per size, shared by the runs
+    print(f"{6 * args.maze_size ** 2} cells, adjacency built in {time.perf_counter() - t0:.4f} s")
+
+    print(f"{'Run':<5}{'Seed':>8}{'Found':>7}{'Length':>8}{'Visited':>10}{'Generate (s)':>14}{'Solve (s)':>12}")
+    solve_times = []
+    for run in range(args.repeat):
+        seed = None if args.seed is None else args.seed + run
+        rng = random.Random(seed)
+
+        t0 = time.perf_counter()
+        mazes = generate_mazes(args.maze_size, args.wall_prob, rng)
+        try:
+            start_face, start_pos, end_face, end_pos = place_start_end(mazes, args.maze_size, rng)
+        except ValueError as error:                 # Too many walls for a start and an end, skip the run
+            print(f"{run:<5}{'-' if seed is None else seed:>8}  Skipped: {error}")
+            continue
+        generate_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        path, visited = solve(mazes, start_face, start_pos, end_face, end_pos, args.maze_size, args.algorithm)
+        solve_time = time.perf_counter() - t0
+        solve_times.append(solve_time)
+
+        print(f"{run:<5}{'-' if seed is None else seed:>8}{str(bool(path)):>7}{max(len(path) - 1, 0):>8}{len(visited):>10}"
+              f"{generate_time:>14.4f}{solve_time:>12.4f}")
+
+    if len(solve_times) > 1:
+        print(f"Solve time: min {min(solve_times):.4f} s, mean {sum(solve_times) / len(solve_times):.4f} s, "
+              f"max {max(solve_times):.4f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,7 @@
-import random
 from ursina import *
+from panda3d.core import GeomVertexWriter
 from pathfinding import path_finder_bfs, PathFinder
-
-# random.seed(42)  # Set seed for reproducibility testing
+import cube as cube_maze
 
 app = Ursina()  # Initialize the app
 
@@ -15,6 +14,8 @@ path_step_scale = 0.05
 start_end_scale = 0.1
 cube_opacity = 1
 grid_lines = False
+vis_batch = max(1, maze_size * maze_size // 25)     # Cells expanded per frame of the visualization
+vis_delay = .05                                     # Seconds between the frames of the visualization
 
 cube_color = color.azure
 line_color = color.white
@@ -25,6 +26,17 @@ path_color = color.gold
 path_step_color = color.magenta
 visited_color = color.light_gray
 
+# Style of the cell layers drawn over the mazes, as (color, alpha, width, depth)
+LAYER_STYLES = {
+    'visited': (visited_color, .75, 1/maze_size - .001, path_scale),
+    'path': (path_color, 1, 1/maze_size - .001, path_scale),
+    'step': (path_step_color, 1, 1/maze_size, path_step_scale),
+}
+
+# Corners of the two triangles of every side of a box, for the 8 corners returned by cell_box()
+BOX_TRIANGLES = (0, 1, 2, 2, 3, 0,   4, 6, 5, 6, 4, 7,   0, 4, 5, 5, 1, 0,
+                 1, 5, 6, 6, 2, 1,   2, 6, 7, 7, 3, 2,   3, 7, 4, 4, 0, 3)
+
 # Function to create the legend
 def create_legend(legend_offset_y=0):
     # Vertical spacing between items in the legend
@@ -137,43 +149,98 @@ def create_grid_lines(face):
     set_face_position(lines, face)  # Set the position and rotation of the lines based on the face
 
 
-def gen_grid_maze(size, wall_probability=0.3):
+def cell_box(x, y, width, depth):
+    """
+    Returns the 8 corners of a box centered on a cell of a face, in the coordinates of the face.
+    Args:
+        x (int): The row of the cell.
+        y (int): The column of the cell.
+        width (float): The width of the box, 1/maze_size to fill the cell.
+        depth (float): The depth of the box, centered on the face.
+    Returns:
+        list: The 4 corners of the bottom of the box, then the 4 of its top, as (x, y, z) tuples.
     """
-    Generates a 2D grid maze with walls placed randomly based on a given probability.
+    cx, cy = (x + 0.5) / maze_size - 0.5, (y + 0.5) / maze_size - 0.5     # Center of the cell
+    w, d = width / 2, depth / 2
+    return [(cx - w, cy - w, -d), (cx + w, cy - w, -d), (cx + w, cy + w, -d), (cx - w, cy + w, -d),
+            (cx - w, cy - w, d), (cx + w, cy - w, d), (cx + w, cy + w, d), (cx - w, cy + w, d)]
 
+
+def box_mesh(boxes, static=True):
+    """
+    Combines boxes into a single mesh, drawn with a single draw call.
     Args:
-        size (int): The size of the maze (size x size).
-        wall_probability (float, optional): The probability of placing a wall at any given cell. Defaults to 0.3.
+        boxes (list): The 8 corners of every box, as returned by cell_box().
+        static (bool, optional): False for a mesh whose vertices are changed after it is built. Defaults to True.
+    Returns:
+        Mesh: The mesh, box i uses the vertices [8 * i, 8 * i + 8).
+    """
+    vertices = [corner for box in boxes for corner in box]
+    triangles = [8 * i + corner for i in range(len(boxes)) for corner in BOX_TRIANGLES]
+    return Mesh(vertices=vertices, triangles=triangles, static=static)
+
+
+layers = {}     # Mesh of every (layer, face), built when the first cell of the face is shown on the layer
 
+def layer_mesh(layer, face):
+    """
+    Returns the mesh of a layer on a face, building it on first use.
+    The mesh has one box per cell of the face, all collapsed to a point and invisible until show_cells() moves their corners.
+    Args:
+        layer (str): The layer, one of LAYER_STYLES.
+        face (str): The face of the cube.
     Returns:
-        list[list[int]]: A 2D list representing the maze, where 0 indicates an open cell and 1 indicates a wall.
+        Mesh: The dynamic mesh of the layer on the face.
     """
-    maze = [[0 for _ in range(size)] for _ in range(size)]  # Initialize the maze with all open cells
-    for i in range(size):
-        for j in range(size):
-            if random.random() < wall_probability:          # Place walls based on the probability
-                maze[i][j] = 1                              # Set the cell as a wall
-    return maze
+    if (layer, face) not in layers:
+        color_, alpha, width, depth = LAYER_STYLES[layer]
+        hidden = [(0, 0, 0)] * 8                                                    # A box collapsed to a point
+        mesh = box_mesh([hidden] * (maze_size * maze_size), static=False)
+        layer_entity = Entity(parent=cube, model=mesh, color=color_, alpha=alpha, double_sided=True)
+        set_face_position(layer_entity, face)
+        layers[layer, face] = mesh
+    return layers[layer, face]
+
+
+def show_cells(layer, cells):
+    """
+    Shows cells on a layer, writing only the corners of their boxes into the vertex data of the layer meshes.
+    The work is proportional to the number of cells shown, not to the number of cells already on the layer.
+    Args:
+        layer (str): The layer, one of LAYER_STYLES.
+        cells (list of tuples): The cells to show, as tuples of the form (face, (x, y)).
+    """
+    _, _, width, depth = LAYER_STYLES[layer]
+    writers = {}                                                                    # Vertex writer of every face changed
+    for face, (x, y) in cells:
+        if face not in writers:
+            mesh = layer_mesh(layer, face)
+            writers[face] = (mesh, GeomVertexWriter(mesh.geomNode.modifyGeom(0).modifyVertexData(), 'vertex'))
+        mesh, writer = writers[face]
+        corners = cell_box(x, y, width, depth)
+        row = 8 * (x * maze_size + y)                                               # First vertex of the box of the cell
+        mesh.vertices[row:row + 8] = corners                                        # Keep the mesh's own copy in sync
+        writer.setRow(row)
+        for corner in corners:
+            writer.setData3f(*corner)
+
 
 def create_maze(face):
     """
-    Generates a 2D maze on a specified face of a 3D cube and creates corresponding wall entities.
+    Generates a 2D maze on a specified face of a 3D cube and creates a single mesh entity for its walls.
     Args:
         face (str): The face of the cube where the maze will be created.
     Returns:
         list: A 2D list representing the generated maze, where 1 indicates a wall and 0 indicates a path.
     """
-    maze = gen_grid_maze(maze_size)     # Generate a random maze
-    face_entity = Entity(parent=cube)   # Create a parent entity for the face
-
-    for i in range(maze_size):
-        for j in range(maze_size):
-            if maze[i][j] == 1:                                                     # If there is a wall
-                wall = Entity(parent=face_entity, model='cube', color=maze_color)   # Attach wall to face_entity
-                wall.scale = (1/maze_size, 1/maze_size, wall_scale)              # Scale the wall to fit the grid
-                wall.x = (i + 0.5) / maze_size - 0.5                                # Position the wall in the grid, x
-                wall.y = (j + 0.5) / maze_size - 0.5                                # Position the wall in the grid, y
-                                
+    maze = cube_maze.gen_grid_maze(maze_size)       # Generate a random maze
+
+    # All the walls of the face as a single mesh
+    walls = [cell_box(i, j, 1/maze_size, wall_scale) for i in range(maze_size) for j in range(maze_size) if maze[i][j] == 1]
+    if not walls:
+        return maze
+    face_entity = Entity(parent=cube, model=box_mesh(walls), color=maze_color, double_sided=True)
+
     set_face_position(face_entity, face)
     return maze
     
@@ -191,18 +258,7 @@ def place_start_end(mazes):
             - end_pos (tuple): The (row, column) position of the end within the end_face.
     """
     
-    start_face = random.choice(list(mazes.keys()))                                          # Choose random face for start
-    start_pos = (random.randint(0, maze_size - 1), random.randint(0, maze_size - 1))        # Choose non-wall position for start
-    while mazes[start_face][start_pos[0]][start_pos[1]] == 1:
-        start_pos = (random.randint(0, maze_size - 1), random.randint(0, maze_size - 1))    # Choose non-wall position for start
-    mazes[start_face][start_pos[0]][start_pos[1]] = 'S'                                     # Add start to maze as 'S'
-
-    
-    end_face = random.choice(list(mazes.keys()))                                            # Choose random face for end
-    end_pos = (random.randint(0, maze_size - 1), random.randint(0, maze_size - 1))          # Choose non-wall position for end
-    while mazes[end_face][end_pos[0]][end_pos[1]] == 1 or (end_face == start_face and end_pos == start_pos):
-        end_pos = (random.randint(0, maze_size - 1), random.randint(0, maze_size - 1))      # Choose non-wall position for end, not the same as start
-    mazes[end_face][end_pos[0]][end_pos[1]] = 'E'                                           # Add end to maze as 'E'
+    start_face, start_pos, end_face, end_pos = cube_maze.place_start_end(mazes, maze_size)     # Add start and end to maze as 'S' and 'E'
     
     # Create a parent entity for the start face
     start_entity = Entity(parent=cube)
@@ -223,7 +279,7 @@ def place_start_end(mazes):
     return start_face, start_pos, end_face, end_pos
 
 
-def place_path(visited, mazes, color=color.gold, alpha=1):
+def place_path(visited, mazes, layer='path'):
     """
     Places a path in the 3D maze based on the visited positions.
 
@@ -231,18 +287,12 @@ def place_path(visited, mazes, color=color.gold, alpha=1):
         visited (list of tuples): A list of tuples where each tuple contains a face index and a position (x, y) 
                                   that has been visited.
         mazes (list of lists of lists): A 3D list representing the maze structure where each face is a 2D grid.
+        layer (str, optional): The layer the positions are shown on, one of LAYER_STYLES. Defaults to 'path'.
 
     Returns:
         None
     """
-    for face, pos in visited:                                                           # Iterate over the visited positions
-        if mazes[face][pos[0]][pos[1]] == 0:                                            # Check if the position is a valid path
-            path_entity = Entity(parent=cube)                                           # Create a parent entity for the path
-            path_wall = Entity(parent=path_entity, model='cube', color=color, alpha=alpha)      # Attach a wall to the path_entity
-            path_wall.scale = (1/maze_size -.001, 1/maze_size-.001, path_scale)                 # Scale the wall to fit the grid
-            path_wall.x = (pos[0] + 0.5) / maze_size - 0.5                              # Position the wall in the grid, x
-            path_wall.y = (pos[1] + 0.5) / maze_size - 0.5                              # Position the wall in the grid, y
-            set_face_position(path_entity, face)
+    show_cells(layer, [(face, pos) for face, pos in visited if mazes[face][pos[0]][pos[1]] == 0])     # Only the valid path positions
 
 
 def place_path_step_by_step(path, mazes):
@@ -264,12 +314,7 @@ def place_path_step_by_step(path, mazes):
                 
                 # print(f"Step {step_index + 1}: {face}, {pos}")
                 
-                path_entity = Entity(parent=cube)                                       # Create a parent entity for the path
-                path_wall = Entity(parent=path_entity, model='cube', color=path_step_color)   # Attach a red wall to the path_entity
-                path_wall.scale = (1/maze_size, 1/maze_size, path_step_scale)                      # Scale the wall to fit the grid
-                path_wall.x = (pos[0] + 0.5) / maze_size - 0.5                          # Position the wall in the grid, x
-                path_wall.y = (pos[1] + 0.5) / maze_size - 0.5                          # Position the wall in the grid, y
-                set_face_position(path_entity, face)                                    # Set the position and rotation of the path_entity
+                show_cells('step', [(face, pos)])   # Show the step on the step layer
             step_index += 1 
             
         # Check if the last step has been placed
@@ -292,28 +337,19 @@ def place_path_step_by_step_with_pathfinder(mazes, start_face, start_pos, end_fa
         maze_size (int): The size of the maze.
     Returns:
         tuple: A tuple containing:
-            - update_vis (function): A function that, when called, places the next step in the path on the maze.
+            - update_vis (function): A function that, when called, expands the next vis_batch cells and places the newly visited ones,
+                                     returns True once the search is over.
             - path_finder (PathFinder): The PathFinder object used for pathfinding.
     """
     path_finder = PathFinder(mazes, start_face, start_pos, end_face, end_pos, maze_size)        # Create a PathFinder object
-    visited = []
-        
+
     # Define the update_path function
     def update_vis():
-        if path_finder.current_pos != end_pos:                              # Check if the current position is not the end
-            path_finder.advance_step()                                      # Advance to the next step
-            
-            to_add = []        
-            for face, positions in path_finder.visited.items():             # Iterate over the visited positions
-                for pos in positions:
-                    if (face, pos) not in visited:                          # Check if the position has not been visited
-                        visited.append((face, pos))                         # Add the position to the visited list
-                        to_add.append((face, pos))                          # Add the position to the to_add list
-                    
-                place_path(to_add, mazes, color=visited_color, alpha=.75)
-            return None
-        else:
-            return path_finder.path                                         # Return the path if the end has been reached
+        if path_finder.finished:                                            # Check if the search is over
+            return True
+        reached, expanded = path_finder.advance(vis_batch)                  # Expand the next batch of cells
+        place_path(reached, mazes, layer='visited')                         # Place only the newly visited cells
+        return None
 
     return update_vis, path_finder
 
@@ -401,8 +437,8 @@ def input(key):
         invoke(repeat_update_path, delay=0)     # Start the repeated update_path process immediately
     elif key == 'a' and not locked:
         locked = True
-        place_path(path, mazes, color=path_color)
-        place_path(visited, mazes, color=visited_color, alpha=.75)
+        place_path(path, mazes, layer='path')
+        place_path(visited, mazes, layer='visited')
         
 # Function to repeat the update_vis function
 def repeat_update_vis():
@@ -413,7 +449,7 @@ def repeat_update_vis():
         input.update_vis_done = True
         locked = False
         return
-    invoke(repeat_update_vis, delay=.1)            # Schedule the next update
+    invoke(repeat_update_vis, delay=vis_delay)     # Schedule the next update
 
 # Function to repeat the update_path function
 def repeat_update_path():
@@ -1,4 +1,8 @@
-from collections import deque
+from array import array
+from functools import lru_cache
+
+FACES = ('front', 'back', 'left', 'right', 'top', 'bottom')     # Order of the faces in the flat cell ids
+FACE_INDEX = {face: i for i, face in enumerate(FACES)}
 
 def get_neighbors(face, pos,maze_size):
     """
@@ -78,6 +82,73 @@ def get_neighbors(face, pos,maze_size):
     return neighbors
 
 
+def cell_id(face, pos, maze_size):
+    """
+    Returns the flat id of a cell of the cube surface, face * maze_size**2 + x * maze_size + y.
+    Args:
+        face (str): The face of the cell, one of FACES.
+        pos (tuple): The (x, y) position of the cell on the face.
+        maze_size (int): An integer representing the length of a cubical maze.
+    Returns:
+        int: The flat id of the cell.
+    """
+    return FACE_INDEX[face] * maze_size * maze_size + pos[0] * maze_size + pos[1]
+
+
+def cell_position(cell, maze_size):
+    """
+    Returns the (face, (x, y)) of a flat cell id, the inverse of cell_id().
+    """
+    face, rest = divmod(cell, maze_size * maze_size)
+    return FACES[face], divmod(rest, maze_size)
+
+
+@lru_cache(maxsize=None)
+def adjacency(maze_size):
+    """
+    Builds the neighbors of every cell of the cube surface as a flat integer table, once per maze size.
+    The four neighbors of a cell are at [4 * cell, 4 * cell + 4), in the directions of get_neighbors() (right, down, left, up).
+    Inside a face they are computed with arithmetic on the ids, across the seams between faces they are taken
+    from get_neighbors(), so the table always agrees with it.
+    Args:
+        maze_size (int): An integer representing the length of a cubical maze.
+    Returns:
+        array: The 6 * maze_size**2 * 4 neighbor ids, as an array('i'). Shared between callers, do not modify it.
+    """
+    n = maze_size
+    count = len(FACES) * n * n
+    table = array('i', bytes(4 * count * 4))
+
+    # Neighbors as if every face went on forever, the seams are fixed below
+    for direction, step in enumerate((1, n, -1, -n)):                           # right (y + 1), down (x + 1), left (y - 1), up (x - 1)
+        table[direction::4] = array('i', range(step, count + step))
+
+    # Neighbors across the seams, for the cells on the border of every face
+    for face in FACES:
+        border = {(x, y) for x in range(n) for y in (0, n - 1)} | {(x, y) for x in (0, n - 1) for y in range(n)}
+        for pos in border:
+            cell = cell_id(face, pos, n)
+            for direction, (neighbor_face, neighbor_pos) in enumerate(get_neighbors(face, pos, n)):
+                table[4 * cell + direction] = cell_id(neighbor_face, neighbor_pos, n)
+    return table
+
+
+def cube_walls(mazes, maze_size):
+    """
+    Returns the walls of the cube as a bytearray indexed by flat cell id, 1 for a wall and 0 otherwise.
+    Args:
+        mazes (dict): A dictionary where keys are face identifiers and values are 2D lists representing the maze grid.
+        maze_size (int): An integer representing the length of a cubical maze.
+    Returns:
+        bytearray: The 6 * maze_size**2 wall flags.
+    """
+    walls = bytearray()
+    for face in FACES:
+        for row in mazes[face]:
+            walls.extend([cell == 1 for cell in row])
+    return walls
+
+
 def path_finder_bfs(mazes, start_face, start_pos, end_face, end_pos, maze_size):
     """
     Uses a breadth-first search algorithm to find the shortest path from the start to the end position.
@@ -94,45 +165,56 @@ def path_finder_bfs(mazes, start_face, start_pos, end_face, end_pos, maze_size):
               Each tuple is of the form (face, (x, y)). If no path is found, returns an empty list.
         list: A list of tuples representing all visited positions in the form (face, (x, y)).
     """
-    queue = deque([(start_face, start_pos)])        # Initialize queue with start position
-    visited = {start_face: {start_pos}}             # Initialize visited set with start position
-    parent = {start_face: {start_pos: None}}        # Initialize parent dictionary with start position
+    neighbors = adjacency(maze_size)                        # Neighbor ids of every cell, built once per size
+    walls = cube_walls(mazes, maze_size)                    # Wall flags of every cell
+    start = cell_id(start_face, start_pos, maze_size)
+    end = cell_id(end_face, end_pos, maze_size)
 
-    while queue:                                                # Continue until the queue is empty
-        current_face, current_pos = queue.popleft()             # Get the current position from the queue
-        
-        if (current_face, current_pos) == (end_face, end_pos):  # Check if we have reached the end
-            path = []                                           
-            while current_pos is not None:                      # Reconstruct the path
-                path.append((current_face, current_pos))        # Add the current position to the path
-                
-                if parent[current_face][current_pos] is not None:                   # If there is a parent
-                    current_face, current_pos = parent[current_face][current_pos]   # Move to the parent position
-                
-                else:                                                               # If there is no parent, we have reached the start or an isolated point
-                    break                                                           # Break out of the loop
-            # Convert visited to a list of tuples (face, (x, y)) for all visited positions
-            visited_list = [(f, pos) for f in visited for pos in visited[f]]
-            return path[::-1], visited_list                                         # Return the reversed path and visited list
-
-        for neighbor_face, neighbor_pos in get_neighbors(current_face, current_pos,maze_size):    # Iterate over the neighbors
-            
-            # If the neighbor is not visited and is not a wall
-            if neighbor_pos not in visited.get(neighbor_face, set()) and mazes[neighbor_face][neighbor_pos[0]][neighbor_pos[1]] != 1:
-                
-                if neighbor_face not in visited:                                    # If the neighbor face is not in visited
-                    visited[neighbor_face] = set()                                  # Add the face to visited
-                    parent[neighbor_face] = {}                                      # Add the face to parent
-                visited[neighbor_face].add(neighbor_pos)                            # Add the neighbor to visited
-                parent[neighbor_face][neighbor_pos] = (current_face, current_pos)   # Set the parent of the neighbor
-                queue.append((neighbor_face, neighbor_pos))                         # Add the neighbor to the queue
-    # Convert visited to a list of tuples (face, (x, y)) if no path is found
-    visited_list = [(f, pos) for f in visited for pos in visited[f]]
-    return [], visited_list                                                         # Return an empty path and visited list
+    visited = bytearray(len(walls))                         # Visited flag of every cell
+    parent = array('i', [-1]) * len(walls)                  # Parent of every visited cell, -1 for the start
+    queue = array('i', [start])                             # Visited cells in the order they were reached, the queue is queue[head:]
+    visited[start] = 1
+    head = 0
+
+    while head < len(queue):                                # Continue until the queue is empty
+        current = queue[head]                               # Get the current cell from the queue
+        head += 1
 
+        if current == end:                                  # Check if we have reached the end
+            return trace_path(parent, end, maze_size), [cell_position(cell, maze_size) for cell in queue]
+
+        for neighbor in neighbors[4 * current:4 * current + 4]:        # Iterate over the neighbors
+            if not visited[neighbor] and not walls[neighbor]:           # If the neighbor is not visited and is not a wall
+                visited[neighbor] = 1                                   # Add the neighbor to visited
+                parent[neighbor] = current                              # Set the parent of the neighbor
+                queue.append(neighbor)                                  # Add the neighbor to the queue
+    return [], [cell_position(cell, maze_size) for cell in queue]      # Return an empty path and visited list
+
+
+def trace_path(parent, end, maze_size):
+    """
+    Follows the parents from a cell back to the start.
+    Args:
+        parent (array): The parent id of every visited cell, -1 for the start.
+        end (int): The id of the last cell of the path.
+        maze_size (int): An integer representing the length of a cubical maze.
+    Returns:
+        list: The path from the start to the cell, as tuples of the form (face, (x, y)).
+    """
+    path = []
+    cell = end
+    while cell != -1:
+        path.append(cell_position(cell, maze_size))
+        cell = parent[cell]
+    return path[::-1]
 
 
 class PathFinder:
+    """
+    Breadth-first search on the cube that can be advanced one expansion at a time, for visualizing it.
+    The search state is kept in flat tables indexed by cell id, see cell_id(), and converted to (face, (x, y))
+    positions only when it is returned.
+    """
     def __init__(self, mazes, start_face, start_pos, end_face, end_pos, maze_size):
         self.mazes = mazes
         self.start_face = start_face
@@ -145,51 +227,76 @@ class PathFinder:
         self.current_face = start_face
         
         self.path = []
-        self.visited = {start_face: {start_pos}}            # Initialize visited set with start position
-        self.queue = deque([(self.start_face, self.start_pos)])  # Initialize queue with start position
-        self.parent = {self.start_face: {self.start_pos: None}}  # Initialize parent dictionary with start position
+        self.neighbors = adjacency(maze_size)               # Neighbor ids of every cell, built once per size
+        self.walls = cube_walls(mazes, maze_size)           # Wall flags of every cell
+        self.start = cell_id(start_face, start_pos, maze_size)
+        self.end = cell_id(end_face, end_pos, maze_size)
+
+        self.visited = bytearray(len(self.walls))           # Visited flag of every cell
+        self.parent = array('i', [-1]) * len(self.walls)    # Parent of every visited cell, -1 for the start
+        self.order = array('i', [self.start])               # Visited cells in the order they were reached
+        self.head = 0                                       # The queue is order[head:]
+        self.visited[self.start] = 1
         self.step = 0  # Initialize step counter
 
-    def advance_step(self):
-        if self.queue:
-            current_face, current_pos = self.queue.popleft()                    # Get the current position from the queue
-
-            if (current_face, current_pos) == (self.end_face, self.end_pos):    # Check if we have reached the end
-                path = []
-                while current_pos is not None:                                  # Reconstruct the path
-                    path.append((current_face, current_pos))                    # Add the current position to the path
-
-                    if self.parent[current_face][current_pos] is not None:                  # If there is a parent
-                        current_face, current_pos = self.parent[current_face][current_pos]  # Move to the parent position
-                    else:                       # If there is no parent, we have reached the start or an isolated point
-                        break                   # Break out of the loop
-                self.path = path[::-1]          # Store the reversed path
-                return self.current_pos, self.current_face
-
-            for neighbor_face, neighbor_pos in get_neighbors(current_face, current_pos, self.maze_size):  # Iterate over the neighbors
-                
-                if neighbor_pos not in self.visited.get(neighbor_face, set()) and self.mazes[neighbor_face][neighbor_pos[0]][neighbor_pos[1]] != 1:
-                    if neighbor_face not in self.visited:                           # If the neighbor face is not in visited
-                        self.visited[neighbor_face] = set()                         # Add the face to visited
-                        self.parent[neighbor_face] = {}                             # Add the face to parent
-                    self.visited[neighbor_face].add(neighbor_pos)                   # Add the neighbor to visited
-                    self.parent[neighbor_face][neighbor_pos] = (current_face, current_pos)  # Set the parent of the neighbor
-                    self.queue.append((neighbor_face, neighbor_pos))                # Add the neighbor to the queue
-
-            self.current_pos, self.current_face = current_pos, current_face         # Update the current position and face
+    @property
+    def queue(self):
+        """The ids of the cells waiting to be expanded, as a new array."""
+        return self.order[self.head:]
+
+    @property
+    def finished(self):
+        """True once the end was reached, or every reachable cell was expanded."""
+        return bool(self.path) or self.head >= len(self.order)
+
+    def advance(self, k=1):
+        """
+        Expands up to k cells, stopping early at the end.
+        Args:
+            k (int): The maximum number of cells to expand.
+        Returns:
+            tuple: The changes made by the expansions, as two lists of tuples of the form (face, (x, y)):
+                - reached (list): The cells visited for the first time, they joined the frontier.
+                - expanded (list): The cells expanded, they left the frontier.
+        """
+        order, neighbors, walls, visited, parent = self.order, self.neighbors, self.walls, self.visited, self.parent
+        first_head, first_reached = self.head, len(order)
+        head, last, current = self.head, self.head + k, None
+        while head < last and head < len(order) and not self.path:
+            cell = order[head]                                                  # Get the next cell from the queue
+            head += 1
+
+            if cell == self.end:                                                # Check if we have reached the end
+                self.path = trace_path(parent, cell, self.maze_size)            # Store the path
+                break
+
+            for neighbor in neighbors[4 * cell:4 * cell + 4]:                  # Iterate over the neighbors
+                if not visited[neighbor] and not walls[neighbor]:
+                    visited[neighbor] = 1                                       # Add the neighbor to visited
+                    parent[neighbor] = cell                                     # Set the parent of the neighbor
+                    order.append(neighbor)                                      # Add the neighbor to the queue
+            current = cell
             self.step += 1  # Increment step counter
+        self.head = head
+        if current is not None:                                                 # Update the current position and face
+            self.current_face, self.current_pos = cell_position(current, self.maze_size)
+
+        maze_size = self.maze_size
+        return ([cell_position(cell, maze_size) for cell in order[first_reached:]],
+                [cell_position(cell, maze_size) for cell in order[first_head:head]])
 
+    def advance_step(self):
+        self.advance(1)
         return self.current_pos, self.current_face
 
     def get_path(self):
         return self.path
 
     def get_visited(self):
-        visited_list = [(f, pos) for f in self.visited for pos in self.visited[f]]
-        return visited_list
+        return [cell_position(cell, self.maze_size) for cell in self.order]
     
     def get_neighbors(self):
         return get_neighbors(self.current_face, self.current_pos, self.maze_size)
     
     def get_step(self):
-        return self.step
\ No newline at end of file
+        return self.step
@@ -0,0 +1,60 @@
+"""
+solve_batch against the same queries solved one at a time.
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pathfinding"))
+
+import generate
+from batch import solve_batch
+from path_finder import solve
+
+GRID = generate.random_grid_maze(25, 31, seed=7)
+
+
+def queries(count, seed=0):
+    rng = random.Random(seed)
+    cells = [(row, col) for row in range(GRID.rows) for col in range(GRID.cols) if not GRID.is_wall(row, col)]
+    return [(rng.choice(cells), rng.choice(cells)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("algorithm", ("bfs", "astar-manhattan", "bidirectional", "jps"))
+@pytest.mark.parametrize("workers", (0, 2))
+def test_batch_matches_single_queries(algorithm, workers):
+    batch = queries(100)
+    results = list(solve_batch(GRID, batch, algorithm, workers=workers, chunksize=7))
+    assert [index for index, _ in results] == list(range(len(batch)))
+    for (index, (found, path, length, steps, visited)), (start, end) in zip(results, batch):
+        expected = solve(GRID, algorithm, start=start, end=end)
+        assert (found, path, length, steps) == expected[:4]
+        assert visited == []
+
+
+def test_batch_unordered_and_visited():
+    batch = queries(50, seed=1)
+    results = dict(solve_batch(GRID, iter(batch), "dijkstra", workers=2, chunksize=4, ordered=False, keep_visited=True))
+    assert sorted(results) == list(range(len(batch)))
+    for index, (start, end) in enumerate(batch):
+        assert results[index] == solve(GRID, "dijkstra", start=start, end=end)
+
+
+def test_batch_stops_early():
+    def endless():
+        while True:
+            yield from queries(10)
+    results = solve_batch(GRID, endless(), "bfs", workers=2, chunksize=3)
+    assert [next(results)[0] for _ in range(25)] == list(range(25))
+    results.close()
+
+
+def test_batch_rejects_invalid_queries():
+    wall = next((row, col) for row in range(GRID.rows) for col in range(GRID.cols) if GRID.is_wall(row, col))
+    open_cell = queries(1)[0][0]
+    with pytest.raises(ValueError, match="Query 1"):
+        list(solve_batch(GRID, [(open_cell, open_cell), (open_cell, wall)], workers=0))
+    with pytest.raises(ValueError, match="Unknown algorithm"):
+        list(solve_batch(GRID, [], "teleport"))
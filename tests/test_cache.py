@@ -0,0 +1,107 @@
+"""
+PathCache: hits, invalidation by the maze content, LRU eviction and the cache file.
+"""
+import os
+import pickle
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pathfinding"))
+
+import generate
+from cache import PathCache
+from grid import WALL, Workspace
+from path_finder import solve
+
+
+def grid():
+    return generate.random_grid_maze(15, 15, seed=3)
+
+
+def open_cells(maze):
+    return [(row, col) for row in range(maze.rows) for col in range(maze.cols) if not maze.is_wall(row, col)]
+
+
+def test_hits_return_the_solved_result():
+    cache = PathCache()
+    maze = grid()
+    stats = {}
+    first = cache.solve(maze, "astar-manhattan", stats=stats)
+    assert stats["cache_hit"] is False and first == solve(maze, "astar-manhattan")[:4] + ([],)
+    events = []
+    stats = {}
+    second = cache.solve(maze, "astar-manhattan", observer=lambda event, *args, **kwargs: events.append(event), stats=stats)
+    assert second == first and stats == {"cache_hit": True} and events == ["done"]
+    assert cache.info()["hits"] == 1 and cache.info()["misses"] == 1
+
+
+def test_keys_follow_the_maze_content():
+    cache = PathCache()
+    maze, same = grid(), grid()
+    cache.solve(maze)
+    assert PathCache.key(same) in cache             # Another grid with the same cells shares the results
+    assert PathCache.key(maze, start=maze.position(maze.start)) == PathCache.key(maze)
+    assert PathCache.key(maze, "astar-manhattan", heuristic_type="octile") != PathCache.key(maze, "astar-manhattan")
+    assert PathCache.key(maze, workspace=Workspace(maze.size)) == PathCache.key(maze)
+
+    path = cache.solve(maze)[1]
+    row, col = path[len(path) // 2]
+    maze.set_cell(row, col, WALL)                   # Cuts the cached path
+    assert PathCache.key(maze) not in cache
+    stats = {}
+    result = cache.solve(maze, stats=stats)
+    assert stats["cache_hit"] is False and result[:4] == solve(maze)[:4]
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = PathCache(max_entries=3)
+    maze = grid()
+    ends = open_cells(maze)[:5]
+    for end in ends[:3]:
+        cache.solve(maze, end=end)
+    cache.solve(maze, end=ends[0])                  # Now the most recently used
+    cache.solve(maze, end=ends[3])
+    assert len(cache) == 3 and cache.evictions == 1
+    assert PathCache.key(maze, end=ends[1]) not in cache
+    assert all(PathCache.key(maze, end=end) in cache for end in (ends[0], ends[2], ends[3]))
+
+
+def test_bytes_bound():
+    maze = grid()
+    ends = open_cells(maze)[-6:]
+    sizes = [len(pickle.dumps(solve(maze, end=end)[:4] + ([],), pickle.HIGHEST_PROTOCOL)) for end in ends]
+    cache = PathCache(max_bytes=sum(sizes[-3:]))
+    for end in ends:
+        cache.solve(maze, end=end)
+    assert cache.bytes == sum(sizes[-len(cache):]) <= cache.max_bytes
+    assert PathCache.key(maze, end=ends[-1]) in cache and PathCache.key(maze, end=ends[0]) not in cache
+
+    tiny = PathCache(max_bytes=10)                  # No result fits, none is kept
+    assert tiny.solve(maze) == cache.solve(maze) and len(tiny) == 0 and tiny.bytes == 0
+
+
+def test_keep_visited():
+    maze = grid()
+    assert PathCache(keep_visited=True).solve(maze, "bfs") == solve(maze, "bfs")
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "paths.cache")
+    cache = PathCache(path=path)
+    maze = grid()
+    ends = open_cells(maze)[:4]
+    results = [cache.solve(maze, end=end) for end in ends]
+    cache.save()
+    assert not os.path.exists(path + ".tmp")
+
+    loaded = PathCache(path=path)
+    assert len(loaded) == 4 and loaded.bytes == cache.bytes
+    assert [loaded.solve(maze, end=end) for end in ends] == results and loaded.hits == 4
+
+    small = PathCache(max_entries=2)
+    small.load(path)
+    assert len(small) == 2 and PathCache.key(maze, end=ends[-1]) in small
+
+    with pytest.raises(ValueError):
+        PathCache().save()
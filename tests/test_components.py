@@ -0,0 +1,104 @@
+"""
+The connected component index against a flood fill, and the solvers it stops before they search.
+"""
+import os
+import random
+import sys
+from collections import deque
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pathfinding"))
+
+import generate
+from components import components
+from grid import CORNER_CUTTING, OPEN, WALL, Grid
+from path_finder import ALGORITHMS, random_maze, solve
+
+
+def random_grid(seed):
+    rng = random.Random(seed)
+    rows, cols = rng.randint(1, 30), rng.randint(1, 30)
+    if seed % 2:
+        return generate.random_grid_maze(max(rows, 3), max(cols, 3), seed=seed)
+    random.seed(seed)
+    return Grid.from_maze(random_maze(rows, cols, p=rng.random() * 0.6))
+
+
+def flood_fill(grid):
+    """Returns the component of every open cell, as {index: first cell of the component}, by breadth-first search."""
+    component = {}
+    for row in range(grid.rows):
+        for col in range(grid.cols):
+            first = grid.index(row, col)
+            if grid.cells[first] or first in component:
+                continue
+            component[first] = first
+            q = deque([first])
+            while q:
+                for neighbor in grid.neighbors(q.popleft()):
+                    if neighbor not in component:
+                        component[neighbor] = first
+                        q.append(neighbor)
+    return component
+
+
+def assert_same_components(grid):
+    labels = components(grid)
+    expected = flood_fill(grid)
+    assert labels.count == len(set(expected.values()))
+    label_of = {}                                   # Flood fill component of every label, one to one
+    for index, first in expected.items():
+        assert labels.labels[index] != 0
+        assert label_of.setdefault(labels.labels[index], first) == first
+        assert labels.size(index) == sum(1 for other in expected.values() if other == first)
+    assert len(label_of) == labels.count
+    for index in range(grid.size):
+        if grid.cells[index]:
+            assert labels.labels[index] == 0 and labels.size(index) == 0
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_components_match_flood_fill(seed):
+    assert_same_components(random_grid(seed))
+
+
+@pytest.mark.parametrize("corner_cutting", CORNER_CUTTING)
+@pytest.mark.parametrize("seed", range(30))
+def test_components_match_flood_fill_8_connected(seed, corner_cutting):
+    grid = random_grid(seed)
+    grid.set_connectivity(8, corner_cutting)
+    assert_same_components(grid)
+
+
+def test_components_follow_cell_changes():
+    grid = Grid.from_maze([list("O#X"), list(" # "), list("   ")])
+    assert components(grid).connected(grid.start, grid.end)
+    grid.set_cell(2, 1, WALL)
+    labels = components(grid)
+    assert labels.count == 2 and not labels.connected(grid.start, grid.end)
+    grid.set_cell(0, 1, OPEN)
+    assert components(grid).connected(grid.start, grid.end)
+    assert not components(grid).connected(grid.start, None)
+
+
+SPLIT_MAZE = [list("O #   "), list("  #   "), list("  #  X")]
+
+
+@pytest.mark.parametrize("algorithm", sorted(ALGORITHMS))
+def test_disconnected_endpoints_are_not_searched(algorithm):
+    events = []
+    stats = {}
+    result = solve(Grid.from_maze(SPLIT_MAZE), algorithm, observer=lambda event, *args, **kwargs: events.append(event), stats=stats)
+    assert result == (False, [], 0, 0, [])
+    assert events == ["done"]
+    assert stats == {"unreachable": True, "start_component_size": 6, "end_component_size": 9}
+
+
+@pytest.mark.parametrize("algorithm", sorted(ALGORITHMS))
+def test_connected_endpoints_are_searched(algorithm):
+    maze = [row[:] for row in SPLIT_MAZE]
+    maze[1][2] = " "
+    found, path, length = solve(Grid.from_maze(maze), algorithm)[:3]
+    assert found and path[0] == (0, 0) and path[-1] == (2, 5)
+    assert length >= solve(maze, "bfs")[2]
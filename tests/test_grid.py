@@ -0,0 +1,49 @@
+"""
+Grid conversion and the reusable search buffers of Workspace.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pathfinding"))
+
+from grid import WALL, Grid, Workspace
+from path_finder import solve
+
+MAZE = [
+    list("O  #    "),
+    list(" # # ## "),
+    list(" #   #  "),
+    list(" ### # #"),
+    list("     #  "),
+    list("## ### X"),
+]
+
+
+@pytest.mark.parametrize("algorithm", ("bfs", "bidirectional", "bidirectional-astar", "astar-manhattan", "dijkstra"))
+def test_workspace_generation_wrap_clears_every_stamp(algorithm):
+    grid = Grid.from_maze(MAZE)
+    workspace = Workspace(grid.size)
+    solve(grid, algorithm, workspace=workspace)
+    workspace.generation = 2**32 - 1                # The next search wraps around to generation 1
+    grid.set_cell(0, 2, WALL)
+    grid.set_cell(2, 0, WALL)
+    grid.set_cell(2, 0, 0)
+    expected = solve(grid, algorithm, workspace=Workspace(grid.size))
+    assert solve(grid, algorithm, workspace=workspace)[:3] == expected[:3]
+    assert workspace.generation == 1
+
+
+def test_from_maze_rejects_ragged_rows():
+    with pytest.raises(ValueError, match="Row 1 has 2 columns, expected 3"):
+        Grid.from_maze([list("O  "), list("  "), list("  X")])
+    with pytest.raises(ValueError, match="Row 2 has 0 columns, expected 3"):
+        Grid.from_maze([list("O  "), list("   "), [], list("  X")])
+
+
+def test_from_maze_round_trip():
+    grid = Grid.from_maze(MAZE)
+    assert (grid.rows, grid.cols, len(grid.cells)) == (6, 8, grid.size)
+    assert grid.position(grid.start) == (0, 0) and grid.position(grid.end) == (5, 7)
+    assert grid.to_maze() == MAZE
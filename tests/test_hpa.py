@@ -0,0 +1,87 @@
+"""
+HPA* against BFS, and the abstract graph saved next to a maze file.
+"""
+import os
+import random
+import sys
+import zlib
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pathfinding"))
+
+import generate
+import hpa
+from grid import WALL, Grid
+from maze_file import load_maze, save_maze
+from path_finder import random_maze, solve
+
+
+def random_grid(seed, size=None):
+    rng = random.Random(seed)
+    rows, cols = size or (rng.randint(3, 60), rng.randint(3, 60))
+    if seed % 2:
+        return generate.random_grid_maze(rows, cols, seed=seed)
+    random.seed(seed)
+    return Grid.from_maze(random_maze(rows, cols, p=rng.random() * 0.4))
+
+
+@pytest.mark.parametrize("cluster_size", (4, 16))
+@pytest.mark.parametrize("seed", range(40))
+def test_hpa_matches_bfs(seed, cluster_size):
+    grid = random_grid(seed)
+    found, path, length = solve(grid, "hpa", cluster_size=cluster_size)[:3]
+    expected = solve(grid, "bfs")
+    assert found == expected[0]
+    if found:
+        assert path[0] == grid.position(grid.start) and path[-1] == grid.position(grid.end)
+        for a, b in zip(path, path[1:]):
+            assert not grid.is_wall(*b) and abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+        assert length == len(path) - 1 >= expected[2]
+
+
+def test_hpa_rejects_grids_it_cant_cluster():
+    grid = random_grid(1)
+    grid.set_connectivity(8)
+    with pytest.raises(ValueError, match="4-connected"):
+        solve(grid, "hpa")
+    grid = random_grid(1)
+    grid.set_cost(0, 0, 3)
+    with pytest.raises(ValueError, match="without step costs"):
+        solve(grid, "hpa")
+
+
+def test_graph_file_round_trip(tmp_path, monkeypatch):
+    path = str(tmp_path / "maze.bin")
+    save_maze(path, random_grid(3, (40, 40)))
+    built = hpa.abstract_graph(load_maze(path))
+    assert os.path.exists(path + ".hpa")
+
+    hashed = []
+    crc32 = zlib.crc32
+    monkeypatch.setattr(zlib, "crc32", lambda data: hashed.append(len(data)) or crc32(data))
+    grid = load_maze(path)
+    loaded = hpa.abstract_graph(grid)
+    assert len(hashed) == 1                         # Only to check the file, not again by the graph
+    assert loaded.checksum == built.checksum
+    for name in ("nodes", "offsets", "targets", "costs"):
+        assert getattr(loaded, name) == getattr(built, name)
+    assert solve(grid, "hpa")[:3] == solve(load_maze(path), "hpa")[:3]
+
+
+def test_graph_file_of_other_cells_is_rebuilt(tmp_path):
+    path = str(tmp_path / "maze.bin")
+    grid = random_grid(5, (40, 40))
+    save_maze(path, grid)
+    hpa.abstract_graph(load_maze(path)).save(path + ".hpa")
+
+    row, col = next((r, c) for r in range(grid.rows) for c in range(grid.cols)
+                    if not grid.is_wall(r, c) and grid.index(r, c) not in (grid.start, grid.end))
+    grid.set_cell(row, col, WALL)
+    save_maze(path, grid)                           # Same size, other cells
+    changed = load_maze(path)
+    assert hpa.AbstractGraph.load(path + ".hpa", changed, 16) is None
+    graph = hpa.abstract_graph(changed)
+    assert graph.checksum == zlib.crc32(changed.cells)
+    assert hpa.AbstractGraph.load(path + ".hpa", changed, 16) is not None    # Saved again for the new cells
+    assert hpa.AbstractGraph.load(path + ".hpa", changed, 8) is None         # Built for another cluster size
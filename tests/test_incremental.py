@@ -0,0 +1,94 @@
+"""
+D* Lite against Dijkstra on random 8-connected grids, where the sums of sqrt(2) moves are rounded.
+"""
+import math
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pathfinding"))
+
+import generate
+from grid import CORNER_CUTTING, OPEN, WALL, Grid
+from incremental import IncrementalPlanner
+from path_finder import random_maze, solve
+
+
+def path_cost(path):
+    """Returns the cost of a path of (row, col) positions, 1 per straight move and sqrt(2) per diagonal one."""
+    return sum(math.hypot(a[0] - b[0], a[1] - b[1]) for a, b in zip(path, path[1:]))
+
+
+def dijkstra_cost(grid):
+    """Returns the cost of the shortest path found by Dijkstra, or None if there is none."""
+    stats = {}
+    found = solve(grid, "dijkstra", stats=stats)[0]
+    return stats["cost"] if found else None
+
+
+def random_grid(seed, corner_cutting):
+    rng = random.Random(seed)
+    rows, cols = rng.randint(4, 30), rng.randint(4, 30)
+    if seed % 2:
+        grid = generate.random_grid_maze(rows, cols, seed=seed)
+    else:
+        random.seed(seed)
+        grid = Grid.from_maze(random_maze(rows, cols, p=rng.random() * 0.45))
+    grid.set_connectivity(8, corner_cutting)
+    return grid, rng
+
+
+@pytest.mark.parametrize("corner_cutting", CORNER_CUTTING)
+@pytest.mark.parametrize("seed", range(0, 150))
+def test_dstar_lite_matches_dijkstra(seed, corner_cutting):
+    grid, rng = random_grid(seed, corner_cutting)
+    if grid.start is None or grid.end is None:
+        pytest.skip("no start or end")
+    planner = IncrementalPlanner(grid)
+    path = planner.path()
+    for _ in range(4):
+        expected = dijkstra_cost(grid)
+        if expected is None:
+            assert path == []
+        else:
+            assert path[0] == grid.position(planner.start) and path[-1] == grid.position(planner.end)
+            assert path_cost(path) == pytest.approx(expected, abs=1e-9)
+
+        changes = [(rng.randrange(grid.rows), rng.randrange(grid.cols), rng.choice((OPEN, WALL))) for _ in range(rng.randint(1, 6))]
+        changes = [change for change in changes if grid.index(change[0], change[1]) not in (planner.start, planner.end)]
+        path, _ = planner.update(changes)
+
+
+def test_invalid_update_changes_no_cell():
+    grid = Grid.from_maze([list("O     "), list("      "), list("     X")])
+    grid.set_connectivity(8, "always")
+    planner = IncrementalPlanner(grid)
+    path = planner.path()
+    version = grid.version
+    with pytest.raises(ValueError):
+        planner.update([(1, 1, WALL), (0, 0, WALL)])
+    assert grid.version == version and not grid.is_wall(1, 1)
+    assert planner.path() == path
+    path, _ = planner.update([(1, 1, WALL)])
+    assert path_cost(path) == pytest.approx(dijkstra_cost(grid), abs=1e-9)
+
+
+@pytest.mark.parametrize("connectivity", (4, 8))
+@pytest.mark.parametrize("seed", range(0, 40))
+def test_dstar_lite_follows_step_costs(seed, connectivity):
+    grid, rng = random_grid(seed, "never")
+    grid.set_connectivity(connectivity)
+    if grid.start is None or grid.end is None:
+        pytest.skip("no start or end")
+    for row in range(grid.rows):
+        for col in range(grid.cols):
+            grid.set_cost(row, col, rng.choice((1, 1, 2, 5)))
+    path = IncrementalPlanner(grid).path()
+    expected = dijkstra_cost(grid)
+    if expected is None:
+        assert path == []
+    else:
+        cost = sum(math.hypot(a[0] - b[0], a[1] - b[1]) * grid.costs[grid.index(*b)] for a, b in zip(path, path[1:]))
+        assert cost == pytest.approx(expected, abs=1e-9)
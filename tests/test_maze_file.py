@@ -0,0 +1,138 @@
+"""
+Binary maze files: CSV conversion, and the byte and bit encodings against the maze they were written from.
+"""
+import os
+import pickle
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pathfinding"))
+
+from grid import OPEN, WALL, Grid
+from maze_file import BIT, BYTE, MappedGrid, convert_csv, create_maze, load_maze, save_maze
+from path_finder import maze_csv, solve
+
+CSV = "O, ,#, , \n ,#, , ,#\n , , ,#,X\n"
+
+
+def write(tmp_path, text, name="maze.csv"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+@pytest.mark.parametrize("encoding", (BYTE, BIT))
+@pytest.mark.parametrize("blank", ("", "\n", "\n\n", "\r\n"))
+def test_csv_readers_skip_blank_lines(tmp_path, encoding, blank):
+    csv_path = write(tmp_path, CSV + blank)
+    convert_csv(csv_path, str(tmp_path / "maze.bin"), encoding)
+    grid = load_maze(str(tmp_path / "maze.bin"))
+    expected = Grid.from_maze(maze_csv(csv_path))
+    assert (grid.rows, grid.cols) == (expected.rows, expected.cols) == (3, 5)
+    assert bytes(grid.cells) == bytes(expected.cells)
+    assert (grid.start, grid.end) == (expected.start, expected.end)
+
+
+def test_csv_readers_reject_ragged_rows(tmp_path):
+    csv_path = write(tmp_path, "O, , \n , \n , ,X\n")
+    with pytest.raises(ValueError, match="Row 1 has 2 columns, expected 3"):
+        convert_csv(csv_path, str(tmp_path / "maze.bin"))
+    with pytest.raises(ValueError, match="Row 1 has 2 columns, expected 3"):
+        Grid.from_maze(maze_csv(csv_path))
+
+
+def test_convert_empty_csv(tmp_path):
+    with pytest.raises(ValueError, match="has no rows"):
+        convert_csv(write(tmp_path, "\n"), str(tmp_path / "maze.bin"))
+
+
+def random_grid(seed, rows, cols):
+    rng = random.Random(seed)
+    maze = [[rng.choice("  #") for _ in range(cols)] for _ in range(rows)]
+    maze[0][0], maze[-1][-1] = "O", "X"
+    return Grid.from_maze(maze)
+
+
+@pytest.mark.parametrize("encoding", (BYTE, BIT))
+@pytest.mark.parametrize("rows, cols", ((1, 1), (3, 7), (5, 8), (9, 9), (16, 17), (40, 33)))
+def test_save_load_round_trip(tmp_path, encoding, rows, cols):
+    grid = random_grid(rows * cols, rows, cols)
+    path = str(tmp_path / "maze.bin")
+    save_maze(path, grid, encoding)
+    loaded = load_maze(path)
+    assert isinstance(loaded, MappedGrid) == (encoding == BYTE)
+    assert (loaded.rows, loaded.cols, loaded.start, loaded.end) == (grid.rows, grid.cols, grid.start, grid.end)
+    assert bytes(loaded.cells) == bytes(grid.cells)
+    assert solve(loaded, "bfs")[:3] == solve(grid, "bfs")[:3]
+    if encoding == BIT:
+        assert os.path.getsize(path) < len(grid.cells) or rows * cols < 64
+
+
+def test_maze_without_endpoints(tmp_path):
+    path = str(tmp_path / "maze.bin")
+    save_maze(path, Grid.from_maze([list("   "), list(" # ")]))
+    grid = load_maze(path)
+    assert grid.start is None and grid.end is None
+
+
+def test_writable_map_leaves_the_file_unchanged(tmp_path):
+    path = str(tmp_path / "maze.bin")
+    save_maze(path, random_grid(1, 10, 10))
+    grid = load_maze(path, writable=True)
+    grid.set_cell(4, 4, WALL)
+    grid.set_cell(5, 5, OPEN)
+    assert grid.is_wall(4, 4) and not grid.is_wall(5, 5)
+    assert bytes(load_maze(path).cells) == bytes(random_grid(1, 10, 10).cells)
+
+    with pytest.raises(TypeError):                  # Read-only map
+        load_maze(path).set_cell(4, 4, WALL)
+
+
+def test_created_maze_writes_through(tmp_path):
+    path = str(tmp_path / "maze.bin")
+    grid = create_maze(path, 6, 9, start=(0, 0), end=(0, 8))
+    assert solve(grid, "bfs")[2] == 8
+    for row in range(5):
+        grid.set_cell(row, 4, WALL)
+    del grid
+    loaded = load_maze(path)
+    assert [loaded.is_wall(row, 4) for row in range(6)] == [True] * 5 + [False]
+    assert solve(loaded, "bfs")[2] == 8 + 2 * 5      # Around the wall, through the last row
+
+
+@pytest.mark.parametrize("writable", (False, True))
+def test_mapped_grid_pickle(tmp_path, writable):
+    path = str(tmp_path / "maze.bin")
+    save_maze(path, random_grid(2, 12, 15))
+    grid = load_maze(path, writable)
+    grid.set_connectivity(8, "one")
+    if writable:
+        grid.set_cell(3, 3, WALL)                   # Not in the file, the copy has to carry it
+    copy = pickle.loads(pickle.dumps(grid))
+    assert type(copy) is (Grid if writable else MappedGrid)
+    if not writable:
+        assert copy.path == os.path.abspath(path)
+    assert bytes(copy.cells) == bytes(grid.cells)
+    assert (copy.start, copy.end, copy.connectivity, copy.corner_cutting) == (grid.start, grid.end, 8, "one")
+    assert solve(copy, "dijkstra")[:3] == solve(grid, "dijkstra")[:3]
+
+
+def test_invalid_files(tmp_path):
+    path = str(tmp_path / "maze.bin")
+    with open(path, "wb") as f:
+        f.write(b"MAZE")
+    with pytest.raises(ValueError, match="too short"):
+        load_maze(path)
+    with open(path, "wb") as f:
+        f.write(b"NOPE" + bytes(60))
+    with pytest.raises(ValueError, match="bad magic"):
+        load_maze(path)
+
+    for encoding in (BYTE, BIT):
+        save_maze(path, random_grid(3, 20, 20), encoding)
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 10)
+        with pytest.raises(ValueError, match="Truncated"):
+            load_maze(path)
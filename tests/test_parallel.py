@@ -0,0 +1,30 @@
+"""
+The parallel comparison against the same searches run one after the other.
+"""
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pathfinding"))
+
+from grid import Grid
+from path_finder import compare_parallel, solve
+
+OPEN_MAZE = [list("O" + " " * 29)] + [list(" " * 30) for _ in range(28)] + [list(" " * 29 + "X")]
+
+
+def test_compare_parallel_deadline_stops_the_workers(monkeypatch):
+    # Without interval timers the searches can't interrupt themselves, only the deadline of the comparison stops them
+    monkeypatch.delattr(signal, "setitimer")
+    t0 = time.perf_counter()
+    methods = compare_parallel(Grid.from_maze(OPEN_MAZE), [("bfs", "bfs"), ("iddfs", "iddfs")], workers=2, timeout=1)
+    assert time.perf_counter() - t0 < 10
+    assert methods[0][:2] == ["bfs", True] and methods[0][3] == solve(OPEN_MAZE, "bfs")[2]
+    assert methods[1][:2] == ["iddfs (timeout)", False]
+
+    deadline = time.monotonic() + 5                 # The terminated workers are joined by the pool in the background
+    while multiprocessing.active_children() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not multiprocessing.active_children()
@@ -0,0 +1,184 @@
+"""
+The solvers of path_finder.py against BFS and Dijkstra on seeded 4-connected, 8-connected and weighted mazes.
+"""
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pathfinding"))
+
+import generate
+from grid import Grid, Workspace
+from path_finder import perfect_maze, random_maze, solve
+
+
+def random_grid(seed, connectivity=4, weighted=False):
+    """Returns a seeded maze, a random grid maze for odd seeds and a random maze for even ones."""
+    rng = random.Random(seed)
+    rows, cols = rng.randint(3, 30), rng.randint(3, 30)
+    if seed % 2:
+        grid = generate.random_grid_maze(rows, cols, seed=seed)
+    else:
+        random.seed(seed)
+        grid = Grid.from_maze(random_maze(rows, cols, p=rng.random() * 0.4))
+    if connectivity == 8:
+        grid.set_connectivity(8, rng.choice(("never", "one", "always")))
+    if weighted:
+        for row in range(grid.rows):
+            for col in range(grid.cols):
+                grid.set_cost(row, col, rng.choice((1, 1, 2, 5)))
+    return grid
+
+
+def cost(grid, path):
+    """Returns the cost of a path of (row, col) positions, with the step costs and the sqrt(2) diagonal moves of the grid."""
+    total = 0
+    for a, b in zip(path, path[1:]):
+        step = 1 if a[0] == b[0] or a[1] == b[1] else 2 ** 0.5
+        total += step * (grid.costs[grid.index(*b)] if grid.costs is not None else 1)
+    return total
+
+
+def assert_valid_path(grid, path, start=None, end=None):
+    """Checks that a path goes from the start to the end over open cells, one move of the grid at a time."""
+    assert path[0] == (start or grid.position(grid.start)) and path[-1] == (end or grid.position(grid.end))
+    for a, b in zip(path, path[1:]):
+        assert not grid.is_wall(*b)
+        assert grid.index(*b) in grid.neighbors(grid.index(*a))
+
+
+@pytest.mark.parametrize("connectivity", (4, 8))
+@pytest.mark.parametrize("seed", range(30))
+def test_flow_matches_bfs(seed, connectivity):
+    grid = random_grid(seed, connectivity)
+    found, path, length = solve(grid, "flow")[:3]
+    expected = solve(grid, "bfs")
+    assert (found, length) == (expected[0], expected[2])
+    if found:
+        assert_valid_path(grid, path)
+
+
+def test_flow_rejects_step_costs():
+    grid = random_grid(1, weighted=True)
+    with pytest.raises(ValueError, match="without step costs"):
+        solve(grid, "flow")
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_jps_matches_bfs(seed):
+    grid = random_grid(seed)
+    found, path, length = solve(grid, "jps")[:3]
+    expected = solve(grid, "bfs")
+    assert (found, length) == (expected[0], expected[2])
+    if found:
+        assert_valid_path(grid, path)
+        assert length == len(path) - 1
+
+
+@pytest.mark.parametrize("connectivity, weighted, message", ((8, False, "4-connected"), (4, True, "without step costs")))
+def test_jps_rejects_grids_it_cant_jump_on(connectivity, weighted, message):
+    for seed in range(10):                          # Connected and disconnected endpoints alike
+        grid = random_grid(seed, connectivity, weighted)
+        with pytest.raises(ValueError, match=message):
+            solve(grid, "jps")
+
+
+def open_pairs(grid, seed, count=20):
+    """Returns seeded (start, end) pairs of open (row, col) positions."""
+    rng = random.Random(seed)
+    cells = [(row, col) for row in range(grid.rows) for col in range(grid.cols) if not grid.is_wall(row, col)]
+    return [(rng.choice(cells), rng.choice(cells)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_jps_matches_bfs_between_any_cells(seed):
+    grid = random_grid(seed)
+    for start, end in open_pairs(grid, seed):
+        found, path, length = solve(grid, "jps", start=start, end=end)[:3]
+        expected = solve(grid, "bfs", start=start, end=end)
+        assert (found, length) == (expected[0], expected[2])
+        if found:
+            assert path[0] == start and path[-1] == end
+
+
+def dijkstra_cost(grid, start=None, end=None):
+    """Returns the cost of the shortest path found by Dijkstra, or None if there is none."""
+    stats = {}
+    found = solve(grid, "dijkstra", stats=stats, start=start, end=end)[0]
+    return stats["cost"] if found else None
+
+
+@pytest.mark.parametrize("connectivity", (4, 8))
+@pytest.mark.parametrize("seed", range(40))
+def test_bidirectional_matches_bfs(seed, connectivity):
+    grid = random_grid(seed, connectivity)
+    workspace = Workspace(grid.size)                # Shared by the queries, like solve_batch does
+    for start, end in [(None, None)] + open_pairs(grid, seed, 10):
+        stats = {}
+        found, path, length, steps = solve(grid, "bidirectional", stats=stats, start=start, end=end, workspace=workspace)[:4]
+        expected = solve(grid, "bfs", start=start, end=end)
+        assert (found, length) == (expected[0], expected[2])
+        if found:
+            assert_valid_path(grid, path, start, end)
+            assert length == len(path) - 1
+            assert stats["expanded_start"] + stats["expanded_end"] == steps
+
+
+@pytest.mark.parametrize("weighted", (False, True))
+@pytest.mark.parametrize("connectivity", (4, 8))
+@pytest.mark.parametrize("seed", range(40))
+def test_bidirectional_astar_matches_dijkstra(seed, connectivity, weighted):
+    grid = random_grid(seed, connectivity, weighted)
+    algorithm = "bidirectional-astar" if connectivity == 4 else "bidirectional-astar-octile"
+    workspace = Workspace(grid.size)
+    for start, end in [(None, None)] + open_pairs(grid, seed, 10):
+        stats = {}
+        found, path = solve(grid, algorithm, stats=stats, start=start, end=end, workspace=workspace)[:2]
+        expected = dijkstra_cost(grid, start, end)
+        assert found == (expected is not None)
+        if found:
+            assert_valid_path(grid, path, start, end)
+            assert cost(grid, path) == pytest.approx(expected, abs=1e-9)
+            assert stats["cost"] == pytest.approx(expected, abs=1e-9)
+
+
+
+def small_grid(seed, connectivity, weighted):
+    """Returns a seeded maze small or tree-like enough for iterative deepening, which explores every path within its bound."""
+    rng = random.Random(seed)
+    if seed % 2:
+        grid = Grid.from_maze(perfect_maze(rng.randint(3, 15), rng.randint(3, 15), seed=seed))
+    else:
+        random.seed(seed)
+        grid = Grid.from_maze(random_maze(rng.randint(2, 4), rng.randint(2, 4), p=0.3))
+    grid.set_connectivity(connectivity)
+    if weighted:
+        for row in range(grid.rows):
+            for col in range(grid.cols):
+                grid.set_cost(row, col, rng.choice((1, 2, 5)))
+    return grid
+
+
+@pytest.mark.parametrize("connectivity", (4, 8))
+@pytest.mark.parametrize("seed", range(30))
+def test_iddfs_matches_bfs(seed, connectivity):
+    grid = small_grid(seed, connectivity, False)
+    found, path, length = solve(grid, "iddfs")[:3]
+    expected = solve(grid, "bfs")
+    assert (found, length) == (expected[0], expected[2])
+    if found:
+        assert_valid_path(grid, path)
+
+
+@pytest.mark.parametrize("weighted", (False, True))
+@pytest.mark.parametrize("seed", range(30))
+def test_ida_star_matches_dijkstra(seed, weighted):
+    grid = small_grid(seed, 4, weighted)
+    found, path = solve(grid, "idastar-manhattan")[:2]
+    expected = dijkstra_cost(grid)
+    assert found == (expected is not None)
+    if found:
+        assert_valid_path(grid, path)
+        assert cost(grid, path) == pytest.approx(expected, abs=1e-9)